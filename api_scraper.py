@@ -1,204 +1,221 @@
 import sys
 import json
 import os
+import time
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import scrapers
-import mysql.connector
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import db
+import driver_pool
+import metric_writer
+import metrics
+import scrape_ledger
 
 # --- LOADER ---
-def load_creds(path):
-    if os.path.exists(path):
-        with open(path, 'r') as f: return json.load(f)
-    return {}
+load_creds = db.load_creds
 
 def get_conn():
-    db_creds = load_creds('postgres_credentials.json')
-    creds = {k: (v.strip() if isinstance(v, str) else v) for k, v in db_creds.items()}
-    if 'sslmode' in creds: del creds['sslmode']
-    return mysql.connector.connect(**creds)
+    # Shared per-process pool; close() hands the connection back
+    return db.get_conn()
 
-def refresh_artist(artist_name):
+def spotify_headers():
+    # Shared, expiring client-credentials token (one POST per hour across all processes)
+    import spotify_client
+    return spotify_client.get_headers()
+
+class GeminiModel:
+    """Stand-in for the Gemini model used by the _try_gemini strategies.
+
+    The google-genai SDK is imported, and the client built, on the first generate_content().
+    """
+
+    def __init__(self, api_key, name='gemini-2.5-flash'):
+        self.api_key = api_key
+        self.name = name
+        self._client = None
+
+    def generate_content(self, prompt):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client.models.generate_content(model=self.name, contents=prompt)
+
+_gemini = {}
+
+def gemini_model():
+    """This process's GeminiModel, or None without gemini_credentials.json."""
+    if 'model' not in _gemini:
+        creds = load_creds('gemini_credentials.json')
+        _gemini['model'] = GeminiModel(creds['api_key']) if creds and creds.get('api_key') else None
+    return _gemini['model']
+
+def only_found(**ids):
+    """Resolved handles to write back; a failed lookup (None) keeps whatever is stored."""
+    return {k: v for k, v in ids.items() if v is not None}
+
+def known_id(row, col, force_resolve=False):
+    """The handle/ID stored on the ARTISTS row, unless we were asked to look it up again."""
+    return None if force_resolve else row.get(col)
+
+def observed(mode):
+    """Count a refresh function's calls, outcomes and timings in metrics, and track it as in flight."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(artist_name, *args, **kwargs):
+            start = time.time()
+            with metrics.in_flight('scrapes_in_flight', mode=mode):
+                res = fn(artist_name, *args, **kwargs)
+            metrics.observe('refresh_seconds', time.time() - start, mode=mode)
+            outcome = 'failed' if not res.get('ok') else 'partial' if res.get('error') or res.get('failed') else 'ok'
+            metrics.inc('refresh_total', mode=mode, outcome=outcome)
+            for source, secs in (res.get('timings') or {}).items():
+                metrics.observe('refresh_source_seconds', secs, source=source)
+            return res
+        return run
+    return wrap
+
+# (source, profile class, ARTISTS column holding its handle, label used in last_error)
+SOURCES = [
+    ('instagram', 'InstagramProfile', 'instagram_username', 'IG'),
+    ('twitter', 'TwitterProfile', 'twitter_username', 'Tw'),
+    ('spotify', 'SpotifyProfile', 'spotify_id', 'Sp'),
+    ('stubhub', 'StubhubProfile', 'stubhub_url', 'Sh'),
+]
+SOURCE_THREADS = int(os.environ.get('SOURCE_THREADS', len(SOURCES)))
+# The ARTISTS columns a source has to fill for its scrape to count as a success
+SOURCE_COLUMNS = {'instagram': ['instagram_followers'], 'twitter': ['twitter_followers'],
+                  'spotify': ['spotify_followers', 'spotify_listeners'], 'stubhub': ['stubhub_favourites']}
+
+def record_outcomes(artist_name, sources, values, timings, errors):
+    """One scrape_ledger row per metric; a metric that came back empty is left open for recover_failures."""
+    for source in sources:
+        for col in SOURCE_COLUMNS[source]:
+            scrape_ledger.record(artist_name, source, scrape_ledger.REFRESH, bool(values.get(col)), value=values.get(col),
+                                 latency=timings.get(source), error=errors.get(source), metric=col)
+    scrape_ledger.flush()
+
+def _scrape_source(profile):
+    """get_all() on its own thread, with a browser leased only if a strategy needs one.
+
+    Returns (error or None, seconds taken).
+    """
+    pool = driver_pool.get_pool()
+    t = time.time()
+    try:
+        with scrapers.thread_driver(pool.acquire, pool.release):
+            profile.get_all()
+        return None, round(time.time() - t, 2)
+    except Exception as e:
+        return e, round(time.time() - t, 2)
+
+@observed('artist')
+def refresh_artist(artist_name, force_resolve=False):
     print(f"🔄 Refreshing: {artist_name}")
     
-    # 1. Init Selenium & Gemini
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    
-    # Check for Chromium binary (Docker)
-    if os.environ.get('CHROME_BIN'):
-        chrome_options.binary_location = os.environ.get('CHROME_BIN')
-        
-    driver = webdriver.Chrome(options=chrome_options)
-    
-    model = None
-    gemini_creds = load_creds('gemini_credentials.json')
-    if gemini_creds:
-        try:
-            from google import genai
-            client = genai.Client(api_key=gemini_creds['api_key'])
-            model = client.models.get('gemini-2.5-flash')
-        except: pass
-        
+    # 1. Each source thread leases its own warm browser from the pool; Gemini loads on first use
     # Spotify Headers
-    headers = {}
-    sp_creds = load_creds('spotify_credentials.json')
-    if sp_creds:
-        try:
-            import requests
-            res = requests.post('https://accounts.spotify.com/api/token', 
-                                data={'grant_type': 'client_credentials', 
-                                      'client_id': sp_creds['client_id'], 
-                                      'client_secret': sp_creds['client_secret']})
-            if res.status_code == 200:
-                headers = {'Authorization': f'Bearer {res.json()["access_token"]}'}
-        except: pass
+    headers = spotify_headers()
 
-    scrapers.set_globals(driver, model, headers)
+    scrapers.set_globals(None, gemini_model(), headers)
     
     last_error = None
+    timings, errors = {}, {}
     try:
-        conn = get_conn()
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM ARTISTS WHERE name = %s", (artist_name,))
-            row = cur.fetchone()
-            
+        row = db.query("SELECT * FROM ARTISTS WHERE name = %s", (artist_name,), one=True)
+
         if not row:
             print(f"❌ Artist {artist_name} not found in database.")
-            return
+            return {'artist': artist_name, 'ok': False, 'error': 'Artist not found'}
 
-        # Scrape
-        try:
-            ig = scrapers.InstagramProfile(artist_name, row.get('instagram_username'))
-            ig.get_all()
-        except Exception as e:
-            print(f"IG Error: {e}")
-            last_error = f"IG: {str(e)}"
-        
-        try:
-            tw = scrapers.TwitterProfile(artist_name, row.get('twitter_username'))
-            tw.get_all()
-        except Exception as e:
-            print(f"Twitter Error: {e}")
-            last_error = (last_error + " | " if last_error else "") + f"Tw: {str(e)}"
-            
-        try:
-            sp = scrapers.SpotifyProfile(artist_name, row.get('spotify_id'))
-            sp.get_all()
-        except Exception as e:
-            print(f"Spotify Error: {e}")
-            last_error = (last_error + " | " if last_error else "") + f"Sp: {str(e)}"
-            
-        try:
-            sh = scrapers.StubhubProfile(artist_name, row.get('stubhub_url'))
-            sh.get_all()
-        except Exception as e:
-            print(f"Stubhub Error: {e}")
-            last_error = (last_error + " | " if last_error else "") + f"Sh: {str(e)}"
+        # Scrape all four sources at once; each one's wall time is in timings (seconds)
+        profiles = {}
+        for source, cls, col, label in SOURCES:
+            try:
+                profiles[source] = getattr(scrapers, cls)(artist_name, known_id(row, col, force_resolve), force_resolve=force_resolve)
+            except Exception as e:
+                print(f"{source.capitalize()} Error: {e}")
+                last_error = (last_error + " | " if last_error else "") + f"{label}: {str(e)}"
+                errors[source] = e
+        with ThreadPoolExecutor(max_workers=SOURCE_THREADS) as ex:
+            futures = {source: ex.submit(_scrape_source, p) for source, p in profiles.items()}
+        for source, cls, col, label in SOURCES:
+            if source not in futures: continue
+            err, timings[source] = futures[source].result()
+            if err is not None:
+                print(f"{source.capitalize()} Error: {err}")
+                last_error = (last_error + " | " if last_error else "") + f"{label}: {str(err)}"
+                errors[source] = err
+        ig, tw, sp, sh = (profiles.get(source) for source, *_ in SOURCES)
         
         # Save
         # Even if some scrapers failed, we save what we got and the error log
-        q = """
-            UPDATE ARTISTS SET 
-                instagram_followers = %s,
-                spotify_followers = %s,
-                spotify_listeners = %s,
-                spotify_popularity = %s,
-                twitter_followers = %s,
-                stubhub_favourites = %s,
-                last_error = %s,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE name = %s
-        """
-        v = (
-            scrapers.clean_for_mysql(ig.follower_count) if 'ig' in locals() else None,
-            scrapers.clean_for_mysql(sp.followers) if 'sp' in locals() else None,
-            scrapers.clean_for_mysql(sp.listens) if 'sp' in locals() else None,
-            scrapers.clean_for_mysql(sp.popularity) if 'sp' in locals() else None,
-            scrapers.clean_for_mysql(tw.follower_count) if 'tw' in locals() else None,
-            scrapers.clean_for_mysql(sh.favourites) if 'sh' in locals() else None,
-            last_error,
-            artist_name
-        )
-        
-        with conn.cursor() as cur:
-            cur.execute(q, v)
-            conn.commit()
-            
+        values = {
+            'instagram_followers': scrapers.clean_for_mysql(ig.follower_count) if ig else None,
+            'spotify_followers': scrapers.clean_for_mysql(sp.followers) if sp else None,
+            'spotify_listeners': scrapers.clean_for_mysql(sp.listens) if sp else None,
+            'spotify_popularity': scrapers.clean_for_mysql(sp.popularity) if sp else None,
+            'twitter_followers': scrapers.clean_for_mysql(tw.follower_count) if tw else None,
+            'stubhub_favourites': scrapers.clean_for_mysql(sh.favourites) if sh else None,
+            'last_error': last_error,
+        }
+        # Write resolved handles back so the next refresh skips the search engines
+        values.update(only_found(instagram_username=ig.username if ig else None,
+                                 twitter_username=tw.username if tw else None,
+                                 spotify_id=sp.spotifyID if sp else None,
+                                 stubhub_url=sh.url if sh else None))
+        metric_writer.put(artist_name, values)
+
         if last_error:
             print(f"⚠️ Partial Success: Updated {artist_name} with errors: {last_error}")
         else:
             print(f"✅ Success: Updated {artist_name}")
+        # A source that came back empty counts as failed even if it raised nothing
+        failed = [src for src, cols in SOURCE_COLUMNS.items() if not all(values[c] for c in cols)]
+        record_outcomes(artist_name, SOURCE_COLUMNS, values, timings, errors)
+        return {'artist': artist_name, 'ok': True, 'error': last_error, 'timings': timings, 'failed': failed}
             
     except Exception as e:
         error_msg = f"Fatal Scraper Error: {str(e)}"
         print(f"❌ {error_msg}")
         try:
             # Try to log fatal error to DB
-            cur.execute("UPDATE ARTISTS SET last_error = %s WHERE name = %s", (error_msg, artist_name))
-            conn.commit()
+            metric_writer.put(artist_name, {'last_error': error_msg})
         except: pass
-    finally:
-        driver.quit()
-        if 'conn' in locals(): conn.close()
-
-def refresh_artist_column(artist_name, source, allow_fallback=True):
-    """Refresh only a specific data source for an artist. Falls back to full refresh on failure."""
-    print(f"🔄 Refreshing {source} for: {artist_name}")
-
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
+        return {'artist': artist_name, 'ok': False, 'error': error_msg, 'timings': timings}
 
-    if os.environ.get('CHROME_BIN'):
-        chrome_options.binary_location = os.environ.get('CHROME_BIN')
+def refresh_artist_column(artist_name, source, allow_fallback=True, force_resolve=False):
+    """Refresh only a specific data source for an artist. Falls back to full refresh on failure.
 
-    driver = webdriver.Chrome(options=chrome_options)
+    Returns {'artist', 'ok', 'error', 'timings'} like refresh_artist.
+    """
+    res = _refresh_column(artist_name, source, allow_fallback, force_resolve)
+    # The full refresh runs after the column attempt was observed and its browser went back
+    if res.get('fallback'):
+        print(f"🔄 Falling back to full refresh for {artist_name}...")
+        return refresh_artist(artist_name, force_resolve)
+    return res
 
-    model = None
-    gemini_creds = load_creds('gemini_credentials.json')
-    if gemini_creds:
-        try:
-            from google import genai
-            client = genai.Client(api_key=gemini_creds['api_key'])
-            model = client.models.get('gemini-2.5-flash')
-        except: pass
+@observed('column')
+def _refresh_column(artist_name, source, allow_fallback, force_resolve):
+    print(f"🔄 Refreshing {source} for: {artist_name}")
 
-    headers = {}
-    if source == 'spotify':
-        sp_creds = load_creds('spotify_credentials.json')
-        if sp_creds:
-            try:
-                import requests
-                res = requests.post('https://accounts.spotify.com/api/token',
-                                    data={'grant_type': 'client_credentials',
-                                          'client_id': sp_creds['client_id'],
-                                          'client_secret': sp_creds['client_secret']})
-                if res.status_code == 200:
-                    headers = {'Authorization': f'Bearer {res.json()["access_token"]}'}
-            except: pass
+    # This thread leases a browser from the pool only if a strategy needs one
+    pool = driver_pool.get_pool()
+    headers = spotify_headers() if source == 'spotify' else {}
 
-    scrapers.set_globals(driver, model, headers)
+    scrapers.set_globals(None, gemini_model(), headers)
 
     last_error = None
     scrape_failed = False
+    started = time.time()
+    saved, error = {}, None
 
-    def upsert_now(update_parts, values, error_msg=None):
-        """Immediately save values to DB."""
+    def upsert_now(values, error_msg=None):
+        """Save values (immediately, or with the batch when called inside metric_writer.batch())."""
         try:
-            conn = get_conn()
-            update_parts.append("last_error = %s")
-            update_parts.append("updated_at = CURRENT_TIMESTAMP")
-            values.append(error_msg)
-            values.append(artist_name)
-            q = f"UPDATE ARTISTS SET {', '.join(update_parts)} WHERE name = %s"
-            with conn.cursor() as cur:
-                cur.execute(q, tuple(values))
-                conn.commit()
-            conn.close()
+            metric_writer.put(artist_name, {**values, 'last_error': error_msg})
+            saved.update(values)
             print(f"✅ Saved {source} for {artist_name}")
             return True
         except Exception as e:
@@ -206,102 +223,483 @@ def refresh_artist_column(artist_name, source, allow_fallback=True):
             return False
 
     try:
-        conn = get_conn()
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM ARTISTS WHERE name = %s", (artist_name,))
-            row = cur.fetchone()
-        conn.close()
+        with scrapers.thread_driver(pool.acquire, pool.release):
+            row = db.query("SELECT * FROM ARTISTS WHERE name = %s", (artist_name,), one=True)
 
-        if not row:
-            print(f"❌ Artist {artist_name} not found in database.")
-            return
+            if not row:
+                print(f"❌ Artist {artist_name} not found in database.")
+                return {'artist': artist_name, 'ok': False, 'error': 'Artist not found'}
 
-        if source == 'instagram':
-            try:
-                ig = scrapers.InstagramProfile(artist_name, row.get('instagram_username'))
-                ig.get_all()
-                val = scrapers.clean_for_mysql(ig.follower_count)
-                if val is not None:
-                    upsert_now(["instagram_followers = %s"], [val])
-                else:
+            if source == 'instagram':
+                try:
+                    ig = scrapers.InstagramProfile(artist_name, known_id(row, 'instagram_username', force_resolve), force_resolve=force_resolve)
+                    ig.get_all()
+                    val = scrapers.clean_for_mysql(ig.follower_count)
+                    if val is not None:
+                        upsert_now({'instagram_followers': val, **only_found(instagram_username=ig.username)})
+                    else:
+                        scrape_failed = True
+                        last_error = "IG: No value returned"
+                except Exception as e:
+                    last_error = f"IG: {str(e)}"
+                    error = e
                     scrape_failed = True
-                    last_error = "IG: No value returned"
-            except Exception as e:
-                last_error = f"IG: {str(e)}"
-                scrape_failed = True
 
-        elif source == 'twitter':
-            try:
-                tw = scrapers.TwitterProfile(artist_name, row.get('twitter_username'))
-                tw.get_all()
-                val = scrapers.clean_for_mysql(tw.follower_count)
-                if val is not None:
-                    upsert_now(["twitter_followers = %s"], [val])
-                else:
+            elif source == 'twitter':
+                try:
+                    tw = scrapers.TwitterProfile(artist_name, known_id(row, 'twitter_username', force_resolve), force_resolve=force_resolve)
+                    tw.get_all()
+                    val = scrapers.clean_for_mysql(tw.follower_count)
+                    if val is not None:
+                        upsert_now({'twitter_followers': val, **only_found(twitter_username=tw.username)})
+                    else:
+                        scrape_failed = True
+                        last_error = "Tw: No value returned"
+                except Exception as e:
+                    last_error = f"Tw: {str(e)}"
+                    error = e
                     scrape_failed = True
-                    last_error = "Tw: No value returned"
-            except Exception as e:
-                last_error = f"Tw: {str(e)}"
-                scrape_failed = True
 
-        elif source == 'spotify':
-            try:
-                sp = scrapers.SpotifyProfile(artist_name, row.get('spotify_id'))
-                sp.get_all()
-                followers = scrapers.clean_for_mysql(sp.followers)
-                listeners = scrapers.clean_for_mysql(sp.listens)
-                popularity = scrapers.clean_for_mysql(sp.popularity)
-                # Save immediately if we got any values
-                if followers is not None or listeners is not None or popularity is not None:
-                    upsert_now(
-                        ["spotify_followers = %s", "spotify_listeners = %s", "spotify_popularity = %s"],
-                        [followers, listeners, popularity]
-                    )
-                else:
+            elif source == 'spotify':
+                try:
+                    sp = scrapers.SpotifyProfile(artist_name, known_id(row, 'spotify_id', force_resolve), force_resolve=force_resolve)
+                    sp.get_all()
+                    followers = scrapers.clean_for_mysql(sp.followers)
+                    listeners = scrapers.clean_for_mysql(sp.listens)
+                    popularity = scrapers.clean_for_mysql(sp.popularity)
+                    # Save immediately if we got any values
+                    if followers is not None or listeners is not None or popularity is not None:
+                        upsert_now({'spotify_followers': followers, 'spotify_listeners': listeners,
+                                    'spotify_popularity': popularity, **only_found(spotify_id=sp.spotifyID)})
+                    else:
+                        scrape_failed = True
+                        last_error = "Sp: No values returned"
+                except Exception as e:
+                    last_error = f"Sp: {str(e)}"
+                    error = e
                     scrape_failed = True
-                    last_error = "Sp: No values returned"
-            except Exception as e:
-                last_error = f"Sp: {str(e)}"
-                scrape_failed = True
 
-        elif source == 'stubhub':
-            try:
-                sh = scrapers.StubhubProfile(artist_name, row.get('stubhub_url'))
-                sh.get_all()
-                val = scrapers.clean_for_mysql(sh.favourites)
-                if val is not None:
-                    upsert_now(["stubhub_favourites = %s"], [val])
-                else:
+            elif source == 'stubhub':
+                try:
+                    sh = scrapers.StubhubProfile(artist_name, known_id(row, 'stubhub_url', force_resolve), force_resolve=force_resolve)
+                    sh.get_all()
+                    val = scrapers.clean_for_mysql(sh.favourites)
+                    if val is not None:
+                        upsert_now({'stubhub_favourites': val, **only_found(stubhub_url=sh.url)})
+                    else:
+                        scrape_failed = True
+                        last_error = "Sh: No value returned"
+                except Exception as e:
+                    last_error = f"Sh: {str(e)}"
+                    error = e
                     scrape_failed = True
-                    last_error = "Sh: No value returned"
-            except Exception as e:
-                last_error = f"Sh: {str(e)}"
-                scrape_failed = True
 
-        if last_error:
-            print(f"⚠️ Error: {last_error}")
+            if last_error:
+                print(f"⚠️ Error: {last_error}")
 
     except Exception as e:
         print(f"❌ Fatal Error: {str(e)}")
+        last_error = f"Fatal Scraper Error: {str(e)}"
         scrape_failed = True
-    finally:
-        driver.quit()
+        error = e
 
-    # Fallback to full refresh if column-specific scrape failed
+    timings = {source: round(time.time() - started, 2)}
+    # Failed column scrape: the caller falls back to a full refresh, which records every source
     if scrape_failed and allow_fallback:
-        print(f"🔄 Falling back to full refresh for {artist_name}...")
-        refresh_artist(artist_name)
+        return {'artist': artist_name, 'ok': False, 'error': last_error, 'timings': timings,
+                'failed': [source], 'fallback': True}
+    if source in SOURCE_COLUMNS:
+        record_outcomes(artist_name, [source], saved, timings, {source: error} if error is not None else {})
+    return {'artist': artist_name, 'ok': not scrape_failed, 'error': last_error,
+            'timings': timings, 'failed': [source] if scrape_failed else []}
+
+def print_wait_stats():
+    stats = scrapers.wait_stats()
+    if not stats: return
+    print("⏱️ Page readiness waits:")
+    for site, st in sorted(stats.items(), key=lambda kv: -kv[1]['total']):
+        print(f"   {site:<22} {st['count']:>3} waits | avg {st['avg']:.2f}s | max {st['max']:.2f}s | {st['timeouts']} timeouts")
+
+def load_rows(artist_names=None):
+    """ARTISTS rows for `artist_names` (all artists if None)."""
+    if artist_names is not None and not artist_names: return []
+    if artist_names:
+        return db.query(f"SELECT * FROM ARTISTS WHERE name IN ({','.join(['%s'] * len(artist_names))})", tuple(artist_names))
+    return db.query("SELECT * FROM ARTISTS")
+
+def save_fast_results(results):
+    """Buffer fast_path results ({name: {column: value}}); they go out with the current batch."""
+    with metric_writer.batch():
+        for name, values in results.items():
+            metric_writer.put(name, {c: scrapers.clean_for_mysql(v) for c, v in values.items()})
+
+def refresh_fast(artist_names=None, sources=None):
+    """Run the HTTP-only strategies for many artists concurrently, save what they find,
+    and queue a browser refresh only for the (artist, source) pairs they could not answer."""
+    import fast_path
+    import job_queue
+    sources = sources or job_queue.SOURCES
+
+    rows = load_rows(artist_names)
+    print(f"⚡ Fast path for {len(rows)} artist(s)...")
+    headers = spotify_headers() if 'spotify' in sources else {}
+    results, pending = fast_path.run_batch(rows, sources, headers)
+    save_fast_results(results)
+
+    for name, source in pending:
+        job_queue.enqueue(name, source)
+    print(f"✅ Fast path saved {len(results)} artist(s); queued {len(pending)} browser refresh(es)")
+    return results, pending
+
+def refresh_bulk(artist_names, sources=None, progress=None):
+    """One planned refresh over many artists.
+
+    The HTTP-only sources run first for every artist at once; whatever they miss, plus the
+    browser-only sources, then runs grouped by source on this process's warm browser and
+    cached Spotify token. `progress(status)` gets the per-artist sub-status after every step
+    (see job_queue.plan_bulk). Returns {'artist', 'ok', 'error', 'progress'}.
+    """
+    import fast_path
+    import job_queue
+    artist_names, sources, status = job_queue.plan_bulk(artist_names, sources)
+
+    def mark(name, source, state, error=None):
+        status['artists'][name][source] = state
+        if state in ('done', 'failed'): status['done'] += 1
+        if error: status['errors'].setdefault(name, {})[source] = error
+
+    def report():
+        if not progress: return
+        try: progress(status)
+        except Exception as e: print(f"⚠️ Could not record bulk progress: {e}")
+
+    print(f"📦 Bulk refresh: {len(artist_names)} artist(s), sources: {', '.join(sources)}")
+    # Every save below is buffered and written in a few multi-row statements
+    with metric_writer.batch():
+        rows = load_rows(artist_names)
+        found = {r['name'] for r in rows}
+        for name in artist_names:
+            if name not in found:
+                for source in sources: mark(name, source, 'failed', 'Artist not found')
+
+        # 1. HTTP-only sources for everyone in one concurrent batch
+        http = [s for s in sources if s in fast_path.HTTP_SOURCES]
+        pending = []
+        if http and rows:
+            try:
+                headers = spotify_headers() if 'spotify' in http else {}
+                results, pending = fast_path.run_batch(rows, http, headers)
+                save_fast_results(results)
+            except Exception as e:
+                print(f"⚠️ Fast path failed, using the browser for everything: {e}")
+                pending = [(r['name'], s) for r in rows for s in http]
+            missed = set(pending)
+            for r in rows:
+                for source in http:
+                    if (r['name'], source) not in missed: mark(r['name'], source, 'done')
+            report()
+        pending += [(r['name'], s) for r in rows for s in sources if s not in http]
+
+        # 2. Browser scrapes, one source at a time
+        for source in sources:
+            for name in [n for n, s in pending if s == source]:
+                mark(name, source, 'running')
+                report()
+                try:
+                    res = refresh_artist_column(name, source, allow_fallback=False)
+                except Exception as e:
+                    res = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                mark(name, source, 'done' if res.get('ok') else 'failed', res.get('error') or (None if res.get('ok') else 'Refresh failed'))
+                report()
+
+    report()
+    failed = sum(1 for states in status['artists'].values() for st in states.values() if st == 'failed')
+    print(f"✅ Bulk refresh finished: {status['done'] - failed} succeeded, {failed} failed")
+    return {'artist': f"{len(artist_names)} artist(s)", 'ok': failed < status['total'] or not status['total'],
+            'error': f"{failed} of {status['total']} source refresh(es) failed" if failed else None, 'progress': status}
+
+# --- BULK CLI (process pool) ---
+BULK_WORKERS = int(os.environ.get('BULK_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+
+def _bulk_init():
+    # Each worker process gets its own warm browser; multiprocessing children skip atexit, so
+    # register the cleanup as a multiprocessing finalizer instead
+    from multiprocessing import util
+    # The worker's saves stay in one open batch (written on the writer's size/time thresholds);
+    # closing it at exit flushes whatever is left
+    writes = metric_writer.batch()
+    writes.__enter__()
+    util.Finalize(None, writes.__exit__, args=(None, None, None), exitpriority=20)
+    util.Finalize(None, metrics.flush, exitpriority=15)
+    util.Finalize(None, lambda: driver_pool.get_pool().close(), exitpriority=10)
+    try: driver_pool.get_pool().warm()
+    except Exception as e: print(f"⚠️ Worker {os.getpid()} could not pre-launch a browser: {e}")
+
+def _bulk_task(task):
+    name, sources, force_resolve = task
+    start = time.time()
+    try:
+        if not sources:
+            res = refresh_artist(name, force_resolve)
+        else:
+            res = {'artist': name, 'ok': True, 'error': None, 'timings': {}, 'failed': []}
+            for source in sources:
+                r = refresh_artist_column(name, source, allow_fallback=False, force_resolve=force_resolve)
+                res['timings'].update(r.get('timings') or {})
+                res['failed'] += r.get('failed') or ([] if r.get('ok') else [source])
+                if r.get('error'): res['error'] = (res['error'] + " | " if res['error'] else "") + r['error']
+            res['ok'] = len(res['failed']) < len(sources)
+    except Exception as e:
+        res = {'artist': name, 'ok': False, 'error': f"{type(e).__name__}: {e}", 'timings': {}, 'failed': []}
+    res['elapsed'] = round(time.time() - start, 2)
+    res['worker'] = os.getpid()
+    return res
+
+def summarize(results, elapsed, workers):
+    """Throughput, per-source timing (avg/p95/max) and failure counts for a bulk run."""
+    sources = {}
+    for r in results:
+        for src, secs in (r.get('timings') or {}).items():
+            sources.setdefault(src, {'times': [], 'failed': 0})['times'].append(secs)
+        for src in r.get('failed') or []:
+            sources.setdefault(src, {'times': [], 'failed': 0})['failed'] += 1
+    per_source = {}
+    for src, st in sources.items():
+        times = sorted(st['times'])
+        per_source[src] = {'count': len(times), 'failed': st['failed'],
+                           'avg': round(sum(times) / len(times), 2) if times else None,
+                           'p95': times[int(0.95 * (len(times) - 1))] if times else None,
+                           'max': times[-1] if times else None}
+    ok = sum(1 for r in results if r.get('ok'))
+    return {'artists': len(results), 'ok': ok, 'failed': len(results) - ok, 'workers': workers,
+            'elapsed': round(elapsed, 1), 'per_minute': round(len(results) / elapsed * 60, 2) if elapsed else None,
+            'sources': per_source,
+            'failures': [{'artist': r['artist'], 'error': r.get('error'), 'failed': r.get('failed')}
+                         for r in results if not r.get('ok') or r.get('failed')]}
+
+def print_summary(summary):
+    print(f"\n📊 Bulk run: {summary['artists']} artist(s) in {summary['elapsed']:.0f}s with {summary['workers']} worker(s)"
+          f" | {summary['per_minute']} artists/min | {summary['ok']} ok, {summary['failed']} failed")
+    for src, st in sorted(summary['sources'].items()):
+        if st['count']:
+            print(f"   {src:<10} {st['count']:>4} runs | avg {st['avg']:.1f}s | p95 {st['p95']:.1f}s | max {st['max']:.1f}s | {st['failed']} failed")
+    for f in summary['failures'][:20]:
+        print(f"   ⚠️ {f['artist']}: {', '.join(f['failed'] or []) or f['error']}")
+    if len(summary['failures']) > 20: print(f"   ... and {len(summary['failures']) - 20} more")
+
+def refresh_bulk_parallel(artist_names=None, workers=BULK_WORKERS, sources=None, force_resolve=False):
+    """Refresh many artists across `workers` processes, each with its own browser.
+
+    Artists default to the whole ARTISTS table, least recently updated first. Returns the run summary.
+    """
+    import multiprocessing
+    names = artist_names or [r['name'] for r in db.query("SELECT name FROM ARTISTS ORDER BY updated_at")]
+    tasks = [(name, sources, force_resolve) for name in names]
+    workers = max(1, min(workers, len(tasks) or 1))
+    print(f"🚀 Bulk refresh of {len(tasks)} artist(s) with {workers} worker process(es)...")
+
+    results = []
+    start = time.time()
+    pool = multiprocessing.get_context('spawn').Pool(workers, initializer=_bulk_init)
+    try:
+        for i, res in enumerate(pool.imap_unordered(_bulk_task, tasks), 1):
+            results.append(res)
+            mark = '✅' if res.get('ok') and not res.get('failed') else ('⚠️' if res.get('ok') else '❌')
+            print(f"{mark} [{i}/{len(tasks)}] {res['artist']:<28} {res['elapsed']:>6.1f}s (worker {res['worker']})")
+        pool.close()
+    except KeyboardInterrupt:
+        print("🛑 Interrupted; summarising what finished")
+        pool.terminate()
+    finally:
+        pool.join()
+
+    summary = summarize(results, time.time() - start, workers)
+    print_summary(summary)
+    return summary
+
+# --- RECOVERY (open failures in the scrape ledger) ---
+RECOVERY_WORKERS = int(os.environ.get('RECOVERY_WORKERS', 4))
+RECOVERY_BATCH = int(os.environ.get('RECOVERY_BATCH', 10))  # ledger rows a worker claims at a time
+
+# ledger metric: (source, profile method that re-scrapes just that metric, {ARTISTS column: profile attribute})
+RECOVER = {
+    'instagram_followers': ('instagram', 'get_all', {'instagram_followers': 'follower_count'}),
+    'twitter_followers': ('twitter', 'get_all', {'twitter_followers': 'follower_count'}),
+    'spotify_followers': ('spotify', 'get_followers', {'spotify_followers': 'followers', 'spotify_popularity': 'popularity',
+                                                       'spotify_genre': 'genre'}),
+    'spotify_listeners': ('spotify', 'get_listeners', {'spotify_listeners': 'listens'}),
+    'stubhub_favourites': ('stubhub', 'get_all', {'stubhub_favourites': 'favourites'}),
+}
+
+def recover_artist(artist_name, row, fails):
+    """Re-run only the failed metrics in `fails` (claimed scrape_ledger rows) for one artist,
+    save what came back, then resolve or hand back each row. Returns (recovered, still missing)."""
+    start = time.time()
+    classes = {source: cls for source, cls, col, label in SOURCES}
+    handles = {source: col for source, cls, col, label in SOURCES}
+    profiles, values = {}, {}
+    for metric in dict.fromkeys(f['metric'] for f in fails):
+        if metric not in RECOVER: continue
+        source, method, columns = RECOVER[metric]
+        try:
+            if source not in profiles:
+                profiles[source] = getattr(scrapers, classes[source])(artist_name, row.get(handles[source]))
+            getattr(profiles[source], method)()
+        except Exception as e:
+            print(f"{source.capitalize()} Error: {e}")
+        for col, attr in columns.items():
+            v = scrapers.clean_for_mysql(getattr(profiles.get(source), attr, None))
+            if v: values[col] = v
+    # Saved before the rows are resolved, so a crash never loses a value the ledger thinks is fixed
+    if values: metric_writer.put(artist_name, values)
+
+    fixed, missing = [], []
+    for f in fails:
+        if values.get(f['metric']):
+            scrape_ledger.resolve(f)
+            fixed.append(f['metric'])
+        else:
+            scrape_ledger.fail(f)
+            missing.append(f['metric'])
+    elapsed = time.time() - start
+    if not missing:
+        print(f"✅ [RECOVERED] {artist_name:<25} | {elapsed:.1f}s | Fixed: {', '.join(fixed)}")
+    else:
+        print(f"⚠️ [PARTIAL] {artist_name:<27} | {elapsed:.1f}s | Still Missing: {', '.join(missing)}")
+    return len(fixed), len(missing)
+
+def recover_failures(workers=RECOVERY_WORKERS, limit=None, platform=None):
+    """Recovery mode: re-scrape the open failures in the scrape ledger with `workers` threads.
+
+    Each thread claims RECOVERY_BATCH rows at a time and works on its own leased browser. Every
+    artist is saved and its rows resolved as soon as it finishes, so the ledger is the checkpoint:
+    the run heartbeats its claims, and once a crashed run's claims go stale they are reopened
+    and the next run carries on from there.
+    Returns {'claimed', 'recovered', 'remaining', 'elapsed'}.
+    """
+    scrape_ledger.import_csv()
+    reopened = scrape_ledger.release_stale()
+    if reopened: print(f"♻️ Reopened {reopened} failure(s) left claimed by a crashed run")
+    counts = scrape_ledger.counts()
+    if counts.get('claimed'):
+        print(f"⏳ {counts['claimed']} failure(s) claimed by another run; they reopen if it stops heartbeating")
+    outstanding = counts.get('open', 0)
+    stats = {'claimed': 0, 'recovered': 0, 'remaining': 0, 'elapsed': 0}
+    if not outstanding:
+        print("✨ No failures to process.")
+        return stats
+    workers = max(1, min(workers, outstanding))
+    print(f"📊 {outstanding} outstanding failure(s); recovering with {workers} worker(s)...")
+    scrapers.set_globals(None, gemini_model(), spotify_headers())
+
+    lock = threading.Lock()
+    start = time.time()
+    run = scrape_ledger.new_run()
+    stop = threading.Event()
+
+    def beat():
+        # Keeps this run's claims from being handed out again while it is alive
+        while not stop.wait(scrape_ledger.HEARTBEAT):
+            try: scrape_ledger.heartbeat(run)
+            except Exception as e: print(f"⚠️ Ledger heartbeat failed: {e}")
+
+    def work():
+        pool = driver_pool.get_pool()
+        with scrapers.thread_driver(pool.acquire, pool.release):
+            while True:
+                with lock:
+                    n = RECOVERY_BATCH if not limit else min(RECOVERY_BATCH, limit - stats['claimed'])
+                    claimed = scrape_ledger.claim(n, worker=run, platform=platform) if n > 0 else []
+                    stats['claimed'] += len(claimed)
+                if not claimed: return
+                by_artist = {}
+                for f in claimed: by_artist.setdefault(f['artist'], []).append(f)
+                rows = {r['name']: r for r in load_rows(list(by_artist))}
+                for name, fails in by_artist.items():
+                    fixed, missing = 0, len(fails)
+                    try:
+                        if name in rows:
+                            fixed, missing = recover_artist(name, rows[name], fails)
+                        else:
+                            print(f"⚠️ {name} not in DB. Skipping.")
+                            for f in fails: scrape_ledger.fail(f)
+                    except Exception as e:
+                        print(f"❌ [FAILED] {name}: {e}")
+                        for f in fails:
+                            try: scrape_ledger.fail(f)
+                            except: pass
+                    with lock:
+                        stats['recovered'] += fixed
+                        stats['remaining'] += missing
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for fut in [ex.submit(work) for _ in range(workers)]:
+                try: fut.result()
+                except Exception as e: print(f"❌ Recovery worker stopped: {e}")
+    finally:
+        stop.set()
+    stats['elapsed'] = round(time.time() - start, 1)
+    if stats['remaining']:
+        print(f"\n📁 Recovered {stats['recovered']} metric(s) in {stats['elapsed']:.0f}s; "
+              f"{stats['remaining']} handed back to the ledger.")
+    else:
+        print(f"\n✨ ALL FAILURES RECOVERED! ({stats['recovered']} metric(s) in {stats['elapsed']:.0f}s)")
+    return stats
+
+def _opt(args, flag, default=None):
+    """Pop `flag value` from args."""
+    if flag in args:
+        i = args.index(flag)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
+    # --reresolve: ignore stored/cached handles and look them up again
+    force_resolve = '--reresolve' in sys.argv
+    sys.argv = [a for a in sys.argv if a != '--reresolve']
+    if len(sys.argv) > 1 and sys.argv[1] == 'bulk':
+        # Parallel bulk refresh: python3 api_scraper.py bulk [names_file] [--workers N] [--sources a,b] [--summary out.json]
+        args = sys.argv[2:]
+        workers = int(_opt(args, '--workers', BULK_WORKERS))
+        sources = [s for s in (_opt(args, '--sources') or '').split(',') if s] or None
+        if sources and not set(sources) <= {'instagram', 'twitter', 'spotify', 'stubhub'}:
+            sys.exit(f"Unknown source in {','.join(sources)}; use instagram, twitter, spotify, stubhub")
+        summary_path = _opt(args, '--summary')
+        names = None
+        if args:
+            with open(args[0]) as f: names = [l.strip() for l in f if l.strip()]
+        summary = refresh_bulk_parallel(names, workers, sources, force_resolve)
+        if summary_path:
+            with open(summary_path, 'w') as f: json.dump(summary, f, indent=2)
+            print(f"📁 Saved run summary to {summary_path}")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'recover':
+        # Retry the scrape ledger's open failures: python3 api_scraper.py recover [--workers N] [--limit N] [--platform p]
+        args = sys.argv[2:]
+        recover_failures(int(_opt(args, '--workers', RECOVERY_WORKERS)), int(_opt(args, '--limit', 0)) or None,
+                         _opt(args, '--platform'))
+    elif len(sys.argv) > 1 and sys.argv[1] == '--fast':
+        # Batch fast path: python3 api_scraper.py --fast [names_file]  (one artist per line; default: all)
+        names = None
+        if len(sys.argv) > 2:
+            with open(sys.argv[2]) as f: names = [l.strip() for l in f if l.strip()]
+        refresh_fast(names)
+    elif len(sys.argv) > 2:
         # Column-specific refresh: python3 api_scraper.py <artist_name> <source>
         source = sys.argv[-1].lower()
         artist_name = " ".join(sys.argv[1:-1])
         if source in ['instagram', 'twitter', 'spotify', 'stubhub']:
-            refresh_artist_column(artist_name, source)
+            refresh_artist_column(artist_name, source, force_resolve=force_resolve)
         else:
-            refresh_artist(" ".join(sys.argv[1:]))
+            refresh_artist(" ".join(sys.argv[1:]), force_resolve)
     elif len(sys.argv) > 1:
-        refresh_artist(" ".join(sys.argv[1:]))
+        refresh_artist(" ".join(sys.argv[1:]), force_resolve)
     else:
-        print("Usage: python3 api_scraper.py <artist_name> [source]")
+        print("Usage: python3 api_scraper.py <artist_name> [source] [--reresolve]")
+        print("       python3 api_scraper.py --fast [names_file]")
+        print("       python3 api_scraper.py bulk [names_file] [--workers N] [--sources a,b] [--summary out.json]")
+        print("       python3 api_scraper.py recover [--workers N] [--limit N] [--platform p]")
+    print_wait_stats()
@@ -1,46 +1,163 @@
-from flask import Flask, jsonify, request
-import mysql.connector
-import json
+from flask import Flask, Response, g, jsonify, request
 import os
-import subprocess
+import time
+import threading
 from datetime import datetime
+import db
+import job_queue
+import change_feed
+import artist_query
+import response_cache
+import metrics_history
+import metrics
 
 app = Flask(__name__, static_folder='static', static_url_path='')
+metrics.register_collector(job_queue.queue_gauges)
 
-def load_creds(path):
-    if os.path.exists(path):
-        with open(path, 'r') as f: return json.load(f)
-    return {}
+_started = False
+_start_lock = threading.Lock()
 
-def get_db_conn():
-    db_creds = load_creds('postgres_credentials.json')
-    creds = {k: (v.strip() if isinstance(v, str) else v) for k, v in db_creds.items()}
-    if 'sslmode' in creds: del creds['sslmode']
-    return mysql.connector.connect(**creds)
+def start_background():
+    """ARTISTS index check, job workers and the (opt-in) staleness scheduler, once per serving process."""
+    global _started
+    with _start_lock:
+        if _started: return
+        _started = True
+    try:
+        created = artist_query.ensure_indexes()
+        if created: print(f"🗂️ Created ARTISTS indexes on: {', '.join(created)}")
+    except Exception as e:
+        print(f"⚠️ Could not check ARTISTS indexes: {e}")
+    job_queue.start_workers()
+    if os.environ.get('STALENESS_SCHEDULER') == '1':
+        import staleness_scheduler
+        staleness_scheduler.start()
+
+@app.before_request
+def start_timer():
+    # Servers that import the app (gunicorn, waitress, flask run) start it on the first request
+    if not _started: start_background()
+    g.started = time.time()
+
+@app.after_request
+def record_request(resp):
+    if 'started' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_seconds', time.time() - g.started, endpoint=endpoint, method=request.method)
+        metrics.inc('http_requests_total', endpoint=endpoint, method=request.method, status=resp.status_code)
+    return resp
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
     return app.send_static_file('index.html')
 
+def cached_json(build):
+    """Serve build() -> (payload, headers) through the response cache, with ETag/304 and compression."""
+    def render():
+        payload, headers = build()
+        return app.json.dumps(payload).encode(), headers
+    entry = response_cache.get((request.path, request.query_string), response_cache.table_version(), render)
+    encoding = response_cache.pick_encoding(request.headers.get('Accept-Encoding'), len(entry['body']))
+    etag = entry['etag'] if encoding is None else f"{entry['etag'][:-1]}-{encoding}\""
+    headers = {**entry['headers'], 'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if response_cache.etag_matches(request.headers.get('If-None-Match'), entry['etag']):
+        return Response(status=304, headers=headers)
+    resp = Response(response_cache.encoded_body(entry, encoding), mimetype='application/json', headers=headers)
+    if encoding: resp.headers['Content-Encoding'] = encoding
+    return resp
+
 @app.route('/api/artists', methods=['GET'])
 def get_artists():
-    try:
-        conn = get_db_conn()
-        with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM ARTISTS ORDER BY updated_at DESC")
-            rows = cur.fetchall()
-        conn.close()
-        
+    # Any paging parameter switches to server-side paging: {"items": [...], "next_cursor": ...}
+    if any(k in request.args for k in ('limit', 'cursor', 'sort', 'dir', 'q', 'fields')):
+        return get_artists_page()
+
+    def build():
+        rows = db.query("SELECT * FROM ARTISTS ORDER BY updated_at DESC")
+
         # Format timestamps for JSON
         for row in rows:
-            if row['updated_at']:
-                row['updated_at'] = row['updated_at'].strftime('%Y-%m-%d %H:%M:%S')
-                
-        return jsonify(rows)
+            change_feed.format_row(row)
+
+        # Where the change feed should pick up from after this full load
+        return rows, {'X-Change-Cursor': change_feed.cursor_for(rows)}
+
+    try:
+        return cached_json(build)
     except Exception as e:
         print(f"❌ Database error: {e}")
         return jsonify({"error": f"Database connection failed: {str(e)}"}), 500
 
+def get_artists_page():
+    args = request.args
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()] or None
+
+    def build():
+        rows, next_cursor = artist_query.page(limit=args.get('limit'), cursor=args.get('cursor'),
+                                              sort=args.get('sort', 'updated_at'), direction=args.get('dir', 'desc'),
+                                              prefix=args.get('q'), fields=fields)
+        for row in rows:
+            change_feed.format_row(row)
+        return {"items": rows, "next_cursor": next_cursor}, {}
+
+    try:
+        return cached_json(build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": f"Database connection failed: {str(e)}"}), 500
+
+@app.route('/api/artists/changes', methods=['GET'])
+def get_artist_changes():
+    def build():
+        rows, deleted, cursor = change_feed.changes(request.args.get('since'))
+        return {"rows": rows, "deleted": deleted, "cursor": cursor}, {}
+
+    try:
+        return cached_json(build)
+    except Exception as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": f"Database connection failed: {str(e)}"}), 500
+
+@app.route('/api/artists/stream', methods=['GET'])
+def stream_artist_changes():
+    # EventSource sends Last-Event-ID (our cursor) when it reconnects
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    return Response(change_feed.stream(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    artist = request.args.get('artist')
+    metric = request.args.get('metric', 'spotify_listeners')
+    if not artist:
+        return jsonify({"error": "Artist name required"}), 400
+    if metric not in metrics_history.METRICS:
+        return jsonify({"error": f"Unknown metric: {metric}"}), 400
+    try:
+        end = float(request.args.get('end') or datetime.now().timestamp())
+        start = float(request.args['start']) if request.args.get('start') else end - float(request.args.get('days', 90)) * 86400
+        return jsonify({"artist": artist, "metric": metric, "points": metrics_history.series(artist, metric, start, end)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/growth', methods=['GET'])
+def get_growth():
+    metric = request.args.get('metric', 'spotify_listeners')
+    if metric not in metrics_history.METRICS:
+        return jsonify({"error": f"Unknown metric: {metric}"}), 400
+    try:
+        days = float(request.args.get('days', 30))
+    except ValueError:
+        return jsonify({"error": "days must be a number"}), 400
+    artists = [a for a in request.args.get('artists', '').split(',') if a] or None
+    return jsonify({"metric": metric, "days": days, "artists": metrics_history.growth(metric, days, artists)})
+
 @app.route('/api/refresh', methods=['POST'])
 def refresh_artist():
     data = request.json
@@ -48,20 +165,52 @@ def refresh_artist():
     source = data.get('source')  # Optional: instagram, twitter, spotify, stubhub
     if not artist_name:
         return jsonify({"error": "Artist name required"}), 400
+    if source not in job_queue.SOURCES:
+        source = None
+
+    try:
+        # Queued for the resident refresh workers; an identical job that is still waiting is reused
+        job, created = job_queue.enqueue(artist_name, source)
+        label = f"Refresh {source}" if source else "Refresh"
+        msg = f"{label} triggered for {artist_name}" if created else f"{label} already queued for {artist_name}"
+        return jsonify({"message": msg, "job_id": job['id'], "status": job['status']}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+@app.route('/api/refresh/bulk', methods=['POST'])
+def refresh_bulk():
+    data = request.json or {}
+    names = [n for n in (data.get('artists') or []) if isinstance(n, str) and n.strip()]
+    if not names:
+        return jsonify({"error": "Artist names required"}), 400
+    sources = data.get('sources')
+    if sources is not None and (not isinstance(sources, list) or any(s not in job_queue.SOURCES for s in sources)):
+        return jsonify({"error": f"Sources must be a list of: {', '.join(job_queue.SOURCES)}"}), 400
+
+    try:
+        # One job for the whole run; its per-artist progress streams as 'job' events
+        job = job_queue.enqueue_bulk(names, sources)
+        return jsonify({"message": f"Bulk refresh queued for {len(job['payload']['artists'])} artist(s)",
+                        "job_id": job['id'], "status": job['status'], "progress": job['progress']}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
     try:
-        # Run the scraper script in the background
-        # Note: In a production environment, this should be a task queue (e.g. Celery)
-        # For this demo, we'll run it and return success immediately if it starts
-        if source and source in ['instagram', 'twitter', 'spotify', 'stubhub']:
-            subprocess.Popen(['python3', 'api_scraper.py', artist_name, source])
-            return jsonify({"message": f"Refresh {source} triggered for {artist_name}"}), 202
-        else:
-            subprocess.Popen(['python3', 'api_scraper.py', artist_name])
-            return jsonify({"message": f"Refresh triggered for {artist_name}"}), 202
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        return jsonify({"jobs": job_queue.list_jobs(request.args.get('status'), limit),
+                        "counts": job_queue.counts()})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
 @app.route('/api/update_artist', methods=['POST'])
 def update_artist():
     data = request.json
@@ -99,11 +248,8 @@ def update_artist():
     q = f"UPDATE ARTISTS SET {', '.join(update_parts)}, updated_at = CURRENT_TIMESTAMP WHERE name = %s"
     
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute(q, tuple(params))
-            conn.commit()
-        conn.close()
+        db.execute(q, tuple(params))
+        response_cache.invalidate()
         return jsonify({"message": "Artist updated successfully"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -116,14 +262,36 @@ def delete_artist():
         return jsonify({"error": "Artist name required"}), 400
 
     try:
-        conn = get_db_conn()
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM ARTISTS WHERE name = %s", (artist_name,))
-            conn.commit()
-        conn.close()
+        db.execute("DELETE FROM ARTISTS WHERE name = %s", (artist_name,))
+        change_feed.record_delete(artist_name)
+        response_cache.invalidate()
         return jsonify({"message": f"Deleted {artist_name}"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/schedule', methods=['GET'])
+def get_schedule():
+    # What the staleness scheduler would refresh next (nothing is queued)
+    import staleness_scheduler
+    try:
+        limit = min(int(request.args.get('limit', 50)), 1000)
+        return jsonify({"budget_left": max(0, staleness_scheduler.BUDGET_PER_HOUR - staleness_scheduler.spent_last_hour()),
+                        "targets": staleness_scheduler.plan(budget=limit)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/db_pool', methods=['GET'])
+def db_pool():
+    return jsonify(db.pool_metrics())
+
+@app.route('/api/rate_limits', methods=['GET'])
+def rate_limits():
+    import rate_limiter
+    return jsonify(rate_limiter.status())
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    debug = os.environ.get('FLASK_DEBUG', '1') != '0'
+    # The debug reloader runs this module twice; only the serving child starts workers
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background()
+    app.run(host='0.0.0.0', port=5001, debug=debug)
@@ -0,0 +1,85 @@
+import json
+import base64
+import db
+
+# Server-side paging for /api/artists: keyset pagination on (sort column, name),
+# name-prefix search and column projection, all backed by (column, name) indexes.
+SORTABLE = ['name', 'updated_at', 'instagram_followers', 'spotify_followers', 'spotify_listeners',
+            'spotify_popularity', 'twitter_followers', 'stubhub_favourites']
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+_columns = None
+
+def artist_columns():
+    global _columns
+    if _columns is None:
+        _columns = [r['Field'] for r in db.query("SHOW COLUMNS FROM ARTISTS")]
+    return _columns
+
+def ensure_indexes():
+    """Create the (column, name) indexes the sort/search paths rely on, skipping ones that exist."""
+    existing = {r['Column_name'] for r in db.query("SHOW INDEX FROM ARTISTS") if r['Seq_in_index'] == 1}
+    created = []
+    for col in SORTABLE:
+        if col in existing or col not in artist_columns(): continue
+        cols = 'name' if col == 'name' else f'{col}, name'
+        db.execute(f"CREATE INDEX idx_artists_{col} ON ARTISTS ({cols})")
+        created.append(col)
+    return created
+
+def encode_cursor(value, name):
+    return base64.urlsafe_b64encode(json.dumps([value, name], default=str).encode()).decode()
+
+def decode_cursor(cursor):
+    value, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return value, name
+
+def _after(col, desc, value, name):
+    """WHERE clause for rows strictly after (value, name). MySQL sorts NULLs first ASC, last DESC."""
+    if col == 'name':
+        return ("name < %s", [name]) if desc else ("name > %s", [name])
+    op = '<' if desc else '>'
+    if value is None:
+        if desc: return (f"({col} IS NULL AND name < %s)", [name])
+        return (f"(({col} IS NULL AND name > %s) OR {col} IS NOT NULL)", [name])
+    clause = f"({col} {op} %s OR ({col} = %s AND name {op} %s)"
+    clause += f" OR {col} IS NULL)" if desc else ")"
+    return clause, [value, value, name]
+
+def page(limit=None, cursor=None, sort='updated_at', direction='desc', prefix=None, fields=None):
+    """One page of ARTISTS. Returns (rows, next_cursor or None)."""
+    if sort not in SORTABLE: raise ValueError(f"Cannot sort by {sort}")
+    desc = str(direction).lower() != 'asc'
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+    cols = artist_columns()
+    if fields:
+        unknown = [f for f in fields if f not in cols]
+        if unknown: raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        # name and the sort column are always needed to build the next cursor
+        select = list(dict.fromkeys(['name', sort] + list(fields)))
+    else:
+        select = cols
+
+    where, params = [], []
+    if prefix:
+        where.append("name LIKE %s")
+        params.append(prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if cursor:
+        clause, p = _after(sort, desc, *decode_cursor(cursor))
+        where.append(clause)
+        params += p
+
+    d = 'DESC' if desc else 'ASC'
+    q = f"SELECT {', '.join(select)} FROM ARTISTS"
+    if where: q += " WHERE " + " AND ".join(where)
+    q += f" ORDER BY {sort} {d}" + ("" if sort == 'name' else f", name {d}") + " LIMIT %s"
+    rows = db.query(q, tuple(params) + (limit + 1,))
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][sort], rows[-1]['name']) if more else None
+    if fields:
+        rows = [{k: r[k] for k in select if k in fields or k == 'name'} for r in rows]
+    return rows, next_cursor
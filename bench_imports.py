@@ -0,0 +1,111 @@
+import os
+import re
+import sys
+import time
+import subprocess
+import statistics
+import local_db
+
+# Cold-start import time for the entry points. Each run imports the module in a fresh
+# interpreter with -X importtime; we keep the median over RUNS plus the heaviest direct
+# dependencies, and record every result so a slow new import shows up against earlier runs.
+TARGETS = ['api_scraper', 'app']
+RUNS = 5
+TOP = 8
+HERE = os.path.dirname(os.path.abspath(__file__))
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('benchmarks')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS import_times (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                module TEXT NOT NULL,
+                median_ms REAL NOT NULL,
+                min_ms REAL NOT NULL,
+                runs INTEGER NOT NULL,
+                heaviest TEXT,
+                ts REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_import_times_module ON import_times (module, ts)")
+        _schema_ready = True
+    return conn
+
+def import_once(module):
+    """Import `module` in a new interpreter.
+
+    Returns (total ms, {direct dependency: cumulative ms}) for the imports the module triggered.
+    """
+    p = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                       cwd=HERE, capture_output=True, text=True)
+    if p.returncode != 0:
+        raise RuntimeError(p.stderr.strip().splitlines()[-1] if p.stderr.strip() else f'exit {p.returncode}')
+    lines = [(len(m.group(3)), m.group(4), int(m.group(2)) / 1000) for m in LINE.finditer(p.stderr)]
+    # Output is post-order: a module's own imports are the deeper-indented lines just above it
+    i = max(i for i, (_, name, _) in enumerate(lines) if name == module)
+    depth, total = lines[i][0], lines[i][2]
+    deps = {}
+    for d, name, ms in reversed(lines[:i]):
+        if d <= depth: break
+        if d == depth + 2: deps[name] = ms
+    return total, deps
+
+def measure(module, runs=RUNS, top=TOP):
+    runs_ms, heavy = [], {}
+    for _ in range(runs):
+        total, deps = import_once(module)
+        runs_ms.append(total)
+        for name, ms in deps.items():
+            heavy.setdefault(name, []).append(ms)
+    heaviest = sorted(((n, statistics.median(v)) for n, v in heavy.items()), key=lambda kv: -kv[1])[:top]
+    return {'module': module, 'median_ms': round(statistics.median(runs_ms), 1), 'min_ms': round(min(runs_ms), 1),
+            'runs': runs, 'heaviest': [(n, round(ms, 1)) for n, ms in heaviest]}
+
+def previous(module):
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT median_ms FROM import_times WHERE module = ? ORDER BY ts DESC LIMIT 1", (module,)).fetchone()
+        return row['median_ms'] if row else None
+    finally:
+        conn.close()
+
+def save(result):
+    conn = get_conn()
+    try:
+        conn.execute("INSERT INTO import_times (module, median_ms, min_ms, runs, heaviest, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                     (result['module'], result['median_ms'], result['min_ms'], result['runs'],
+                      ', '.join(f"{n}={ms}" for n, ms in result['heaviest']), time.time()))
+    finally:
+        conn.close()
+
+def _opt(args, flag, default):
+    return type(default)(args[args.index(flag) + 1]) if flag in args else default
+
+if __name__ == "__main__":
+    # python3 bench_imports.py [module ...] [--runs N] [--max-ms MS] [--no-save]
+    args = sys.argv[1:]
+    runs, max_ms = _opt(args, '--runs', RUNS), _opt(args, '--max-ms', 0.0)
+    modules = [a for i, a in enumerate(args) if not a.startswith('--') and (i == 0 or args[i - 1] not in ('--runs', '--max-ms'))] or TARGETS
+    over = False
+    for module in modules:
+        try:
+            r = measure(module, runs)
+        except RuntimeError as e:
+            print(f"❌ import {module} failed: {e}")
+            over = True
+            continue
+        before = previous(module)
+        delta = f" ({r['median_ms'] - before:+.0f} ms vs last run)" if before is not None else ""
+        print(f"⏱️ {module}: {r['median_ms']:.0f} ms median, {r['min_ms']:.0f} ms best of {runs}{delta}")
+        for name, ms in r['heaviest']:
+            print(f"   {ms:>8.1f} ms  {name}")
+        if '--no-save' not in args: save(r)
+        if max_ms and r['median_ms'] > max_ms:
+            print(f"🐢 {module} is over the {max_ms:.0f} ms budget")
+            over = True
+    sys.exit(1 if over else 0)
@@ -0,0 +1,188 @@
+import sys
+import time
+import statistics
+import tracemalloc
+import local_db
+import replay
+
+# Per-strategy scraper benchmark against the recorded fixtures in fixtures/replay, so it runs
+# offline (and in CI). Each strategy runs RUNS times for wall-clock latency and the time spent
+# parsing HTML, plus once under tracemalloc for peak memory. A strategy fails if it comes back
+# more than TOLERANCE away from the recorded value. Results are kept in the local 'benchmarks'
+# store and compared with the previous run.
+RUNS = 3
+TOLERANCE = 0.05
+MAX_REGRESS = 0.5  # --check fails when a median gets this much slower than last time
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('benchmarks')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scraper_times (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                strategy TEXT NOT NULL,
+                ok INTEGER NOT NULL,
+                median_ms REAL NOT NULL,
+                parse_ms REAL NOT NULL,
+                peak_kb REAL NOT NULL,
+                requests INTEGER NOT NULL,
+                runs INTEGER NOT NULL,
+                ts REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scraper_times_strategy ON scraper_times (strategy, ts)")
+        _schema_ready = True
+    return conn
+
+# --- STRATEGIES ---
+# name: (fn(artist fixture) -> value, expected key or None for a found-handle check, hosts to block)
+def _profile(cls, handle_key, method, attr):
+    def run(a):
+        import scrapers
+        p = getattr(scrapers, cls)(a['name'], a[handle_key])
+        getattr(p, method)()
+        return getattr(p, attr)
+    return run
+
+def _search(query, handle_key):
+    def run(a):
+        import scrapers
+        url = scrapers.get_first_search_result(query.format(**a)) or ''
+        return url if a[handle_key].strip('/').split('/')[0] in url else None
+    return run
+
+def _fast_path(source, column):
+    def run(a):
+        import fast_path
+        import spotify_client
+        results, _ = fast_path.run_batch([dict(a)], [source], headers=spotify_client.get_headers())
+        return results.get(a['name'], {}).get(column)
+    return run
+
+def _stubhub_scrape(a):
+    import scrapers
+    return scrapers.StubhubProfile(a['name'], a['stubhub_url'])._scrape()
+
+def _spotify_search_api(a):
+    import spotify_client
+    return spotify_client.search_artist(a['name'])
+
+ENGINES = ['www.google.com', 'www.bing.com', 'search.yahoo.com']
+
+STRATEGIES = {
+    'instagram:api': (_profile('InstagramProfile', 'instagram_username', '_try_api', 'follower_count'), 'instagram_followers', []),
+    'instagram:specialized': (_profile('InstagramProfile', 'instagram_username', '_try_specialized', 'follower_count'), 'instagram_followers', []),
+    'instagram:selenium': (_profile('InstagramProfile', 'instagram_username', '_try_selenium', 'follower_count'), 'instagram_followers', []),
+    'instagram:gemini': (_profile('InstagramProfile', 'instagram_username', '_try_gemini', 'follower_count'), 'instagram_followers', []),
+    'instagram:chain': (_profile('InstagramProfile', 'instagram_username', 'get_all', 'follower_count'), 'instagram_followers', []),
+    'twitter:verified': (_profile('TwitterProfile', 'twitter_username', '_try_verified', 'follower_count'), 'twitter_followers', []),
+    'twitter:specialized': (_profile('TwitterProfile', 'twitter_username', '_try_specialized', 'follower_count'), 'twitter_followers', []),
+    'twitter:selenium_profile': (_profile('TwitterProfile', 'twitter_username', '_try_selenium_profile', 'follower_count'), 'twitter_followers', []),
+    'twitter:google_snippet': (_profile('TwitterProfile', 'twitter_username', '_try_google_snippet', 'follower_count'), 'twitter_followers', []),
+    'twitter:chain': (_profile('TwitterProfile', 'twitter_username', 'get_all', 'follower_count'), 'twitter_followers', []),
+    'spotify:search_api': (_spotify_search_api, None, []),
+    'spotify:api': (_profile('SpotifyProfile', 'spotify_id', '_try_api', 'followers'), 'spotify_followers', []),
+    'spotify:page': (_profile('SpotifyProfile', 'spotify_id', '_try_page', 'listens'), 'spotify_listeners', []),
+    'spotify:selenium': (_profile('SpotifyProfile', 'spotify_id', '_try_selenium', 'listens'), 'spotify_listeners', []),
+    'spotify:chain': (_profile('SpotifyProfile', 'spotify_id', 'get_all', 'listens'), 'spotify_listeners', []),
+    'stubhub:selenium': (_stubhub_scrape, 'stubhub_favourites', []),
+    'stubhub:chain': (_profile('StubhubProfile', 'stubhub_url', 'get_all', 'favourites'), 'stubhub_favourites', []),
+    'search:google': (_search('instagram {name} official', 'instagram_username'), None, []),
+    'search:bing': (_search('instagram {name} official', 'instagram_username'), None, ['www.google.com']),
+    'search:yahoo': (_search('instagram {name} official', 'instagram_username'), None, ['www.google.com', 'www.bing.com']),
+    'search:twitter': (_search('twitter {name} official', 'twitter_username'), None, []),
+    'search:spotify': (_search('spotify artist {name}', 'spotify_id'), None, []),
+    'search:stubhub': (_search('stubhub {name} tickets performer', 'stubhub_url'), None, []),
+    'fast_path:instagram': (_fast_path('instagram', 'instagram_followers'), 'instagram_followers', []),
+    'fast_path:spotify': (_fast_path('spotify', 'spotify_listeners'), 'spotify_listeners', []),
+}
+
+def _ok(value, expected):
+    if not value: return False
+    if expected is None: return True
+    try: return abs(float(value) - expected) <= expected * TOLERANCE
+    except (TypeError, ValueError): return False
+
+def bench(names=None, runs=RUNS, latency_ms=0, chrome=False):
+    """Run each strategy (all of them, or those named/prefixed in `names`) against the fixtures.
+
+    Returns one {strategy, ok, value, median_ms, min_ms, parse_ms, peak_kb, requests} per strategy.
+    """
+    names = [n for n in STRATEGIES if not names or any(n == x or n.startswith(x.rstrip(':') + ':') for x in names)]
+    results = []
+    with replay.session(latency_ms=latency_ms, chrome=chrome) as rp:
+        artist, expected = rp.manifest['artist'], rp.manifest['expected']
+        for name in names:
+            fn, key, blocked = STRATEGIES[name]
+            rp.server.blocked = set(blocked)
+            times, parses, value = [], [], None
+            hits_before = sum(rp.server.hits.values())
+            for _ in range(runs):
+                parse_before = rp.parse_seconds
+                start = time.perf_counter()
+                try: value = fn(artist)
+                except Exception as e: value = None; print(f"⚠️ {name} raised {e!r}")
+                times.append(time.perf_counter() - start)
+                parses.append(rp.parse_seconds - parse_before)
+            requests = (sum(rp.server.hits.values()) - hits_before) // max(runs, 1)
+            tracemalloc.start()
+            try: fn(artist)
+            except: pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append({'strategy': name, 'ok': _ok(value, expected.get(key) if key else None), 'value': value,
+                            'median_ms': round(statistics.median(times) * 1000, 1), 'min_ms': round(min(times) * 1000, 1),
+                            'parse_ms': round(statistics.median(parses) * 1000, 1), 'peak_kb': round(peak / 1024, 1),
+                            'requests': requests, 'runs': runs})
+        rp.server.blocked = set()
+        if rp.server.misses:
+            print(f"🕳️ {len(rp.server.misses)} request(s) had no fixture, e.g. {rp.server.misses[0]}")
+    return results
+
+def previous():
+    conn = get_conn()
+    try:
+        rows = conn.execute("""SELECT strategy, median_ms FROM scraper_times t WHERE ts = (
+                                   SELECT MAX(ts) FROM scraper_times WHERE strategy = t.strategy)""").fetchall()
+        return {r['strategy']: r['median_ms'] for r in rows}
+    finally:
+        conn.close()
+
+def save(results):
+    now = time.time()
+    conn = get_conn()
+    try:
+        conn.executemany("""INSERT INTO scraper_times (strategy, ok, median_ms, parse_ms, peak_kb, requests, runs, ts)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                         [(r['strategy'], int(r['ok']), r['median_ms'], r['parse_ms'], r['peak_kb'], r['requests'], r['runs'], now)
+                          for r in results])
+    finally:
+        conn.close()
+
+def _opt(args, flag, default):
+    return type(default)(args[args.index(flag) + 1]) if flag in args else default
+
+if __name__ == "__main__":
+    # python3 bench_scrapers.py [strategy or platform ...] [--runs N] [--latency MS] [--chrome] [--no-save] [--check]
+    args = sys.argv[1:]
+    runs, latency = _opt(args, '--runs', RUNS), _opt(args, '--latency', 0)
+    names = [a for i, a in enumerate(args) if not a.startswith('--') and (i == 0 or args[i - 1] not in ('--runs', '--latency'))]
+    results = bench(names, runs, latency, chrome='--chrome' in args)
+    before = previous()
+
+    print(f"{'strategy':<26} {'':2} {'median':>9} {'parse':>8} {'peak':>9} {'reqs':>4}  vs last")
+    failed, slower = [], []
+    for r in results:
+        last = before.get(r['strategy'])
+        delta = f"{(r['median_ms'] - last) / last:+.0%}" if last else ''
+        if last and r['median_ms'] > last * (1 + MAX_REGRESS) and r['median_ms'] - last > 50: slower.append(r['strategy'])
+        if not r['ok']: failed.append(r['strategy'])
+        print(f"{r['strategy']:<26} {'✅' if r['ok'] else '❌'} {r['median_ms']:>7.0f}ms {r['parse_ms']:>6.1f}ms "
+              f"{r['peak_kb']:>7.0f}KB {r['requests']:>4}  {delta}")
+    if '--no-save' not in args: save(results)
+    if failed: print(f"❌ Wrong or missing value from: {', '.join(failed)}")
+    if slower: print(f"🐢 More than {MAX_REGRESS:.0%} slower than last run: {', '.join(slower)}")
+    sys.exit(1 if '--check' in args and (failed or slower) else 0)
@@ -0,0 +1,161 @@
+import json
+import time
+import queue
+import threading
+import db
+import local_db
+import job_queue
+
+# Delta feed over ARTISTS for the dashboard. A cursor is "<max updated_at>|<delete seq>":
+# rows are matched with updated_at >= cursor (second resolution, so boundary rows can repeat
+# and clients must upsert by name); deletes come from the tombstone log in the local
+# 'change_feed' store, shared by every worker process and kept across restarts.
+POLL_SECONDS = 2.0
+HEARTBEAT_SECONDS = 15.0
+MAX_TOMBSTONES = 1000
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('change_feed')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tombstones (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                ts REAL NOT NULL
+            )
+        """)
+        _schema_ready = True
+    return conn
+
+def format_row(row):
+    if row.get('updated_at') and not isinstance(row['updated_at'], str):
+        row['updated_at'] = row['updated_at'].strftime('%Y-%m-%d %H:%M:%S')
+    return row
+
+def record_delete(name):
+    conn = get_conn()
+    try:
+        seq = conn.execute("INSERT INTO tombstones (name, ts) VALUES (?, ?)", (name, time.time())).lastrowid
+        conn.execute("DELETE FROM tombstones WHERE seq <= ?", (seq - MAX_TOMBSTONES,))
+    finally:
+        conn.close()
+
+def _last_seq():
+    conn = get_conn()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM tombstones").fetchone()[0]
+    finally:
+        conn.close()
+
+def _deleted_since(seq):
+    """(names deleted after `seq`, the seq a cursor covering them carries)."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT seq, name FROM tombstones WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+    finally:
+        conn.close()
+    return [r['name'] for r in rows], rows[-1]['seq'] if rows else seq
+
+def parse_cursor(cursor):
+    ts, _, seq = (cursor or '').partition('|')
+    try: seq = int(seq)
+    except: seq = 0
+    return ts or None, seq
+
+def cursor_for(rows):
+    """Cursor covering already-formatted `rows` and every delete logged so far."""
+    newest = max((r['updated_at'] for r in rows if r.get('updated_at')), default='')
+    return f"{newest}|{_last_seq()}"
+
+def changes(cursor=None):
+    """Rows changed and names deleted since `cursor`. Returns (rows, deleted, next_cursor)."""
+    since, seq = parse_cursor(cursor)
+    if since:
+        rows = db.query("SELECT * FROM ARTISTS WHERE updated_at >= %s ORDER BY updated_at", (since,))
+    else:
+        rows = db.query("SELECT * FROM ARTISTS ORDER BY updated_at")
+    rows = [format_row(r) for r in rows]
+    deleted, seq = _deleted_since(seq) if cursor else ([], _last_seq())
+    newest = max((r['updated_at'] for r in rows if r.get('updated_at')), default=since or '')
+    return rows, deleted, f"{newest}|{seq}"
+
+class ChangeHub:
+    """One poller per process that fans artist and job events out to every SSE subscriber."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.cursor = None
+        self.seen = set()  # (name, updated_at) already sent at the cursor's second
+        self.jobs_since = time.time()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=100)
+        with self.lock:
+            self.subscribers.add(q)
+            if self.thread is None:
+                self.cursor = changes()[2]
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def publish(self, event, data, event_id=None):
+        with self.lock:
+            subs = list(self.subscribers)
+        for q in subs:
+            try: q.put_nowait((event, data, event_id))
+            except queue.Full: pass  # slow client; it will resync from its cursor on reconnect
+
+    def _poll(self):
+        rows, deleted, cursor = changes(self.cursor)
+        fresh = [r for r in rows if (r['name'], r.get('updated_at')) not in self.seen]
+        boundary = parse_cursor(cursor)[0]
+        self.seen = {(r['name'], r.get('updated_at')) for r in rows if r.get('updated_at') == boundary}
+        self.cursor = cursor
+        if fresh or deleted:
+            self.publish('artists', {'rows': fresh, 'deleted': deleted, 'cursor': cursor}, cursor)
+        # Claims, bulk-run progress and completions all move a job's updated_at
+        for job in job_queue.changed_since(self.jobs_since):
+            self.jobs_since = max(self.jobs_since, job['updated_at'])
+            self.publish('job', job)
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_SECONDS)
+            with self.lock:
+                if not self.subscribers: continue
+            try: self._poll()
+            except Exception as e: print(f"⚠️ Change feed poll failed: {e}")
+
+hub = ChangeHub()
+
+def sse(event, data, event_id=None):
+    msg = f"event: {event}\n"
+    if event_id: msg += f"id: {event_id}\n"
+    return msg + f"data: {json.dumps(data, default=str)}\n\n"
+
+def stream(cursor=None):
+    """SSE generator: catch up from `cursor` (if given), then relay hub events with heartbeats."""
+    q = hub.subscribe()
+    try:
+        if cursor:
+            rows, deleted, nxt = changes(cursor)
+            yield sse('artists', {'rows': rows, 'deleted': deleted, 'cursor': nxt}, nxt)
+        else:
+            yield ": connected\n\n"
+        while True:
+            try:
+                event, data, event_id = q.get(timeout=HEARTBEAT_SECONDS)
+                yield sse(event, data, event_id)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+    finally:
+        hub.unsubscribe(q)
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+import mysql.connector
+from mysql.connector import pooling
+import metrics
+
+# One bounded MySQL connection pool per process, shared by the Flask app and the scrapers.
+# Credentials are read from disk once; callers still just get_conn() ... conn.close().
+CREDS_PATH = 'postgres_credentials.json'
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+CHECKOUT_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+_creds = None
+_pool = None
+_slots = threading.BoundedSemaphore(POOL_SIZE)
+_lock = threading.Lock()
+_metrics = {'checkouts': 0, 'waits': 0, 'wait_seconds': 0.0, 'in_use': 0, 'reconnects': 0, 'errors': 0}
+
+def load_creds(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f: return json.load(f)
+    return {}
+
+def get_creds():
+    global _creds
+    if _creds is None:
+        db_creds = load_creds(CREDS_PATH)
+        creds = {k: (v.strip() if isinstance(v, str) else v) for k, v in db_creds.items()}
+        if 'sslmode' in creds: del creds['sslmode']
+        _creds = creds
+    return _creds
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(pool_name=f'artists_{os.getpid()}', pool_size=POOL_SIZE,
+                                                pool_reset_session=True, **get_creds())
+        return _pool
+
+class PooledConnection:
+    """A checked-out pool connection; close() hands it back and frees the slot."""
+
+    def __init__(self, cnx):
+        self._cnx = cnx
+
+    def close(self):
+        if self._cnx is None: return
+        cnx, self._cnx = self._cnx, None
+        try: cnx.close()
+        finally:
+            with _lock: _metrics['in_use'] -= 1
+            _slots.release()
+
+    def __getattr__(self, name):
+        if self._cnx is None: raise mysql.connector.errors.OperationalError('Connection already returned to pool')
+        return getattr(self._cnx, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def get_conn(timeout=CHECKOUT_TIMEOUT):
+    """Check a healthy connection out of the pool, waiting up to `timeout`s for a free slot."""
+    start = time.time()
+    waited = not _slots.acquire(blocking=False)
+    if waited and not _slots.acquire(timeout=timeout):
+        with _lock: _metrics['errors'] += 1
+        raise mysql.connector.errors.PoolError(f'No free database connection after {timeout}s')
+    try:
+        cnx = _get_pool().get_connection()
+        try:
+            cnx.ping(reconnect=False)
+        except:
+            # Stale socket (server restart, wait_timeout): reconnect in place
+            cnx.reconnect(attempts=2, delay=0.5)
+            with _lock: _metrics['reconnects'] += 1
+    except:
+        _slots.release()
+        with _lock: _metrics['errors'] += 1
+        raise
+    with _lock:
+        _metrics['checkouts'] += 1
+        _metrics['in_use'] += 1
+        if waited:
+            _metrics['waits'] += 1
+            _metrics['wait_seconds'] += time.time() - start
+    return PooledConnection(cnx)
+
+def query(sql, params=None, one=False):
+    """Run a SELECT on a pooled connection and return dict rows (or the first row with one=True)."""
+    with metrics.timer('db_query_seconds', op='query'):
+        conn = get_conn()
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                cur.execute(sql, params or ())
+                return cur.fetchone() if one else cur.fetchall()
+        except:
+            metrics.inc('db_errors_total', op='query')
+            raise
+        finally:
+            conn.close()
+
+def execute(sql, params=None):
+    """Run a write on a pooled connection, commit, and return the affected row count."""
+    with metrics.timer('db_query_seconds', op='execute'):
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params or ())
+                conn.commit()
+                return cur.rowcount
+        except:
+            metrics.inc('db_errors_total', op='execute')
+            raise
+        finally:
+            conn.close()
+
+def pool_metrics():
+    with _lock:
+        return {**_metrics, 'size': POOL_SIZE, 'created': _pool is not None}
@@ -0,0 +1,197 @@
+import os
+import re
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+# Warm headless Chrome instances shared by every scrape in this process.
+# A browser is recycled after MAX_PAGES page loads or as soon as it fails a health check.
+POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 4))  # a ceiling: browsers launch on first lease
+MAX_PAGES = int(os.environ.get('DRIVER_MAX_PAGES', 200))
+# Titles of the error pages sites serve when they throttle us (webdriver exposes no status code)
+BLOCKED_TITLE = re.compile(r'\b429\b|too many requests|rate limit|access denied|\b403\b|forbidden', re.I)
+
+def chrome_options():
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    # Check for Chromium binary (Docker)
+    if os.environ.get('CHROME_BIN'):
+        options.binary_location = os.environ.get('CHROME_BIN')
+    return options
+
+def new_driver():
+    from selenium import webdriver
+    return webdriver.Chrome(options=chrome_options())
+
+class PooledDriver:
+    """Proxy around a webdriver that counts page loads and paces them through rate_limiter;
+    everything else is delegated."""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.pages = 0
+        self.broken = False
+        self.created_at = time.time()
+
+    def get(self, url):
+        import rate_limiter
+        import metrics
+        self.pages += 1
+        with rate_limiter.limit(url) as slot:
+            start = time.time()
+            try:
+                result = self._driver.get(url)
+            except Exception as e:
+                msg = str(e).lower()
+                if 'invalid session' in msg or 'disconnected' in msg or 'session deleted' in msg:
+                    self.broken = True
+                raise
+            finally:
+                metrics.observe('browser_page_load_seconds', time.time() - start, site=slot.domain)
+            try: slot.status = 429 if BLOCKED_TITLE.search(self._driver.title or '') else 200
+            except: pass
+            if slot.status == 429: metrics.inc('browser_blocked_total', site=slot.domain)
+            return result
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+class DriverPool:
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES, factory=new_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self.stats = {'launched': 0, 'recycled': 0, 'crashed': 0, 'leases': 0}
+
+    def _launch(self):
+        try:
+            d = PooledDriver(self.factory())
+        except:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        self.stats['launched'] += 1
+        return d
+
+    def _replace(self, d):
+        """Swap a dead browser for a new one, keeping its slot in the pool."""
+        self.stats['crashed'] += 1
+        try: d.quit()
+        except: pass
+        return self._launch()
+
+    def _discard(self, d, reason):
+        self.stats[reason] += 1
+        try: d.quit()
+        except: pass
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _healthy(d):
+        if d.broken: return False
+        try:
+            d.execute_script('return 1')
+            return True
+        except:
+            return False
+
+    @staticmethod
+    def _reset(d):
+        """Give the lease a fresh tab with no cookies left over from the previous scrape."""
+        old = list(d.window_handles)
+        d.switch_to.new_window('tab')
+        fresh = d.current_window_handle
+        for h in old:
+            d.switch_to.window(h)
+            d.close()
+        d.switch_to.window(fresh)
+        try: d.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except: d.delete_all_cookies()
+
+    def acquire(self, timeout=None):
+        deadline = time.time() + timeout if timeout else None
+        with self._cond:
+            while True:
+                if self._idle:
+                    d = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    d = None
+                    break
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError('No browser available in the driver pool')
+                self._cond.wait(remaining)
+        if d is None:
+            d = self._launch()
+        elif not self._healthy(d):
+            d = self._replace(d)
+        try:
+            self._reset(d)
+        except:
+            # A browser that cannot open a tab is as good as dead; replace it once
+            d = self._replace(d)
+        self.stats['leases'] += 1
+        return d
+
+    def release(self, d):
+        if not self._healthy(d):
+            self._discard(d, 'crashed')
+        elif d.pages >= self.max_pages:
+            self._discard(d, 'recycled')
+        else:
+            with self._cond:
+                self._idle.append(d)
+                self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        d = self.acquire(timeout)
+        try:
+            yield d
+        finally:
+            self.release(d)
+
+    def warm(self, n=1):
+        """Launch browsers ahead of the first scrape so it pays no startup cost."""
+        for _ in range(min(n, self.size)):
+            with self._cond:
+                if self._created >= self.size: return
+                self._created += 1
+            d = self._launch()
+            with self._cond:
+                self._idle.append(d)
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for d in idle:
+            try: d.quit()
+            except: pass
+            with self._cond: self._created -= 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
+
+def lease(timeout=None):
+    return get_pool().lease(timeout)
@@ -0,0 +1,109 @@
+import os
+import asyncio
+import contextvars
+import httpx
+import scrapers
+import spotify_client
+import resolve_cache
+import rate_limiter
+import metrics
+
+# Browser-free strategies (Instagram app API, Spotify Web API, open.spotify.com
+# og:description) run for many artists at once. Anything they cannot answer is
+# reported back as (artist, source) so only those get a Selenium scrape.
+CONCURRENCY = int(os.environ.get('FAST_PATH_CONCURRENCY', 32))
+HTTP_SOURCES = ['instagram', 'spotify']
+
+_limited = contextvars.ContextVar('fast_path_limited', default=None)  # {domain: requests} per batch
+
+async def _get(client, sem, url, **kwargs):
+    # The rate-limit token comes first: a request waiting on its domain must not hold a slot
+    # other domains could use right now
+    try:
+        async with rate_limiter.alimit(url) as slot:
+            async with sem:
+                return slot.record(await client.get(url, timeout=10, **kwargs))
+    except rate_limiter.RateLimited:
+        domain = rate_limiter.domain_of(url)
+        metrics.inc('fast_path_rate_limited_total', domain=domain)
+        limited = _limited.get()
+        if limited is not None: limited[domain] = limited.get(domain, 0) + 1
+        raise
+
+async def _instagram(client, sem, username):
+    if not username: return None
+    try:
+        r = await _get(client, sem, scrapers.ig_api_url(username), headers=scrapers.IG_APP_HEADERS)
+        if r.status_code == 200:
+            return scrapers.parse_ig_api(r.json()) or None
+    except: pass
+    return None
+
+async def _spotify_id(client, sem, sp, headers):
+    hit, cached = resolve_cache.lookup('spotify', sp.artist)
+    if hit:
+        sp.spotifyID = cached
+        return
+    try:
+        r = await _get(client, sem, scrapers.spotify_search_url(sp.artist), headers=headers)
+        if r.status_code == 200:
+            sp.spotifyID = scrapers.parse_spotify_search(r.json())
+            # Only API hits are cached here; misses still get the search-engine lookup in the browser path
+            if sp.spotifyID: resolve_cache.store('spotify', sp.artist, sp.spotifyID)
+    except: pass
+
+async def _spotify_listeners(client, sem, sp):
+    try:
+        r = await _get(client, sem, sp.page_url(), headers={'User-Agent': 'Mozilla/5.0'}, follow_redirects=True)
+        sp.listens = scrapers.parse_monthly_listeners(r.content)
+    except: pass
+
+async def _spotify(client, sem, rows, headers):
+    profiles = [scrapers.SpotifyProfile(r['name'], r.get('spotify_id')) for r in rows]
+    if headers:
+        await asyncio.gather(*[_spotify_id(client, sem, sp, headers) for sp in profiles if not sp.spotifyID])
+    found = [sp for sp in profiles if sp.spotifyID]
+    if headers and found:
+        # One /v1/artists?ids= call per 50 artists instead of one call each
+        api = await spotify_client.aget_artists(client, [sp.spotifyID for sp in found])
+        for sp in found:
+            if sp.spotifyID in api: sp.apply_api(api[sp.spotifyID])
+    await asyncio.gather(*[_spotify_listeners(client, sem, sp) for sp in found])
+    return profiles
+
+async def run_batch_async(rows, sources=None, headers=None, concurrency=CONCURRENCY):
+    sources = sources or ['instagram', 'twitter', 'spotify', 'stubhub']
+    headers = headers or {}
+    sem = asyncio.Semaphore(concurrency)
+    limited = {}
+    _limited.set(limited)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results, pending = {}, []
+    async with httpx.AsyncClient(limits=limits) as client:
+        if 'instagram' in sources:
+            counts = await asyncio.gather(*[_instagram(client, sem, r.get('instagram_username')) for r in rows])
+            for r, count in zip(rows, counts):
+                if count: results.setdefault(r['name'], {})['instagram_followers'] = count
+                else: pending.append((r['name'], 'instagram'))
+        if 'spotify' in sources:
+            known = {r['name']: r.get('spotify_id') for r in rows}
+            for sp in await _spotify(client, sem, rows, headers):
+                values = results.setdefault(sp.artist, {})
+                if sp.spotifyID and not known.get(sp.artist): values['spotify_id'] = sp.spotifyID
+                if sp.followers: values['spotify_followers'] = sp.followers
+                if sp.popularity: values['spotify_popularity'] = sp.popularity
+                if sp.listens: values['spotify_listeners'] = sp.listens
+                else: pending.append((sp.artist, 'spotify'))
+    for r in rows:
+        pending += [(r['name'], s) for s in sources if s not in HTTP_SOURCES]
+    if limited:
+        print(f"🚦 Fast path: {sum(limited.values())} request(s) gave up waiting on the rate limiter "
+              f"({', '.join(f'{d}: {n}' for d, n in sorted(limited.items()))}); those artists go to the browser path")
+    return {k: v for k, v in results.items() if v}, pending
+
+def run_batch(rows, sources=None, headers=None, concurrency=CONCURRENCY):
+    """Scrape the HTTP-only strategies for `rows` (ARTISTS dicts) concurrently.
+
+    Returns ({name: {column: value}}, [(name, source) still needing a browser]).
+    """
+    return asyncio.run(run_batch_async(rows, sources, headers, concurrency))
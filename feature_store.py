@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+import hashlib
+import json
+import local_db
+
+# Events + socials feature matrix for the price model, cached as Parquet under
+# <LOCAL_DATA_DIR>/features. Each sheet a caller asks for is copied to Parquet once per change
+# of the .xlsx (Excel parsing is the slow part), and the matrix keeps a hash of the event
+# row and of the artist's socials behind each of its rows: a build only merges the rows
+# whose hashes are new, reuses the rest and drops those whose source rows went away.
+WORKBOOK = os.environ.get('TICKET_SALES_XLSX', os.path.join('..', '..', 'Documents', 'Ticket Sales.xlsx'))
+SHEETS = ['Events', 'Embrace', 'TicketWeb', 'Socials']
+SOCIALS = ['instagram_followers', 'twitter_followers', 'spotify_followers', 'spotify_popularity',
+           'spotify_listeners', 'stubhub_favourites']
+REQUIRED = ['spotify_followers', 'spotify_popularity', 'spotify_listeners', 'instagram_followers']  # must be > 0
+COLUMNS = ['Artist', 'Venue', 'Location', 'Date', 'Min Cost', 'Max Resell', 'Margin', *SOCIALS]
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('feature_store')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sheet_copies (
+                workbook TEXT NOT NULL,
+                sheet TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                mixed TEXT NOT NULL,
+                ts REAL NOT NULL,
+                PRIMARY KEY (workbook, sheet)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS builds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                socials TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                reused INTEGER NOT NULL,
+                rebuilt INTEGER NOT NULL,
+                dropped INTEGER NOT NULL,
+                seconds REAL NOT NULL,
+                ts REAL NOT NULL
+            )
+        """)
+        _schema_ready = True
+    return conn
+
+def store_dir():
+    path = os.path.join(local_db.DATA_DIR, 'features')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def matrix_path(socials='artists'):
+    return os.path.join(store_dir(), f'matrix_{socials}.parquet')
+
+def _write(df, path):
+    # Written aside and renamed, so a reader never sees half a file
+    df.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+
+# --- SHEETS ---
+def sheet_path(workbook, sheet):
+    tag = hashlib.sha1(os.path.abspath(workbook).encode()).hexdigest()[:8]
+    return os.path.join(store_dir(), f"sheet_{tag}_{sheet.replace(' ', '_')}.parquet")
+
+def _storable(df):
+    """(frame, columns stored as text): object columns Parquet cannot hold (numbers mixed with
+    text) become text, every other column keeps the dtype read_excel gave it."""
+    import pyarrow as pa
+    df = df.rename(columns=str)
+    mixed = []
+    for c in df.columns:
+        if df[c].dtype != object: continue
+        try: pa.array(df[c], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+            mixed.append(c)
+    return df, mixed
+
+def load_sheets(workbook=WORKBOOK, sheets=SHEETS):
+    """{sheet: DataFrame} for the given sheets, from the Parquet copies unless the workbook changed
+    since. Only those sheets have to exist in the workbook."""
+    import pandas as pd
+    st = os.stat(workbook)
+    key = os.path.abspath(workbook)
+    conn = get_conn()
+    try:
+        fresh = {r['sheet']: json.loads(r['mixed']) for r in conn.execute(
+                 "SELECT sheet, mtime, size, mixed FROM sheet_copies WHERE workbook = ?", (key,))
+                 if r['mtime'] == st.st_mtime and r['size'] == st.st_size}
+    finally:
+        conn.close()
+    stale = [s for s in sheets if s not in fresh or not os.path.exists(sheet_path(workbook, s))]
+    # Mixed columns go back to object, as read_excel returns them
+    out = {s: pd.read_parquet(sheet_path(workbook, s)).astype({c: object for c in fresh[s]}) for s in sheets if s not in stale}
+    if not stale: return out
+
+    start = time.time()
+    parsed = pd.read_excel(workbook, sheet_name=stale)  # one open of the file for every stale sheet
+    conn = get_conn()
+    try:
+        for s, df in parsed.items():
+            stored, mixed = _storable(df)
+            _write(stored, sheet_path(workbook, s))
+            conn.execute("INSERT OR REPLACE INTO sheet_copies (workbook, sheet, mtime, size, mixed, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, s, st.st_mtime, st.st_size, json.dumps(mixed), time.time()))
+            out[s] = df.rename(columns=str)
+    finally:
+        conn.close()
+    print(f"📗 Parsed {os.path.basename(workbook)} ({', '.join(stale)}) in {time.time() - start:.1f}s")
+    return {s: out[s] for s in sheets}
+
+# --- SOURCES ---
+def events_frame(events):
+    """Events with positive Min Cost/Max Resell, typed, one row per distinct event, keyed by _event_hash."""
+    import pandas as pd
+    ev = events.copy()
+    ev['Min Cost'] = pd.to_numeric(ev['Min Cost'], errors='coerce')
+    ev['Max Resell'] = pd.to_numeric(ev['Max Resell'], errors='coerce')
+    ev = ev[(ev['Min Cost'] > 0) & (ev['Max Resell'] > 0)]
+    ev['_event_hash'] = pd.util.hash_pandas_object(ev, index=False).values
+    ev = ev.drop_duplicates('_event_hash')
+    for c in ('Venue', 'Location'):
+        if c not in ev.columns: ev[c] = None
+    ev['Date'] = pd.to_datetime(ev.get('Date'), errors='coerce')
+    ev['Artist'] = ev['Artist'].astype('string')  # same key dtype as socials_frame
+    return ev[['_event_hash', 'Artist', 'Venue', 'Location', 'Date', 'Min Cost', 'Max Resell']]
+
+def socials_frame(source='artists', sheets=None):
+    """Per-artist socials (from ARTISTS, or the workbook's Socials sheet) with every REQUIRED
+    metric above zero, keyed by _socials_hash."""
+    import pandas as pd
+    if source == 'artists':
+        import db
+        rows = db.query(f"SELECT name, {', '.join(SOCIALS)} FROM ARTISTS")
+        df = pd.DataFrame(rows, columns=['name', *SOCIALS]).rename(columns={'name': 'Artist'})
+    else:
+        df = (sheets or load_sheets(sheets=['Socials']))['Socials']
+        for c in SOCIALS:
+            if c not in df.columns: df[c] = None
+        df = df[['Artist', *SOCIALS]]
+    for c in SOCIALS: df[c] = pd.to_numeric(df[c], errors='coerce').astype('Float64')
+    df = df.astype({'Artist': 'string'})
+    df = df[(df[REQUIRED] > 0).all(axis=1).fillna(False).astype(bool)].drop_duplicates('Artist', keep='last')
+    df['_socials_hash'] = pd.util.hash_pandas_object(df, index=False).values
+    return df
+
+def _merge(ev, so):
+    m = ev.merge(so, on='Artist', how='inner')
+    m['Margin'] = m['Max Resell'] - m['Min Cost']
+    m[SOCIALS] = m[SOCIALS].round()
+    return m.astype({'Artist': 'string', 'Venue': 'string', 'Location': 'string', 'Min Cost': 'float64',
+                     'Max Resell': 'float64', 'Margin': 'float64', **{c: 'Int64' for c in SOCIALS}})
+
+# --- BUILD ---
+def build(socials='artists', workbook=WORKBOOK, force=False):
+    """Bring the cached matrix up to date, merging only new or changed (event, socials) rows.
+
+    Returns {'rows', 'reused', 'rebuilt', 'dropped', 'seconds'}.
+    """
+    import pandas as pd
+    start = time.time()
+    sheets = load_sheets(workbook, ['Events'] if socials == 'artists' else ['Events', 'Socials'])
+    ev = events_frame(sheets['Events'])
+    so = socials_frame(socials, sheets)
+
+    # Every (event, socials) pair the matrix should hold right now
+    wanted = ev[['_event_hash', 'Artist']].merge(so[['Artist', '_socials_hash']], on='Artist', how='inner')
+    path = matrix_path(socials)
+    old = None
+    if not force and os.path.exists(path):
+        try: old = pd.read_parquet(path)
+        except Exception as e: print(f"⚠️ Rebuilding unreadable feature cache: {e}")
+
+    if old is not None and len(old):
+        have = set(zip(old['_event_hash'], old['_socials_hash']))
+        want = set(zip(wanted['_event_hash'], wanted['_socials_hash']))
+        keep = old[[k in want for k in zip(old['_event_hash'], old['_socials_hash'])]]
+        todo = wanted[[k not in have for k in zip(wanted['_event_hash'], wanted['_socials_hash'])]]
+        dropped = len(old) - len(keep)
+    else:
+        keep, todo, dropped = None, wanted, 0
+
+    fresh = _merge(ev[ev['_event_hash'].isin(todo['_event_hash'])],
+                   so[so['_socials_hash'].isin(todo['_socials_hash'])])
+    out = fresh if keep is None or not len(keep) else pd.concat([keep, fresh[keep.columns]], ignore_index=True)
+    out = out.sort_values(['Date', 'Artist', '_event_hash'], na_position='last', ignore_index=True)
+    if len(fresh) or dropped or old is None: _write(out, path)
+
+    stats = {'rows': len(out), 'reused': len(out) - len(fresh), 'rebuilt': len(fresh), 'dropped': dropped,
+             'seconds': round(time.time() - start, 2)}
+    conn = get_conn()
+    try:
+        conn.execute("INSERT INTO builds (socials, rows, reused, rebuilt, dropped, seconds, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (socials, stats['rows'], stats['reused'], stats['rebuilt'], stats['dropped'], stats['seconds'], time.time()))
+    finally:
+        conn.close()
+    return stats
+
+def load_features(columns=None, location=None, dropna=True, socials='artists', refresh=True, workbook=WORKBOOK):
+    """The feature matrix as a DataFrame: one row per event with its artist's socials and Margin.
+
+    refresh=False skips the (incremental) build and reads the cache as is, building it only if
+    missing. `location` keeps one city; dropna drops rows missing any of `columns` (default COLUMNS).
+    """
+    import pandas as pd
+    path = matrix_path(socials)
+    if refresh or not os.path.exists(path): build(socials, workbook)
+    columns = list(columns or COLUMNS)
+    df = pd.read_parquet(path, columns=columns if 'Location' in columns or not location else [*columns, 'Location'],
+                         filters=[('Location', '==', location)] if location else None)
+    df = df[columns]
+    if dropna:
+        df = df.dropna().reset_index(drop=True)
+        # Nothing left to be missing, so counts can be plain int64 for the models
+        df = df.astype({c: 'int64' for c in columns if c in SOCIALS})
+    return df
+
+if __name__ == "__main__":
+    # python3 feature_store.py [workbook.xlsx] [--socials artists|sheet] [--force]
+    args = sys.argv[1:]
+    socials = args[args.index('--socials') + 1] if '--socials' in args else 'artists'
+    paths = [a for i, a in enumerate(args) if not a.startswith('--') and (i == 0 or args[i - 1] != '--socials')]
+    s = build(socials, paths[0] if paths else WORKBOOK, force='--force' in args)
+    print(f"🧮 Feature matrix: {s['rows']} rows ({s['rebuilt']} rebuilt, {s['reused']} reused, "
+          f"{s['dropped']} dropped) in {s['seconds']:.2f}s -> {matrix_path(socials)}")
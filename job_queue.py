@@ -0,0 +1,331 @@
+import os
+import json
+import time
+import threading
+import multiprocessing
+import local_db
+import metrics
+
+# Durable refresh queue: jobs live in SQLite and are drained by a fixed number
+# of resident worker processes that import api_scraper once and call it in-process.
+# kind='refresh' is one artist (optionally one source); kind='bulk' is a planned run over
+# many artists whose per-artist sub-status is kept in `progress` while it runs.
+SOURCES = ['instagram', 'twitter', 'spotify', 'stubhub']
+NUM_WORKERS = int(os.environ.get('REFRESH_WORKERS', 2))
+POLL_SECONDS = 1.0
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('refresh_jobs')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                artist TEXT NOT NULL,
+                source TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                error TEXT,
+                worker INTEGER,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        # Columns added after the first release; old databases get them in place
+        have = {r['name'] for r in conn.execute("PRAGMA table_info(jobs)")}
+        for col, ddl in [('kind', "TEXT NOT NULL DEFAULT 'refresh'"), ('payload', 'TEXT'),
+                         ('progress', 'TEXT'), ('updated_at', 'REAL')]:
+            if col not in have: conn.execute(f"ALTER TABLE jobs ADD COLUMN {col} {ddl}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_artist ON jobs (artist, status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at)")
+        _schema_ready = True
+    return conn
+
+def _as_dict(row):
+    if not row: return None
+    job = dict(row)
+    for k in ('payload', 'progress'):
+        if job.get(k): job[k] = json.loads(job[k])
+    return job
+
+def enqueue(artist_name, source=None):
+    """Queue a refresh. Returns (job, created); an identical job still waiting is reused.
+
+    A queued full refresh (source=None) also absorbs column refreshes for the same artist.
+    """
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE kind = 'refresh' AND artist = ? AND status = 'queued' AND (source IS ? OR source IS NULL) ORDER BY id LIMIT 1",
+            (artist_name, source)).fetchone()
+        if row:
+            conn.execute("COMMIT")
+            return _as_dict(row), False
+        now = time.time()
+        cur = conn.execute("INSERT INTO jobs (artist, source, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                           (artist_name, source, now, now))
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (cur.lastrowid,)).fetchone()
+        conn.execute("COMMIT")
+        return _as_dict(row), True
+    except:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def plan_bulk(artist_names, sources=None):
+    """Normalise a bulk request and build its initial per-artist sub-status.
+
+    Returns (artist_names, sources, progress) with progress = {'artists': {name: {source: state}},
+    'errors': {name: {source: message}}, 'done': n, 'total': n}.
+    """
+    sources = [s for s in SOURCES if s in (sources or SOURCES)]
+    artist_names = list(dict.fromkeys(artist_names))
+    progress = {'artists': {a: {s: 'queued' for s in sources} for a in artist_names}, 'errors': {},
+                'done': 0, 'total': len(artist_names) * len(sources)}
+    return artist_names, sources, progress
+
+def enqueue_bulk(artist_names, sources=None):
+    """Queue one planned refresh over many artists (and a subset of SOURCES). Returns the job."""
+    artist_names, sources, progress = plan_bulk(artist_names, sources)
+    now = time.time()
+    conn = get_conn()
+    try:
+        cur = conn.execute("""INSERT INTO jobs (artist, kind, payload, progress, created_at, updated_at)
+                              VALUES (?, 'bulk', ?, ?, ?, ?)""",
+                           (f"{len(artist_names)} artist(s)", json.dumps({'artists': artist_names, 'sources': sources}),
+                            json.dumps(progress), now, now))
+        return _as_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (cur.lastrowid,)).fetchone())
+    finally:
+        conn.close()
+
+def set_progress(job_id, progress):
+    conn = get_conn()
+    try:
+        conn.execute("UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?", (json.dumps(progress), time.time(), job_id))
+    finally:
+        conn.close()
+
+def claim(worker_pid):
+    """Atomically move the oldest queued job to running and return it (or None)."""
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+        if row:
+            now = time.time()
+            conn.execute("UPDATE jobs SET status = 'running', worker = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                         (worker_pid, now, now, row['id']))
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+        conn.execute("COMMIT")
+        return _as_dict(row)
+    except:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def finish(job_id, status, error=None):
+    conn = get_conn()
+    try:
+        now = time.time()
+        conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                     (status, error, now, now, job_id))
+    finally:
+        conn.close()
+
+def get_job(job_id):
+    conn = get_conn()
+    try:
+        return _as_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+def list_jobs(status=None, limit=100):
+    conn = get_conn()
+    try:
+        if status:
+            rows = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [_as_dict(r) for r in rows]
+    finally:
+        conn.close()
+
+def finished_since(ts, limit=500):
+    """Jobs that reached done/failed after `ts` (epoch seconds), oldest first."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM jobs WHERE finished_at > ? ORDER BY finished_at LIMIT ?", (ts, limit)).fetchall()
+        return [_as_dict(r) for r in rows]
+    finally:
+        conn.close()
+
+def changed_since(ts, limit=500):
+    """Jobs claimed, advanced or finished after `ts` (epoch seconds), oldest change first."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM jobs WHERE updated_at > ? ORDER BY updated_at LIMIT ?", (ts, limit)).fetchall()
+        return [_as_dict(r) for r in rows]
+    finally:
+        conn.close()
+
+def counts():
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r['status']: r['n'] for r in rows}
+    finally:
+        conn.close()
+
+def _targets(job):
+    """(artist, source) pairs a job covers; a full refresh covers every source."""
+    if job['kind'] == 'bulk':
+        return [(a, src) for a in job['payload']['artists'] for src in job['payload']['sources']]
+    return [(job['artist'], src) for src in ([job['source']] if job['source'] else SOURCES)]
+
+def active_targets():
+    """(artist, source) pairs already queued or running."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+    finally:
+        conn.close()
+    return {t for r in rows for t in _targets(_as_dict(r))}
+
+def outcome_counts(since):
+    """{(artist, source): [succeeded, failed]} for jobs finished after `since` (epoch seconds)."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM jobs WHERE finished_at > ? AND status IN ('done', 'failed')", (since,)).fetchall()
+    finally:
+        conn.close()
+    counts = {}
+    for r in rows:
+        job = _as_dict(r)
+        for t in _targets(job):
+            if job['kind'] == 'bulk':
+                state = ((job.get('progress') or {}).get('artists', {}).get(t[0]) or {}).get(t[1])
+                if state not in ('done', 'failed'): continue
+                ok = state == 'done'
+            else:
+                ok = job['status'] == 'done'
+            counts.setdefault(t, [0, 0])[0 if ok else 1] += 1
+    return counts
+
+def fail_running(worker_pid, error):
+    """Mark whatever a dead worker was running as failed so it never disappears silently."""
+    conn = get_conn()
+    try:
+        now = time.time()
+        conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ? WHERE status = 'running' AND worker = ?",
+                     (error, now, now, worker_pid))
+    finally:
+        conn.close()
+
+def requeue_orphans():
+    """Jobs left running by a previous app process go back to the queue."""
+    conn = get_conn()
+    try:
+        cur = conn.execute("UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL, updated_at = ? WHERE status = 'running'",
+                           (time.time(),))
+        return cur.rowcount
+    finally:
+        conn.close()
+
+# --- WORKERS ---
+def run_job(job):
+    import api_scraper
+    if job['kind'] == 'bulk':
+        return api_scraper.refresh_bulk(job['payload']['artists'], job['payload']['sources'],
+                                        progress=lambda p: set_progress(job['id'], p))
+    if job['source']:
+        return api_scraper.refresh_artist_column(job['artist'], job['source'])
+    return api_scraper.refresh_artist(job['artist'])
+
+def _worker_main():
+    pid = os.getpid()
+    try:
+        import driver_pool
+        driver_pool.get_pool().warm()
+    except Exception as e:
+        print(f"⚠️ Worker {pid} could not pre-launch a browser: {e}")
+    print(f"👷 Refresh worker {pid} ready")
+    while True:
+        try:
+            job = claim(pid)
+        except Exception as e:
+            print(f"❌ Worker {pid} could not claim a job: {e}")
+            time.sleep(POLL_SECONDS)
+            continue
+        if not job:
+            time.sleep(POLL_SECONDS)
+            continue
+        start = time.time()
+        status = 'failed'
+        try:
+            result = run_job(job) or {}
+            if result.get('ok'):
+                status = 'done'
+                finish(job['id'], 'done', result.get('error'))
+            else:
+                finish(job['id'], 'failed', result.get('error') or 'Refresh failed')
+        except Exception as e:
+            finish(job['id'], 'failed', f"{type(e).__name__}: {e}")
+        metrics.observe('job_seconds', time.time() - start, kind=job['kind'], status=status)
+
+class WorkerPool:
+    """Keeps NUM_WORKERS refresh processes alive and reports jobs lost to crashed workers."""
+
+    def __init__(self, size=NUM_WORKERS):
+        self.size = size
+        self.ctx = multiprocessing.get_context('spawn')
+        self.procs = []
+        self._lock = threading.Lock()
+
+    def _spawn(self):
+        p = self.ctx.Process(target=_worker_main, daemon=True)
+        p.start()
+        return p
+
+    def start(self):
+        n = requeue_orphans()
+        if n: print(f"♻️ Requeued {n} interrupted refresh job(s)")
+        with self._lock:
+            self.procs = [self._spawn() for _ in range(self.size)]
+        threading.Thread(target=self._monitor, daemon=True).start()
+        print(f"🚀 Started {self.size} refresh worker(s)")
+
+    def _monitor(self):
+        while True:
+            time.sleep(POLL_SECONDS * 5)
+            with self._lock:
+                for i, p in enumerate(self.procs):
+                    if p.is_alive(): continue
+                    print(f"⚠️ Refresh worker {p.pid} exited with code {p.exitcode}, restarting")
+                    fail_running(p.pid, f"Worker exited unexpectedly (code {p.exitcode})")
+                    self.procs[i] = self._spawn()
+
+    def alive(self):
+        with self._lock:
+            return sum(1 for p in self.procs if p.is_alive())
+
+pool = None
+
+def queue_gauges():
+    """Queue depth by status and live workers, for metrics.register_collector()."""
+    rows = [('jobs', {'status': status}, n) for status, n in {'queued': 0, 'running': 0, **counts()}.items()]
+    if pool is not None: rows.append(('refresh_workers', {}, pool.alive()))
+    return rows
+
+def start_workers(size=NUM_WORKERS):
+    global pool
+    if pool is None:
+        pool = WorkerPool(size)
+        pool.start()
+    return pool
@@ -0,0 +1,14 @@
+import os
+import sqlite3
+
+# Small local SQLite stores (job queue, caches, stats) live next to the app
+# unless LOCAL_DATA_DIR points somewhere else (e.g. a docker volume).
+DATA_DIR = os.environ.get('LOCAL_DATA_DIR', '.')
+
+def connect(name):
+    """Open `<DATA_DIR>/<name>.db` in autocommit mode, safe to share between processes."""
+    conn = sqlite3.connect(os.path.join(DATA_DIR, f'{name}.db'), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=30000')
+    return conn
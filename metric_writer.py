@@ -0,0 +1,180 @@
+import os
+import math
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+import db
+import metrics
+import metrics_history
+
+# Write-behind buffer for scraper results. put() collects per-artist column values; a flush
+# reads the current rows once and, in a single commit, updates the changed ones with batched
+# UPDATE ... WHERE name = %s statements, inserts missing put(insert=True) names with multi-row
+# INSERTs, and only bumps updated_at on rows whose values did not change. Every saved row,
+# changed or not, is also appended to metrics_history.
+BATCH_SIZE = int(os.environ.get('METRIC_BATCH_SIZE', 200))
+FLUSH_SECONDS = float(os.environ.get('METRIC_FLUSH_SECONDS', 5))
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a): a = None
+    if isinstance(b, float) and math.isnan(b): b = None
+    if a is None or b is None: return a is None and b is None
+    try: return float(a) == float(b)
+    except (TypeError, ValueError): return str(a) == str(b)
+
+class MetricWriter:
+    """Buffers ARTISTS column updates and flushes them on size, on a timer, or at exit.
+
+    Rows for names not in ARTISTS are dropped unless they were put with insert=True.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.pending = {}  # name -> (values, insert)
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # one flush at a time; put() never waits on the DB
+        self.thread = None
+        self.stats = {'puts': 0, 'written': 0, 'unchanged': 0, 'dropped': 0, 'flushes': 0, 'errors': 0}
+        atexit.register(self.flush)
+
+    def put(self, name, values, insert=False):
+        """Queue `values` ({column: value}) for `name`; later puts for the same name win per column."""
+        if not values: return
+        with self.lock:
+            old, old_insert = self.pending.get(name, ({}, False))
+            self.pending[name] = ({**old, **values}, insert or old_insert)
+            self.stats['puts'] += 1
+            full = len(self.pending) >= self.batch_size
+            if self.thread is None and self.flush_seconds:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        if full: self.flush()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try: self.flush()
+            except Exception as e: print(f"⚠️ Metric flush failed: {e}")
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of rows written."""
+        with self.flush_lock:
+            with self.lock:
+                rows, self.pending = self.pending, {}
+            if not rows: return 0
+            try:
+                written = self._write(rows)
+            except:
+                # Put the batch back under anything newer so nothing is lost
+                with self.lock:
+                    for name, (values, insert) in rows.items():
+                        newer, newer_insert = self.pending.get(name, ({}, False))
+                        self.pending[name] = ({**values, **newer}, insert or newer_insert)
+                    self.stats['errors'] += 1
+                raise
+            with self.lock:
+                self.stats['flushes'] += 1
+            return written
+
+    def _current(self, names, cols):
+        current = {}
+        for i in range(0, len(names), self.batch_size):
+            chunk = names[i:i + self.batch_size]
+            q = f"SELECT name, {', '.join(cols)} FROM ARTISTS WHERE name IN ({','.join(['%s'] * len(chunk))})"
+            current.update({r['name']: r for r in db.query(q, tuple(chunk))})
+        return current
+
+    def _write(self, rows):
+        names = list(rows)
+        cols = sorted({c for values, _ in rows.values() for c in values})
+        current = self._current(names, cols)
+
+        groups, inserts, touched, unchanged, dropped, observed = {}, {}, [], 0, 0, []
+        for name, (values, insert) in rows.items():
+            row = current.get(name)
+            if row is None and not insert:
+                dropped += 1
+                continue
+            observed.append((name, values))
+            key = tuple(sorted(values))
+            if row is None:
+                inserts.setdefault(key, []).append((name, values))
+            elif all(_same(v, row.get(c)) for c, v in values.items()):
+                # Nothing new, but the artist was just scraped: only its updated_at moves
+                touched.append(name)
+                unchanged += 1
+            else:
+                groups.setdefault(key, []).append((name, values))
+
+        written = 0
+        if groups or inserts or touched:
+            start = time.time()
+            conn = db.get_conn()
+            try:
+                with conn.cursor() as cur:
+                    # ARTISTS.name carries no unique key, so existing rows are updated by name
+                    for key, items in groups.items():
+                        q = f"UPDATE ARTISTS SET {', '.join(f'{c} = %s' for c in key)}, updated_at = CURRENT_TIMESTAMP WHERE name = %s"
+                        cur.executemany(q, [(*(values[c] for c in key), name) for name, values in items])
+                        written += len(items)
+                    for key, items in inserts.items():
+                        for i in range(0, len(items), self.batch_size):
+                            chunk = items[i:i + self.batch_size]
+                            placeholders = '(' + ', '.join(['%s'] * (len(key) + 1)) + ', CURRENT_TIMESTAMP)'
+                            q = (f"INSERT INTO ARTISTS (name, {', '.join(key)}, updated_at) VALUES "
+                                 + ', '.join([placeholders] * len(chunk)))
+                            params = [p for name, values in chunk for p in (name, *(values[c] for c in key))]
+                            cur.execute(q, tuple(params))
+                            written += len(chunk)
+                    for i in range(0, len(touched), self.batch_size):
+                        chunk = touched[i:i + self.batch_size]
+                        cur.execute(f"UPDATE ARTISTS SET updated_at = CURRENT_TIMESTAMP WHERE name IN ({','.join(['%s'] * len(chunk))})",
+                                    tuple(chunk))
+                conn.commit()
+            finally:
+                conn.close()
+                metrics.observe('db_query_seconds', time.time() - start, op='batch_upsert')
+
+        try: metrics_history.record_many(observed)
+        except Exception as e: print(f"⚠️ Could not append metrics history: {e}")
+
+        with self.lock:
+            self.stats['written'] += written
+            self.stats['unchanged'] += unchanged
+            self.stats['dropped'] += dropped
+        if written or unchanged:
+            print(f"💾 Saved {written} artist row(s), {unchanged} unchanged")
+        return written
+
+# --- PROCESS-WIDE WRITER ---
+_writer = None
+_writer_lock = threading.Lock()
+_batch = threading.local()  # batch() nesting depth of the calling thread
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = MetricWriter()
+        return _writer
+
+def put(name, values, insert=False):
+    """Save `values` for `name`: immediately, or at the next flush when this thread is inside batch()."""
+    w = get_writer()
+    w.put(name, values, insert)
+    if not getattr(_batch, 'depth', 0): w.flush()
+
+def flush():
+    return get_writer().flush()
+
+@contextmanager
+def batch():
+    """Defer this thread's put() writes to the size/time thresholds for the duration; flush on exit."""
+    _batch.depth = getattr(_batch, 'depth', 0) + 1
+    try:
+        yield get_writer()
+    finally:
+        _batch.depth -= 1
+        flush()
@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+import local_db
+
+# Prometheus-style counters, histograms and gauges shared across processes. Each process
+# adds to in-memory deltas and flushes them into SQLite every FLUSH_SECONDS (and at exit);
+# render() sums everything into the text exposition format served on /metrics. Gauges are
+# kept per process id and only count while that process is alive.
+ENABLED = os.environ.get('METRICS', '1') != '0'
+FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# name: (type, help)
+DESCRIBE = {
+    'scraper_strategy_seconds': ('histogram', 'Time spent in one scraper strategy attempt'),
+    'scraper_strategy_total': ('counter', 'Scraper strategy attempts by outcome'),
+    'browser_page_load_seconds': ('histogram', 'Selenium page load time by site'),
+    'browser_blocked_total': ('counter', 'Page loads that came back as a block/rate-limit page'),
+    'fast_path_rate_limited_total': ('counter', 'Fast-path requests that gave up waiting for a rate-limit token'),
+    'refresh_seconds': ('histogram', 'Wall time of one artist refresh (all sources, or one source)'),
+    'refresh_source_seconds': ('histogram', 'Wall time of one source within an artist refresh'),
+    'refresh_total': ('counter', 'Artist refreshes by outcome'),
+    'scrapes_in_flight': ('gauge', 'Artist refreshes currently running'),
+    'db_query_seconds': ('histogram', 'MySQL statement latency by operation'),
+    'db_errors_total': ('counter', 'MySQL statements that raised'),
+    'job_seconds': ('histogram', 'Refresh job run time by kind and final status'),
+    'jobs': ('gauge', 'Refresh jobs in the queue by status'),
+    'refresh_workers': ('gauge', 'Live refresh worker processes'),
+    'http_request_seconds': ('histogram', 'API request latency by endpoint'),
+    'http_requests_total': ('counter', 'API requests by endpoint and status'),
+}
+
+_lock = threading.Lock()
+_deltas = {}    # (series name, labels) -> value to add
+_gauges = {}    # (name, labels) -> current value in this process
+_collectors = []
+_thread = None
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('metrics')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS gauges (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels, pid)
+            ) WITHOUT ROWID
+        """)
+        _schema_ready = True
+    return conn
+
+def _labels(labels):
+    esc = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items()))
+
+def _add(name, labels, value):
+    _deltas[(name, labels)] = _deltas.get((name, labels), 0) + value
+
+def _started():
+    global _thread
+    if _thread is None and FLUSH_SECONDS:
+        _thread = threading.Thread(target=_run, daemon=True)
+        _thread.start()
+        atexit.register(flush)
+
+def _run():
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        try: flush()
+        except Exception as e: print(f"⚠️ Metrics flush failed: {e}")
+
+# --- RECORDING ---
+def inc(name, value=1, **labels):
+    if not ENABLED: return
+    with _lock:
+        _add(name, _labels(labels), value)
+        _started()
+
+def observe(name, seconds, buckets=BUCKETS, **labels):
+    if not ENABLED: return
+    base = _labels(labels)
+    with _lock:
+        for le in buckets:
+            _add(f'{name}_bucket', _labels({**labels, 'le': le}), 1 if seconds <= le else 0)
+        _add(f'{name}_bucket', _labels({**labels, 'le': '+Inf'}), 1)
+        _add(f'{name}_sum', base, seconds)
+        _add(f'{name}_count', base, 1)
+        _started()
+
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def gauge_add(name, delta, **labels):
+    if not ENABLED: return
+    key = (name, _labels(labels))
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + delta
+        _started()
+
+@contextmanager
+def in_flight(name, **labels):
+    gauge_add(name, 1, **labels)
+    try:
+        yield
+    finally:
+        gauge_add(name, -1, **labels)
+
+def register_collector(fn):
+    """fn() -> [(name, {labels}, value)] is called on every render() for live gauges."""
+    _collectors.append(fn)
+    return fn
+
+# --- STORAGE ---
+def flush():
+    with _lock:
+        deltas, gauges = dict(_deltas), dict(_gauges)
+        _deltas.clear()
+    if not deltas and not gauges: return
+    pid = os.getpid()
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""INSERT INTO samples (name, labels, value) VALUES (?, ?, ?)
+                            ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value""",
+                         [(n, l, v) for (n, l), v in deltas.items()])
+        conn.executemany("INSERT OR REPLACE INTO gauges (name, labels, pid, value) VALUES (?, ?, ?, ?)",
+                         [(n, l, pid, v) for (n, l), v in gauges.items()])
+        conn.execute("COMMIT")
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        with _lock:
+            for key, v in deltas.items(): _deltas[key] = _deltas.get(key, 0) + v
+        raise
+    finally:
+        conn.close()
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+
+def _base(series):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if series.endswith(suffix) and series[:-len(suffix)] in DESCRIBE: return series[:-len(suffix)]
+    return series
+
+LE = re.compile(r'(?:^|,)le="([^"]*)"')
+
+def _order(row):
+    # Keep each label set's buckets together, in increasing le, followed by _count and _sum
+    name, labels, _ = row
+    m = LE.search(labels)
+    le = float('inf') if m and m.group(1) == '+Inf' else float(m.group(1)) if m else 0
+    return (LE.sub('', labels), name, le)
+
+def render():
+    """Every metric from every process in the Prometheus text format."""
+    flush()
+    conn = get_conn()
+    try:
+        samples = conn.execute("SELECT name, labels, value FROM samples").fetchall()
+        gauges = conn.execute("SELECT name, labels, pid, value FROM gauges").fetchall()
+        dead = {g['pid'] for g in gauges if not _alive(g['pid'])}
+        if dead: conn.execute(f"DELETE FROM gauges WHERE pid IN ({','.join('?' * len(dead))})", tuple(dead))
+    finally:
+        conn.close()
+
+    series = {}
+    for r in samples: series[(r['name'], r['labels'])] = r['value']
+    for g in gauges:
+        if g['pid'] not in dead:
+            series[(g['name'], g['labels'])] = series.get((g['name'], g['labels']), 0) + g['value']
+    for fn in _collectors:
+        try:
+            for name, labels, value in fn(): series[(name, _labels(labels))] = value
+        except Exception as e: print(f"⚠️ Metrics collector {fn.__name__} failed: {e}")
+
+    by_metric = {}
+    for (name, labels), value in series.items():
+        by_metric.setdefault(_base(name), []).append((name, labels, value))
+    out = []
+    for metric in sorted(by_metric):
+        kind, help_text = DESCRIBE.get(metric, ('untyped', ''))
+        if help_text: out.append(f'# HELP {metric} {help_text}')
+        out.append(f'# TYPE {metric} {kind}')
+        for name, labels, value in sorted(by_metric[metric], key=_order):
+            v = int(value) if float(value).is_integer() else value
+            out.append(f'{name}{{{labels}}} {v}' if labels else f'{name} {v}')
+    return '\n'.join(out) + '\n'
@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import local_db
+
+# Append-only history of every scraped ARTISTS metric, keyed by (artist, metric, ts).
+# Raw points are rolled up to one point per day after RAW_DAYS and to one per week after
+# DAY_DAYS; a rolled-up point keeps the last value seen in its bucket plus min/max/count.
+METRICS = ['instagram_followers', 'spotify_followers', 'spotify_listeners', 'spotify_popularity',
+           'twitter_followers', 'stubhub_favourites']
+RAW_DAYS = int(os.environ.get('HISTORY_RAW_DAYS', 14))
+DAY_DAYS = int(os.environ.get('HISTORY_DAY_DAYS', 180))
+ROLLUP_INTERVAL = 3600  # seconds between automatic rollups in one process
+DAY = 86400
+
+_schema_ready = False
+_last_rollup = 0
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('metrics_history')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS points (
+                grain TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                last_ts INTEGER NOT NULL,
+                value REAL NOT NULL,
+                lo REAL NOT NULL,
+                hi REAL NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (artist, metric, grain, ts)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_points_metric ON points (metric, artist, last_ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_points_grain ON points (grain, ts)")
+        _schema_ready = True
+    return conn
+
+def _number(v):
+    try:
+        v = float(v)
+        return None if v != v else v
+    except (TypeError, ValueError):
+        return None
+
+def record_many(rows, ts=None):
+    """Append one raw point per numeric metric for each (artist, {column: value}) in `rows`.
+
+    0 and missing values are skipped: a failed scrape reports 0, which is not an observation.
+    """
+    ts = int(ts or time.time())
+    points = [(artist, m, ts, ts, v, v, v) for artist, values in rows
+              for m, v in ((m, _number(values.get(m))) for m in METRICS) if v]
+    if points:
+        conn = get_conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("""INSERT OR REPLACE INTO points (grain, artist, metric, ts, last_ts, value, lo, hi, n)
+                                VALUES ('raw', ?, ?, ?, ?, ?, ?, ?, 1)""", points)
+            conn.execute("COMMIT")
+        except:
+            if conn.in_transaction: conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    if time.time() - _last_rollup > ROLLUP_INTERVAL:
+        rollup()
+    return len(points)
+
+def record(artist, values, ts=None):
+    return record_many([(artist, values)], ts)
+
+# --- ROLLUPS ---
+def day_start(ts):
+    return int(ts) // DAY * DAY
+
+def week_start(ts):
+    # 1970-01-01 was a Thursday; weeks start on Monday
+    d = int(ts) // DAY
+    return (d - (d + 3) % 7) * DAY
+
+def _roll(conn, src, dst, bucket_fn, cutoff):
+    rows = conn.execute("SELECT * FROM points WHERE grain = ? AND ts < ? ORDER BY artist, metric, last_ts",
+                        (src, cutoff)).fetchall()
+    buckets = {}
+    for r in rows:
+        key = (r['artist'], r['metric'], bucket_fn(r['ts']))
+        b = buckets.get(key)
+        if b is None:
+            buckets[key] = [r['last_ts'], r['value'], r['lo'], r['hi'], r['n']]
+        else:
+            b[0], b[1] = r['last_ts'], r['value']
+            b[2], b[3], b[4] = min(b[2], r['lo']), max(b[3], r['hi']), b[4] + r['n']
+    conn.executemany(f"""
+        INSERT INTO points (grain, artist, metric, ts, last_ts, value, lo, hi, n) VALUES ('{dst}', ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (artist, metric, grain, ts) DO UPDATE SET
+            value = CASE WHEN excluded.last_ts >= last_ts THEN excluded.value ELSE value END,
+            last_ts = MAX(last_ts, excluded.last_ts), lo = MIN(lo, excluded.lo), hi = MAX(hi, excluded.hi), n = n + excluded.n
+    """, [(a, m, ts, *b) for (a, m, ts), b in buckets.items()])
+    conn.execute("DELETE FROM points WHERE grain = ? AND ts < ?", (src, cutoff))
+    return len(rows)
+
+def rollup(now=None):
+    """Fold raw points older than RAW_DAYS into days and days older than DAY_DAYS into weeks."""
+    global _last_rollup
+    now = now or time.time()
+    _last_rollup = time.time()
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        raw = _roll(conn, 'raw', 'day', day_start, day_start(now - RAW_DAYS * DAY))
+        days = _roll(conn, 'day', 'week', week_start, week_start(now - DAY_DAYS * DAY))
+        conn.execute("COMMIT")
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return {'raw': raw, 'day': days}
+
+# --- QUERIES ---
+def series(artist, metric, start=None, end=None):
+    """Points for one artist/metric between `start` and `end` (epoch seconds), oldest first.
+
+    Each point is {ts, value, lo, hi, n, grain}; older stretches come back at day/week grain.
+    """
+    conn = get_conn()
+    try:
+        rows = conn.execute("""SELECT grain, last_ts AS ts, value, lo, hi, n FROM points
+                               WHERE artist = ? AND metric = ? AND last_ts >= ? AND last_ts <= ? ORDER BY last_ts""",
+                            (artist, metric, int(start or 0), int(end or time.time()))).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+def values_at(metric, ts, artists=None):
+    """{artist: (value, observed_ts)} for the last point of `metric` at or before `ts`."""
+    conn = get_conn()
+    try:
+        # SQLite returns the bare columns from the row that supplies MAX()
+        rows = conn.execute("SELECT artist, value, MAX(last_ts) AS at FROM points WHERE metric = ? AND last_ts <= ? GROUP BY artist",
+                            (metric, int(ts))).fetchall()
+    finally:
+        conn.close()
+    return {r['artist']: (r['value'], r['at']) for r in rows if artists is None or r['artist'] in artists}
+
+def last_seen():
+    """{(artist, metric): epoch seconds of the newest point}."""
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT artist, metric, MAX(last_ts) AS at FROM points GROUP BY artist, metric").fetchall()
+    finally:
+        conn.close()
+    return {(r['artist'], r['metric']): r['at'] for r in rows}
+
+def growth(metric, days=30, artists=None, now=None):
+    """Change in `metric` over the last `days` for every artist (or just `artists`).
+
+    Returns {artist: {'start', 'end', 'change', 'rate', 'per_day', 'span_days'}}; the start is the
+    last point before the window, or the first one inside it for artists tracked more recently.
+    rate is the fractional change (None when the start value is 0).
+    """
+    now = now or time.time()
+    since = now - days * DAY
+    end = values_at(metric, now, artists)
+    start = values_at(metric, since, artists)
+    conn = get_conn()
+    try:
+        first = conn.execute("SELECT artist, value, MIN(last_ts) AS at FROM points WHERE metric = ? AND last_ts > ? GROUP BY artist",
+                             (metric, int(since))).fetchall()
+    finally:
+        conn.close()
+    for r in first:
+        start.setdefault(r['artist'], (r['value'], r['at']))
+
+    out = {}
+    for artist, (v1, t1) in end.items():
+        if artist not in start: continue
+        v0, t0 = start[artist]
+        span = (t1 - t0) / DAY
+        out[artist] = {'start': v0, 'end': v1, 'change': v1 - v0, 'rate': (v1 - v0) / v0 if v0 else None,
+                       'per_day': (v1 - v0) / span if span > 0 else None, 'span_days': round(span, 2)}
+    return out
+
+def backfill_from_artists():
+    """Seed history with the current ARTISTS values, stamped with each row's updated_at."""
+    import db
+    rows = db.query(f"SELECT name, updated_at, {', '.join(METRICS)} FROM ARTISTS")
+    n = 0
+    for r in rows:
+        ts = r['updated_at'].timestamp() if r.get('updated_at') else None
+        n += record_many([(r['name'], r)], ts)
+    return n
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ''
+    if cmd == 'rollup':
+        print(f"🗜️ Rolled up: {rollup()}")
+    elif cmd == 'backfill':
+        print(f"📥 Recorded {backfill_from_artists()} point(s) from ARTISTS")
+    elif cmd == 'growth':
+        metric = sys.argv[2] if len(sys.argv) > 2 else 'spotify_listeners'
+        days = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+        for artist, g in sorted(growth(metric, days).items(), key=lambda kv: -(kv[1]['rate'] or 0)):
+            rate = f"{g['rate'] * 100:+.1f}%" if g['rate'] is not None else 'n/a'
+            print(f"{artist:<30} {g['start']:>14,.0f} → {g['end']:>14,.0f}  {rate}")
+    else:
+        print("Usage: python3 metrics_history.py rollup | backfill | growth [metric] [days]")
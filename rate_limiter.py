@@ -0,0 +1,256 @@
+import os
+import re
+import time
+import local_db
+from contextlib import contextmanager, asynccontextmanager
+
+# Per-domain token buckets and in-flight caps shared by every thread and worker process
+# (state lives in SQLite). A 429/403 halves the domain's rate and backs it off exponentially;
+# each clean response wins some rate back, so a domain settles just under its blocking point.
+ENABLED = os.environ.get('RATE_LIMIT', '1') != '0'
+MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', 120))  # seconds before acquire() gives up
+LEASE_TIMEOUT = 120.0      # in-flight slots older than this are presumed lost (crashed process)
+BACKOFF_BASE = 30.0
+BACKOFF_MAX = 900.0
+MIN_SCALE = 0.05
+RECOVER_STEP = 0.05
+BLOCK_STATUSES = (403, 429)
+
+# domain: (requests per second, burst, max in flight). Subdomains fall back to their parent.
+LIMITS = {
+    'i.instagram.com': (0.5, 3, 2),
+    'instagram.com': (0.3, 2, 1),
+    'x.com': (0.3, 2, 1),
+    'livecounts.nl': (1.0, 3, 2),
+    'livecounts.io': (1.0, 3, 2),
+    'instastatistics.com': (0.5, 2, 1),
+    'open.spotify.com': (2.0, 5, 4),
+    'api.spotify.com': (5.0, 10, 8),
+    'accounts.spotify.com': (1.0, 2, 1),
+    'stubhub.com': (0.3, 2, 1),
+    'stubhub.ca': (0.3, 2, 1),
+    'google.com': (0.2, 2, 1),
+    'bing.com': (0.5, 2, 1),
+    'search.yahoo.com': (0.5, 2, 1),
+}
+DEFAULT_LIMIT = (1.0, 3, 2)
+
+def _parse_overrides(spec):
+    # RATE_LIMITS="x.com=0.5/2/1,stubhub.com=1/3/2"
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        try:
+            domain, vals = part.split('=')
+            rate, burst, inflight = vals.split('/')
+            out[domain.strip().lower()] = (float(rate), float(burst), int(inflight))
+        except ValueError:
+            print(f"⚠️ Ignoring bad RATE_LIMITS entry: {part}")
+    return out
+
+LIMITS.update(_parse_overrides(os.environ.get('RATE_LIMITS', '')))
+
+class RateLimited(Exception):
+    """Raised when a domain stays unavailable for longer than the caller will wait."""
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('rate_limits')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                domain TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                scale REAL NOT NULL DEFAULT 1.0,
+                blocks INTEGER NOT NULL DEFAULT 0,
+                backoff_until REAL NOT NULL DEFAULT 0,
+                requests INTEGER NOT NULL DEFAULT 0,
+                blocked INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                domain TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                started REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_domain ON leases (domain, started)")
+        _schema_ready = True
+    return conn
+
+def domain_of(url):
+    """The LIMITS key for `url`: the most specific configured suffix of its host, else the host."""
+    m = re.match(r'(?:[a-z]+://)?([^/?#:]+)', url.strip().lower())
+    host = m.group(1) if m else url.lower()
+    if host.startswith('www.'): host = host[4:]
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        if '.'.join(parts[i:]) in LIMITS: return '.'.join(parts[i:])
+    return host
+
+def try_acquire(domain, now=None):
+    """Take a token and an in-flight slot for `domain` if both are free.
+
+    Returns (lease_id, 0) on success, or (None, seconds to wait before trying again).
+    """
+    now = now or time.time()
+    rate, burst, max_in_flight = LIMITS.get(domain, DEFAULT_LIMIT)
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT OR IGNORE INTO buckets (domain, tokens, updated) VALUES (?, ?, ?)", (domain, burst, now))
+        b = conn.execute("SELECT * FROM buckets WHERE domain = ?", (domain,)).fetchone()
+        tokens = min(burst, b['tokens'] + (now - b['updated']) * rate * b['scale'])
+        conn.execute("DELETE FROM leases WHERE domain = ? AND started < ?", (domain, now - LEASE_TIMEOUT))
+        in_flight = conn.execute("SELECT COUNT(*) FROM leases WHERE domain = ?", (domain,)).fetchone()[0]
+
+        wait = 0
+        if b['backoff_until'] > now: wait = b['backoff_until'] - now
+        elif tokens < 1: wait = (1 - tokens) / (rate * b['scale'])
+        elif in_flight >= max_in_flight: wait = 0.2
+
+        if wait:
+            conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE domain = ?", (tokens, now, domain))
+            conn.execute("COMMIT")
+            return None, wait
+        conn.execute("UPDATE buckets SET tokens = ?, updated = ?, requests = requests + 1 WHERE domain = ?", (tokens - 1, now, domain))
+        lease = conn.execute("INSERT INTO leases (domain, pid, started) VALUES (?, ?, ?)", (domain, os.getpid(), now)).lastrowid
+        conn.execute("COMMIT")
+        return lease, 0
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def retry_after_seconds(value, now=None):
+    """Seconds from a Retry-After header (delay-seconds or an HTTP-date), None if unusable."""
+    if value is None or value == '': return None
+    try: return max(0.0, float(value))
+    except (TypeError, ValueError): pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - (now or time.time()))
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+def release(domain, lease, status=None, retry_after=None):
+    """Free the in-flight slot and feed the response back: a 429/403 backs the domain off."""
+    now = time.time()
+    retry_after = retry_after_seconds(retry_after, now)  # parsed first: a bad header must not undo the release
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if lease is not None:
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease,))
+        b = conn.execute("SELECT * FROM buckets WHERE domain = ?", (domain,)).fetchone()
+        if b is not None and status in BLOCK_STATUSES:
+            blocks = b['blocks'] + 1
+            delay = min(BACKOFF_BASE * 2 ** (blocks - 1), BACKOFF_MAX)
+            if retry_after: delay = max(delay, min(retry_after, BACKOFF_MAX))
+            conn.execute("""UPDATE buckets SET blocks = ?, backoff_until = ?, scale = ?, tokens = 0, updated = ?,
+                            blocked = blocked + 1 WHERE domain = ?""",
+                         (blocks, now + delay, max(MIN_SCALE, b['scale'] / 2), now, domain))
+            print(f"🚦 {domain} answered {status}: backing off {delay:.0f}s at {max(MIN_SCALE, b['scale'] / 2):.0%} rate")
+        elif b is not None and status is not None and status < 400:
+            conn.execute("UPDATE buckets SET blocks = 0, scale = MIN(1.0, scale + ?) WHERE domain = ?", (RECOVER_STEP, domain))
+        conn.execute("COMMIT")
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def acquire(domain, max_wait=MAX_WAIT):
+    """Block until `domain` has capacity; returns the lease id. Raises RateLimited after max_wait."""
+    deadline = time.time() + max_wait
+    while True:
+        lease, wait = try_acquire(domain)
+        if lease is not None: return lease
+        if time.time() + wait > deadline:
+            raise RateLimited(f"{domain} is rate limited for another {wait:.0f}s")
+        time.sleep(min(wait, 1.0))
+
+async def aacquire(domain, max_wait=MAX_WAIT):
+    import asyncio  # only async callers pay for it; they have it loaded already
+    deadline = time.time() + max_wait
+    while True:
+        lease, wait = await asyncio.to_thread(try_acquire, domain)
+        if lease is not None: return lease
+        if time.time() + wait > deadline:
+            raise RateLimited(f"{domain} is rate limited for another {wait:.0f}s")
+        await asyncio.sleep(min(wait, 1.0))
+
+class Slot:
+    """Handed out by limit(); set .status (and .retry_after) from the response before it closes."""
+
+    def __init__(self, domain):
+        self.domain = domain
+        self.lease = None
+        self.status = None
+        self.retry_after = None
+
+    def record(self, response):
+        self.status = getattr(response, 'status_code', None)
+        self.retry_after = (getattr(response, 'headers', None) or {}).get('Retry-After')
+        return response
+
+@contextmanager
+def limit(url, max_wait=MAX_WAIT):
+    slot = Slot(domain_of(url))
+    if not ENABLED:
+        yield slot
+        return
+    slot.lease = acquire(slot.domain, max_wait)
+    try:
+        yield slot
+    finally:
+        try: release(slot.domain, slot.lease, slot.status, slot.retry_after)
+        except Exception as e: print(f"⚠️ Rate limiter release failed: {e}")
+
+@asynccontextmanager
+async def alimit(url, max_wait=MAX_WAIT):
+    import asyncio
+    slot = Slot(domain_of(url))
+    if not ENABLED:
+        yield slot
+        return
+    slot.lease = await aacquire(slot.domain, max_wait)
+    try:
+        yield slot
+    finally:
+        try: await asyncio.to_thread(release, slot.domain, slot.lease, slot.status, slot.retry_after)
+        except Exception as e: print(f"⚠️ Rate limiter release failed: {e}")
+
+def get(url, max_wait=MAX_WAIT, **kwargs):
+    """requests.get through the limiter."""
+    import requests
+    with limit(url, max_wait) as slot:
+        return slot.record(requests.get(url, **kwargs))
+
+def post(url, max_wait=MAX_WAIT, **kwargs):
+    import requests
+    with limit(url, max_wait) as slot:
+        return slot.record(requests.post(url, **kwargs))
+
+def status():
+    """Per-domain state: current rate scale, backoff, in-flight and request/block counts."""
+    now = time.time()
+    conn = get_conn()
+    try:
+        rows = conn.execute("""SELECT b.*, (SELECT COUNT(*) FROM leases l WHERE l.domain = b.domain AND l.started > ?) AS in_flight
+                               FROM buckets b ORDER BY domain""", (now - LEASE_TIMEOUT,)).fetchall()
+    finally:
+        conn.close()
+    out = []
+    for r in rows:
+        rate, burst, max_in_flight = LIMITS.get(r['domain'], DEFAULT_LIMIT)
+        out.append({'domain': r['domain'], 'rate': rate * r['scale'], 'scale': r['scale'], 'burst': burst,
+                    'max_in_flight': max_in_flight, 'in_flight': r['in_flight'],
+                    'backoff_seconds': max(0, round(r['backoff_until'] - now, 1)),
+                    'requests': r['requests'], 'blocked': r['blocked']})
+    return out
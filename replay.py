@@ -0,0 +1,354 @@
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, quote, unquote, unquote_plus
+from contextlib import contextmanager
+
+# Offline stand-in for every site the scrapers touch. Recorded pages live in FIXTURES and are
+# listed in manifest.json as {"name", "match", "file", "type", "status", "delay_ms"}, where
+# `match` is a regex anchored at the start of "host/path?query" (query URL-decoded).
+# ReplayServer serves them on 127.0.0.1 at /<host>/<path>; session() points requests, httpx,
+# the Selenium `driver` and Gemini at it, so any strategy in scrapers.py runs without a network.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'replay')
+NOT_FOUND = '<html><head><title>404 Not Found</title></head><body></body></html>'
+
+def load_manifest(fixtures=FIXTURES):
+    with open(os.path.join(fixtures, 'manifest.json')) as f:
+        return json.load(f)
+
+# --- STAND-IN SERVER ---
+class ReplayServer:
+    """Serves the fixtures in `fixtures`; hosts in .blocked answer 404 (to force a fallback)."""
+
+    def __init__(self, fixtures=FIXTURES, latency_ms=0):
+        self.fixtures = fixtures
+        self.manifest = load_manifest(fixtures)
+        self.routes = [(re.compile(e['match']), e) for e in self.manifest['fixtures']]
+        self.latency_ms = latency_ms
+        self.blocked = set()
+        self.hits = {}
+        self.misses = []
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self): server._serve(self)
+            def do_POST(self): server._serve(self)
+            def log_message(self, *args): pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    @property
+    def base(self):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def local_url(self, url):
+        """https://host/path?q -> http://127.0.0.1:port/host/path?q"""
+        if url.startswith(self.base): return url
+        p = urlsplit(url if '://' in url else 'https://' + url)
+        query = '?' + quote(p.query, safe='=&+%:/,') if p.query else ''
+        return f"{self.base}/{p.netloc}{quote(p.path or '/', safe='/%:@')}{query}"
+
+    def route(self, key):
+        for rx, entry in self.routes:
+            if rx.match(key): return entry
+        return None
+
+    def _serve(self, req):
+        path, _, query = req.path.partition('?')
+        host, _, rest = unquote(path).lstrip('/').partition('/')
+        key = f"{host}/{rest}" + (f"?{unquote_plus(query)}" if query else '')
+        entry = None if host in self.blocked else self.route(key)
+        with self.lock:
+            if entry: self.hits[entry['name']] = self.hits.get(entry['name'], 0) + 1
+            elif host not in self.blocked: self.misses.append(key)
+        delay = (entry or {}).get('delay_ms', 0) + self.latency_ms
+        if delay: time.sleep(delay / 1000)
+        if entry is None:
+            body, status, ctype = NOT_FOUND.encode(), 404, 'text/html'
+        else:
+            with open(os.path.join(self.fixtures, entry['file']), 'rb') as f: body = f.read()
+            status, ctype = entry.get('status', 200), entry.get('type', 'text/html')
+        req.send_response(status)
+        req.send_header('Content-Type', f'{ctype}; charset=utf-8')
+        req.send_header('Content-Length', str(len(body)))
+        req.end_headers()
+        req.wfile.write(body)
+
+# --- BROWSER STAND-IN ---
+class ReplayElement:
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self):
+        return self._tag.get_text(' ', strip=True)
+
+    def get_attribute(self, name):
+        v = self._tag.get(name)
+        return ' '.join(v) if isinstance(v, list) else v
+
+class _SwitchTo:
+    def __init__(self, d):
+        self._d = d
+
+    def new_window(self, kind='tab'):
+        self._d._open()
+
+    def window(self, handle):
+        if handle not in self._d._tabs: raise RuntimeError(f'no such window: {handle}')
+        self._d._current = handle
+
+class ReplayDriver:
+    """Just enough of a Chrome webdriver for the scrapers: tabs, get(), page_source, title,
+    find_elements() by CSS selector and location changes through execute_script()."""
+
+    def __init__(self, server):
+        self.server = server
+        self._tabs = {}
+        self._next = 0
+        self._current = None
+        self.switch_to = _SwitchTo(self)
+        self._open()
+
+    def _open(self):
+        self._next += 1
+        self._current = f'tab-{self._next}'
+        self._tabs[self._current] = {'url': 'about:blank', 'source': '<html></html>', 'soup': None}
+
+    @property
+    def _tab(self):
+        return self._tabs[self._current]
+
+    def get(self, url):
+        try:
+            with urllib.request.urlopen(self.server.local_url(url), timeout=30) as r:
+                source = r.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            source = e.read().decode('utf-8', 'replace')
+        self._tabs[self._current] = {'url': url, 'source': source, 'soup': None}
+
+    @property
+    def page_source(self):
+        return self._tab['source']
+
+    @property
+    def current_url(self):
+        return self._tab['url']
+
+    @property
+    def title(self):
+        m = re.search(r'<title[^>]*>(.*?)</title>', self.page_source, re.I | re.S)
+        return m.group(1).strip() if m else ''
+
+    @property
+    def window_handles(self):
+        return list(self._tabs)
+
+    @property
+    def current_window_handle(self):
+        return self._current
+
+    def find_elements(self, by, value):
+        if by != 'css selector': raise NotImplementedError(f'ReplayDriver only finds by CSS, not {by}')
+        tab = self._tab
+        if tab['soup'] is None:
+            from bs4 import BeautifulSoup
+            tab['soup'] = BeautifulSoup(tab['source'], 'html.parser')
+        return [ReplayElement(t) for t in tab['soup'].select(value)]
+
+    def execute_script(self, script, *args):
+        if 'location' in script and args:
+            self.get(args[0])
+            return None
+        return 1 if script.strip() == 'return 1' else None
+
+    def close(self):
+        self._tabs.pop(self._current, None)
+        if not self._tabs: self._open()
+
+    def delete_all_cookies(self): pass
+    def execute_cdp_cmd(self, cmd, params): return {}
+    def quit(self): self._tabs.clear()
+
+class ChromeReplayDriver:
+    """A real browser whose page loads are sent to the replay server instead of the live site."""
+
+    def __init__(self, server, driver):
+        self.server = server
+        self._driver = driver
+
+    def get(self, url):
+        return self._driver.get(self.server.local_url(url))
+
+    def execute_script(self, script, *args):
+        args = [self.server.local_url(a) if isinstance(a, str) and a.startswith('http') else a for a in args]
+        return self._driver.execute_script(script, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+class ReplayModel:
+    """Gemini stand-in: answers every prompt with the recorded reply."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def generate_content(self, prompt):
+        return type('Reply', (), {'text': self.text})()
+
+# --- SESSION ---
+class Replay:
+    def __init__(self, server, driver):
+        self.server = server
+        self.driver = driver
+        self.manifest = server.manifest
+        self.parse_seconds = 0.0
+        self.parse_calls = 0
+
+@contextmanager
+def session(fixtures=FIXTURES, latency_ms=0, chrome=False):
+    """Point every scraper dependency at a fresh ReplayServer for the duration.
+
+    Rate limiting, metrics and the scrape ledger are off, local stores (strategy stats, resolve cache)
+    go to a temp dir, and time spent in scrapers.parse_html is added up on the yielded Replay.
+    """
+    import scrapers
+    import local_db
+    import rate_limiter
+    import spotify_client
+    import strategy_stats
+    import resolve_cache
+    import metrics
+    import scrape_ledger
+
+    server = ReplayServer(fixtures, latency_ms).start()
+    real_driver = None
+    if chrome:
+        import driver_pool
+        real_driver = driver_pool.new_driver()
+        driver = ChromeReplayDriver(server, real_driver)
+    else:
+        driver = ReplayDriver(server)
+    rp = Replay(server, driver)
+    undo = []
+
+    def patch(obj, name, value):
+        undo.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    real_parse = scrapers.parse_html
+    def timed_parse(html):
+        start = time.perf_counter()
+        try: return real_parse(html)
+        finally:
+            rp.parse_seconds += time.perf_counter() - start
+            rp.parse_calls += 1
+
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        patch(local_db, 'DATA_DIR', tmp.name)
+        patch(strategy_stats, '_schema_ready', False)
+        patch(resolve_cache, '_schema_ready', False)
+        patch(rate_limiter, 'ENABLED', False)
+        patch(metrics, 'ENABLED', False)
+        patch(scrape_ledger, 'ENABLED', False)
+        patch(spotify_client, '_token', ('replay', time.time() + 86400))
+        patch(scrapers, 'parse_html', timed_parse)
+        try:
+            import requests
+            real_request = requests.Session.request
+            patch(requests.Session, 'request', lambda s, method, url, *a, **kw: real_request(s, method, server.local_url(url), *a, **kw))
+        except ImportError: pass
+        try:
+            import httpx
+
+            class Transport(httpx.AsyncBaseTransport):
+                def __init__(self, inner): self.inner = inner
+                async def handle_async_request(self, request):
+                    request.url = httpx.URL(server.local_url(str(request.url)))
+                    return await self.inner.handle_async_request(request)
+                async def aclose(self): await self.inner.aclose()
+
+            real_client = httpx.AsyncClient
+            class AsyncClient(real_client):
+                def __init__(self, *a, limits=httpx.Limits(), **kw):
+                    super().__init__(*a, transport=Transport(httpx.AsyncHTTPTransport(limits=limits)), **kw)
+            patch(httpx, 'AsyncClient', AsyncClient)
+        except ImportError: pass
+
+        undo.append((scrapers, 'model', scrapers.model))
+        undo.append((scrapers, 'headers', scrapers.headers))
+        undo.append((scrapers, '_default_driver', scrapers._default_driver))
+        scrapers.set_globals(driver, ReplayModel(rp.manifest.get('gemini_reply', '')), {'Authorization': 'Bearer replay'})
+        yield rp
+    finally:
+        for obj, name, value in reversed(undo): setattr(obj, name, value)
+        server.stop()
+        if real_driver is not None:
+            try: real_driver.quit()
+            except: pass
+        tmp.cleanup()
+
+# --- RECORDING ---
+def record(name, url, fixtures=FIXTURES, browser=False):
+    """Capture `url` from the live site as fixture `name`, replacing any fixture of that name."""
+    p = urlsplit(url)
+    key = f"{p.netloc}{p.path or '/'}" + (f"?{unquote_plus(p.query)}" if p.query else '')
+    if browser:
+        import driver_pool
+        d = driver_pool.new_driver()
+        try:
+            d.get(url)
+            time.sleep(5)
+            body, ctype = d.page_source, 'text/html'
+        finally:
+            d.quit()
+    else:
+        import rate_limiter
+        r = rate_limiter.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
+        body, ctype = r.text, r.headers.get('Content-Type', 'text/html').split(';')[0]
+    ext = 'json' if 'json' in ctype else 'html'
+    with open(os.path.join(fixtures, f'{name}.{ext}'), 'w', encoding='utf-8') as f: f.write(body)
+
+    manifest = load_manifest(fixtures)
+    entries = [e for e in manifest['fixtures'] if e['name'] != name]
+    entries.append({'name': name, 'match': re.escape(key), 'file': f'{name}.{ext}', 'type': ctype})
+    manifest['fixtures'] = entries
+    with open(os.path.join(fixtures, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    print(f"📼 Recorded {url} as {name}.{ext} ({len(body):,} bytes)")
+
+if __name__ == "__main__":
+    # python3 replay.py serve | record <name> <url> [--browser]
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ''
+    if cmd == 'serve':
+        server = ReplayServer().start()
+        print(f"📼 Replaying {len(server.routes)} fixture(s) at {server.base}/<host>/<path>  (Ctrl-C to stop)")
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+    elif cmd == 'record' and len(sys.argv) > 3:
+        record(sys.argv[2], sys.argv[3], browser='--browser' in sys.argv)
+    else:
+        print("Usage: python3 replay.py serve | record <name> <url> [--browser]")
@@ -0,0 +1,70 @@
+import os
+import time
+import local_db
+
+# (platform, artist) -> resolved handle/ID from the search-engine lookups.
+# Misses are cached too, for a shorter time, so a dead end is not re-searched on every refresh.
+TTL = float(os.environ.get('RESOLVE_TTL_DAYS', 30)) * 86400
+NEGATIVE_TTL = float(os.environ.get('RESOLVE_NEGATIVE_TTL_HOURS', 24)) * 3600
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('resolutions')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resolutions (
+                platform TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                value TEXT,
+                resolved_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (platform, artist)
+            )
+        """)
+        _schema_ready = True
+    return conn
+
+def lookup(platform, artist):
+    """Returns (hit, value). A hit with value None is a cached 'not found'."""
+    conn = get_conn()
+    try:
+        row = conn.execute("SELECT value, expires_at FROM resolutions WHERE platform = ? AND artist = ?",
+                           (platform, artist)).fetchone()
+    finally:
+        conn.close()
+    if row and row['expires_at'] > time.time():
+        return True, row['value']
+    return False, None
+
+def store(platform, artist, value):
+    now = time.time()
+    conn = get_conn()
+    try:
+        conn.execute("INSERT OR REPLACE INTO resolutions (platform, artist, value, resolved_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                     (platform, artist, value, now, now + (TTL if value else NEGATIVE_TTL)))
+    finally:
+        conn.close()
+
+def invalidate(platform, artist=None):
+    conn = get_conn()
+    try:
+        if artist is None:
+            conn.execute("DELETE FROM resolutions WHERE platform = ?", (platform,))
+        else:
+            conn.execute("DELETE FROM resolutions WHERE platform = ? AND artist = ?", (platform, artist))
+    finally:
+        conn.close()
+
+def resolve(platform, artist, search_fn, force=False):
+    """Cached search_fn(): only calls it on a miss, an expired entry, or force=True."""
+    if not force:
+        try:
+            hit, value = lookup(platform, artist)
+            if hit: return value
+        except: pass
+    value = search_fn()
+    try: store(platform, artist, value)
+    except: pass
+    return value
@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+import db
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Rendered read responses keyed on (path, query string), valid while the ARTISTS table version
+# is unchanged. The version is max(updated_at) + row count, which catches scraper writes from
+# other processes, plus a local counter bumped by this process's own edits and deletes.
+MAX_ENTRIES = 64
+MIN_COMPRESS_BYTES = 1024
+
+_entries = OrderedDict()  # key -> {'version', 'etag', 'body', 'headers', 'encoded': {encoding: bytes}}
+_local_version = 0
+_lock = threading.Lock()
+
+def table_version():
+    row = db.query("SELECT MAX(updated_at) AS newest, COUNT(*) AS n FROM ARTISTS", one=True)
+    with _lock:
+        return f"{row['newest']}|{row['n']}|{_local_version}"
+
+def invalidate():
+    global _local_version
+    with _lock:
+        _local_version += 1
+        _entries.clear()
+
+def get(key, version, build):
+    """Cached entry for `key` at `version`; build() -> (body bytes, headers dict) on a miss."""
+    with _lock:
+        entry = _entries.get(key)
+        if entry and entry['version'] == version:
+            _entries.move_to_end(key)
+            return entry
+    body, headers = build()
+    entry = {'version': version, 'etag': '"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+             'body': body, 'headers': headers, 'encoded': {}}
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES: _entries.popitem(last=False)
+    return entry
+
+def pick_encoding(accept_encoding, size):
+    if size < MIN_COMPRESS_BYTES: return None
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in accepted: return 'br'
+    if 'gzip' in accepted: return 'gzip'
+    return None
+
+def encoded_body(entry, encoding):
+    if encoding is None: return entry['body']
+    body = entry['encoded'].get(encoding)
+    if body is None:
+        body = brotli.compress(entry['body'], quality=5) if encoding == 'br' else gzip.compress(entry['body'], 6)
+        entry['encoded'][encoding] = body
+    return body
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match: return False
+    tags = [t.strip() for t in if_none_match.split(',')]
+    # A compressed representation is served with a suffixed tag; any of them revalidates
+    return '*' in tags or any(t == etag or t.startswith(etag[:-1] + '-') for t in tags)
@@ -0,0 +1,232 @@
+import os
+import csv
+import uuid
+import socket
+import atexit
+import threading
+
+# Refresh outcomes, in the SCRAPE_ATTEMPTS table next to ARTISTS: every refresh adds one row
+# per metric with strategy = 'refresh' (per-strategy outcomes live in metrics and
+# strategy_stats, not here). A refresh row that came back empty stays 'open' until a later
+# refresh fills the metric or a recovery worker claims and resolves it. claim() takes rows
+# with a single UPDATE ... LIMIT, so parallel workers never get the same row. A recovery run
+# refreshes its claims' claimed_at every HEARTBEAT seconds; claims not refreshed for
+# CLAIM_TIMEOUT are presumed lost (crashed run) and handed out again, and a failure a worker
+# handed back waits RETRY_DELAY before anyone tries it again.
+ENABLED = os.environ.get('SCRAPE_LEDGER', '1') != '0'
+HEARTBEAT = int(os.environ.get('LEDGER_HEARTBEAT', 20))
+CLAIM_TIMEOUT = int(os.environ.get('LEDGER_CLAIM_TIMEOUT', 90))  # a few missed heartbeats
+RETRY_DELAY = int(os.environ.get('LEDGER_RETRY_DELAY', 600))
+MAX_TRIES = int(os.environ.get('LEDGER_MAX_TRIES', 3))  # recovery attempts before a failure is given up
+BATCH_SIZE = 200
+MAX_BUFFER = 5000  # rows kept while MySQL is unreachable; the oldest go first
+REFRESH = 'refresh'
+
+# Labels used in failed_scrapes.csv 'Details' -> (platform, ARTISTS column)
+LEGACY_LABELS = {
+    'IG': [('instagram', 'instagram_followers')],
+    'Twitter': [('twitter', 'twitter_followers')],
+    'Spotify Fol': [('spotify', 'spotify_followers')],
+    'Spotify Lis': [('spotify', 'spotify_listeners')],
+    'Spotify': [('spotify', 'spotify_followers'), ('spotify', 'spotify_listeners')],
+    'Stubhub': [('stubhub', 'stubhub_favourites')],
+}
+
+_lock = threading.Lock()
+_rows = []
+_schema_ready = False
+
+def _db():
+    import db  # mysql.connector loads on the first write
+    return db
+
+def ensure_table():
+    global _schema_ready
+    if _schema_ready: return
+    _db().execute("""
+        CREATE TABLE IF NOT EXISTS SCRAPE_ATTEMPTS (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            artist VARCHAR(255) NOT NULL,
+            platform VARCHAR(32) NOT NULL,
+            strategy VARCHAR(64) NOT NULL,
+            metric VARCHAR(64) NULL,
+            outcome VARCHAR(16) NOT NULL,
+            value BIGINT NULL,
+            latency FLOAT NULL,
+            error_class VARCHAR(64) NULL,
+            error VARCHAR(255) NULL,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(16) NULL,
+            tries INT NOT NULL DEFAULT 0,
+            claimed_by VARCHAR(96) NULL,
+            claimed_at DATETIME NULL,
+            resolved_at DATETIME NULL,
+            INDEX idx_attempts_status (status, claimed_at, id),
+            INDEX idx_attempts_artist (artist, metric, status)
+        )
+    """)
+    _schema_ready = True
+
+# --- RECORDING ---
+def _number(v):
+    if isinstance(v, bool) or v is None: return None
+    try: return int(v)
+    except (TypeError, ValueError, OverflowError): return None
+
+def record(artist, platform, strategy, ok, value=None, latency=None, error=None, metric=None):
+    """Buffer one attempt. `error` is the exception (or message) it failed with, if any.
+
+    A failed 'refresh' row is left open for recovery. Rows go out on flush().
+    """
+    if not ENABLED or not artist: return
+    outcome = 'success' if ok else 'error' if error is not None else 'failure'
+    error_class = type(error).__name__ if isinstance(error, BaseException) else None
+    message = str(error)[:255] if error is not None else None
+    status = 'open' if strategy == REFRESH and not ok else None
+    with _lock:
+        _rows.append((artist, platform, strategy, metric, outcome, _number(value),
+                      round(latency, 3) if latency is not None else None, error_class, message, status))
+        full = len(_rows) >= BATCH_SIZE
+    if full: flush()
+
+def flush():
+    """Write buffered rows in multi-row INSERTs. A refresh that filled a metric also resolves
+    that metric's open failures. Never raises: the ledger must not break a scrape."""
+    with _lock:
+        rows = _rows[:]
+        del _rows[:]
+    if not rows: return 0
+    filled = {(r[0], r[3]) for r in rows if r[2] == REFRESH and r[4] == 'success'}
+    try:
+        ensure_table()
+        conn = _db().get_conn()
+        try:
+            with conn.cursor() as cur:
+                for i in range(0, len(rows), BATCH_SIZE):
+                    chunk = rows[i:i + BATCH_SIZE]
+                    cur.execute("""INSERT INTO SCRAPE_ATTEMPTS (artist, platform, strategy, metric, outcome, value, latency,
+                                       error_class, error, status) VALUES """
+                                + ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(chunk)),
+                                tuple(p for r in chunk for p in r))
+                if filled:
+                    cur.execute(f"""UPDATE SCRAPE_ATTEMPTS SET status = 'resolved', resolved_at = NOW()
+                                    WHERE status = 'open' AND (artist, metric) IN ({', '.join(['(%s, %s)'] * len(filled))})""",
+                                tuple(p for key in filled for p in key))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+    except Exception as e:
+        print(f"⚠️ Scrape ledger flush failed: {e}")
+        with _lock:
+            _rows[:0] = rows
+            del _rows[:-MAX_BUFFER]
+        return 0
+
+atexit.register(flush)
+
+# --- RECOVERY ---
+def outstanding(platform=None, limit=None):
+    """Open failures, oldest first (not claimed by anyone)."""
+    ensure_table()
+    q = "SELECT * FROM SCRAPE_ATTEMPTS WHERE status = 'open'"
+    params = []
+    if platform:
+        q += " AND platform = %s"
+        params.append(platform)
+    q += " ORDER BY id"
+    if limit:
+        q += " LIMIT %s"
+        params.append(int(limit))
+    return _db().query(q, tuple(params))
+
+def counts():
+    """{status: rows} over the failures recovery knows about."""
+    ensure_table()
+    rows = _db().query("SELECT status, COUNT(*) AS n FROM SCRAPE_ATTEMPTS WHERE status IS NOT NULL GROUP BY status")
+    return {r['status']: r['n'] for r in rows}
+
+def open_metrics():
+    """{(artist, metric)} whose latest refresh failed and is not recovered yet."""
+    ensure_table()
+    rows = _db().query("SELECT DISTINCT artist, metric FROM SCRAPE_ATTEMPTS WHERE status IN ('open', 'claimed')")
+    return {(r['artist'], r['metric']) for r in rows}
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def new_run():
+    """A token naming one recovery run; pass it as claim(worker=...) and to heartbeat()."""
+    return f"{worker_id()}:{uuid.uuid4().hex[:8]}"
+
+def claim(limit=50, worker=None, platform=None):
+    """Atomically take up to `limit` open (or abandoned) failures, oldest first.
+
+    Returns the claimed rows; each carries the claimed_by token resolve()/fail() check.
+    """
+    ensure_table()
+    token = f"{worker or worker_id()}:{uuid.uuid4().hex[:8]}"
+    q = """UPDATE SCRAPE_ATTEMPTS SET status = 'claimed', claimed_by = %s, claimed_at = NOW(), tries = tries + 1
+           WHERE ((status = 'open' AND (claimed_at IS NULL OR claimed_at < NOW() - INTERVAL %s SECOND))
+                  OR (status = 'claimed' AND claimed_at < NOW() - INTERVAL %s SECOND))"""
+    params = [token, RETRY_DELAY, CLAIM_TIMEOUT]
+    if platform:
+        q += " AND platform = %s"
+        params.append(platform)
+    q += " ORDER BY id LIMIT %s"
+    params.append(int(limit))
+    if not _db().execute(q, tuple(params)): return []
+    return _db().query("SELECT * FROM SCRAPE_ATTEMPTS WHERE claimed_by = %s AND status = 'claimed' ORDER BY id", (token,))
+
+def _like_prefix(run):
+    return run.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + ':%'
+
+def heartbeat(run):
+    """Refresh claimed_at on every row still claimed by `run` (the worker= given to claim())."""
+    return _db().execute("UPDATE SCRAPE_ATTEMPTS SET claimed_at = NOW() WHERE status = 'claimed' AND claimed_by LIKE %s",
+                         (_like_prefix(run),))
+
+def release_stale():
+    """Reopen claims whose run stopped heartbeating (a crashed recovery run), so a restart picks
+    them up again. Returns the count."""
+    ensure_table()
+    # The interrupted try does not count against MAX_TRIES
+    return _db().execute("""UPDATE SCRAPE_ATTEMPTS SET status = 'open', claimed_by = NULL, claimed_at = NULL,
+                            tries = GREATEST(tries - 1, 0)
+                            WHERE status = 'claimed' AND claimed_at < NOW() - INTERVAL %s SECOND""", (CLAIM_TIMEOUT,))
+
+def resolve(row):
+    """Mark a claimed failure (and any older open one for the same metric) as recovered."""
+    return _db().execute("""UPDATE SCRAPE_ATTEMPTS SET status = 'resolved', resolved_at = NOW(), claimed_by = NULL
+                         WHERE (id = %s AND claimed_by = %s)
+                            OR (artist = %s AND metric = %s AND status = 'open' AND id < %s)""",
+                      (row['id'], row['claimed_by'], row['artist'], row['metric'], row['id']))
+
+def fail(row):
+    """Hand a claimed failure back: open again, or 'given_up' after MAX_TRIES recoveries."""
+    return _db().execute("""UPDATE SCRAPE_ATTEMPTS SET status = IF(tries >= %s, 'given_up', 'open'), claimed_by = NULL
+                         WHERE id = %s AND claimed_by = %s""", (MAX_TRIES, row['id'], row['claimed_by']))
+
+def import_csv(path='failed_scrapes.csv'):
+    """Move a leftover failed_scrapes.csv (Artist, Details) into the ledger as open failures,
+    then rename it to *.imported. Returns the number of rows added."""
+    if not os.path.exists(path): return 0
+    with open(path, newline='') as f:
+        entries = list(csv.DictReader(f))
+    added = 0
+    for e in entries:
+        name, details = (e.get('Artist') or '').strip(), e.get('Details') or ''
+        seen = set()
+        for part in details.split(','):
+            label = part.split(':')[0].strip()
+            for platform, metric in LEGACY_LABELS.get(label, []):
+                if metric in seen: continue
+                seen.add(metric)
+                record(name, platform, REFRESH, False, error=part.strip(), metric=metric)
+                added += 1
+    flush()
+    with _lock:
+        if _rows: raise RuntimeError(f"Could not import {path} into the scrape ledger")
+    os.replace(path, path + '.imported')
+    print(f"📥 Imported {added} failure(s) from {path}")
+    return added
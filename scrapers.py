@@ -1,29 +1,68 @@
 import os
 import re
+import sys
 import json
 import time
-import requests
-import pandas as pd
-import numpy as np
-import mysql.connector
-from bs4 import BeautifulSoup
-from googlesearch import search
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+import threading
+from contextlib import contextmanager, ExitStack
+import spotify_client
+import resolve_cache
+import strategy_stats
+import rate_limiter
+import metrics
 
 # --- GLOBAL VARIABLES TO BE SET BY CALLER ---
-driver = None
 model = None
 headers = {}
+_default_driver = None
+_local = threading.local()
 
 def set_globals(d, m, h):
-    global driver, model, headers
-    driver = d
+    global _default_driver, model, headers
+    _default_driver = d
     model = m
     headers = h
 
+def current_driver():
+    """This thread's browser (leased on first use inside thread_driver()), else the set_globals one."""
+    factory = getattr(_local, 'factory', None)
+    if factory is None: return _default_driver
+    if _local.driver is None: _local.driver = factory()
+    return _local.driver
+
+@contextmanager
+def thread_driver(acquire, release):
+    """Give the calling thread its own browser for the block: acquire() is only called if a
+    strategy actually touches `driver`, and release(d) hands it back afterwards."""
+    _local.factory, _local.driver = acquire, None
+    try:
+        yield
+    finally:
+        d, _local.factory, _local.driver = _local.driver, None, None
+        if d is not None: release(d)
+
+class _DriverProxy:
+    """`driver` as seen by the scrapers: forwards to current_driver() so threads never share a browser."""
+
+    def __getattr__(self, name):
+        d = current_driver()
+        if d is None: raise RuntimeError('No browser: call set_globals() or use thread_driver()')
+        return getattr(d, name)
+
+    def __bool__(self):
+        return current_driver() is not None
+
+driver = _DriverProxy()
+
 # --- UTILITY FUNCTIONS ---
+# bs4, googlesearch and selenium are imported by the strategies that use them, so an
+# HTTP-only refresh never loads them. CSS is selenium's By.CSS_SELECTOR.
+CSS = 'css selector'
+
+def parse_html(html):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
 def convert_string_to_number(s):
     if not s: return 0
     s = str(s).lower().strip()
@@ -36,65 +75,260 @@ def convert_string_to_number(s):
 
 def clean_for_mysql(v):
     if v is None: return None
-    if isinstance(v, (float, np.floating)) and np.isnan(v): return None
-    if isinstance(v, (np.integer, np.floating)): return v.item()
+    if isinstance(v, float) and v != v: return None
+    # numpy scalars can only show up if the caller already imported numpy
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(v, (np.integer, np.floating)): return v.item()
     if isinstance(v, str) and v.lower() == 'nan': return None
     return v
 
-def get_first_search_result(query):
-    try:
-        driver.get(f"https://www.google.com/search?q={query}")
-        time.sleep(2)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        res = soup.find('div', class_='g')
-        if res and res.find('a'): return res.find('a')['href']
-    except: pass
-    
-    try:
-        driver.get(f"https://www.bing.com/search?q={query}")
-        time.sleep(2)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        res = soup.find('li', class_='b_algo')
-        if res and res.find('a'): return res.find('a')['href']
-    except: pass
-    
-    try:
-        driver.get(f"https://search.yahoo.com/search?p={query}")
-        time.sleep(2)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        res = soup.find('div', class_=re.compile(r'algo-sr|dd\\s+algo'))
-        if res and res.find('a'): return res.find('a')['href']
-    except: pass
-    
-    try:
+# --- READINESS WAITS ---
+# Instead of sleeping a fixed time after driver.get, poll a per-site predicate with a
+# short backoff. Timeouts match the old fixed sleeps, so a slow page is no worse off.
+WAIT_STATS = {}
+_wait_lock = threading.Lock()
+
+def wait_until(site, predicate, timeout=5, poll=0.1, max_poll=1.0):
+    """Poll predicate(driver) until it returns something truthy or `timeout` seconds pass."""
+    start = time.time()
+    delay = poll
+    while True:
+        try: result = predicate(driver)
+        except: result = None
+        elapsed = time.time() - start
+        if result or elapsed >= timeout: break
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * 1.5, max_poll)
+    with _wait_lock:
+        st = WAIT_STATS.setdefault(site, {'count': 0, 'timeouts': 0, 'total': 0.0, 'max': 0.0})
+        st['count'] += 1
+        st['total'] += elapsed
+        st['max'] = max(st['max'], elapsed)
+        if not result: st['timeouts'] += 1
+    return result
+
+def wait_stats():
+    """Per-site wait summary: how often we waited, average/max seconds, and how many timed out."""
+    with _wait_lock:
+        return {site: {**st, 'avg': st['total'] / st['count'] if st['count'] else 0.0}
+                for site, st in WAIT_STATS.items()}
+
+def site_name(url):
+    m = re.search(r'https?://(?:www\.)?([^/?#]+)', url)
+    return m.group(1) if m else url
+
+def has_element(css):
+    return lambda d: d.find_elements(CSS, css)
+
+def has_text(pattern):
+    rx = re.compile(pattern, re.I)
+    return lambda d: rx.search(d.page_source)
+
+def has_meta(prop, pattern=None):
+    rx = re.compile(pattern, re.I) if pattern else None
+    def check(d):
+        for el in d.find_elements(CSS, f'meta[property="{prop}"]'):
+            content = el.get_attribute('content') or ''
+            if content and (not rx or rx.search(content)): return el
+        return None
+    return check
+
+def odometer_ready(css, lo, hi):
+    """Odometer has rendered a plausible number (it animates up from 0 first)."""
+    def check(d):
+        for el in d.find_elements(CSS, css):
+            val = convert_string_to_number(re.sub(r'[^0-9KMBkm.]', '', el.text))
+            if lo < val < hi: return el
+        return None
+    return check
+
+# --- ODOMETER SAMPLER ---
+class OdometerSampler:
+    """Reads live-count odometers (livecounts, instastatistics) until the readings settle.
+
+    Every URL gets its own tab and all tabs load in parallel; each round reads every tab once.
+    A tab converges when its last `min_agree` readings are within `rel_tol` of each other.
+    sample() returns (value, confidence), where confidence is the share of that tab's readings
+    agreeing with the value (halved if nothing converged before `max_duration`).
+    """
+
+    def __init__(self, lo, hi, css='.odometer-inside, .odometer', rel_tol=0.01, min_agree=3,
+                 max_duration=15, interval=0.5):
+        self.lo, self.hi = lo, hi
+        self.css = css
+        self.rel_tol = rel_tol
+        self.min_agree = min_agree
+        self.max_duration = max_duration
+        self.interval = interval
+
+    def _read(self, d):
+        el = odometer_ready(self.css, self.lo, self.hi)(d)
+        return convert_string_to_number(re.sub(r'[^0-9KMBkm.]', '', el.text)) if el else None
+
+    def _agree(self, vals, ref):
+        return [v for v in vals if abs(v - ref) <= ref * self.rel_tol]
+
+    def _converged(self, vals):
+        if len(vals) < self.min_agree: return False
+        tail = vals[-self.min_agree:]
+        return len(self._agree(tail, tail[-1])) == len(tail)
+
+    def _confidence(self, vals, value, converged):
+        conf = len(self._agree(vals, value)) / len(vals)
+        return round(conf if converged else conf / 2, 2)
+
+    def sample(self, urls, d=None):
+        d = d or driver
+        home = d.current_window_handle
+        tabs = {}
+        start = time.time()
+        leases = ExitStack()  # each tab holds its site's rate-limit slot until sampling ends
+        try:
+            for i, url in enumerate(urls):
+                leases.enter_context(rate_limiter.limit(url))
+                if i: d.switch_to.new_window('tab')
+                # Non-blocking navigation so every site loads at the same time
+                d.execute_script('window.location.href = arguments[0];', url)
+                tabs[d.current_window_handle] = []
+            while time.time() - start < self.max_duration:
+                for h, vals in tabs.items():
+                    try:
+                        d.switch_to.window(h)
+                        val = self._read(d)
+                    except: val = None
+                    if val is None: continue
+                    vals.append(val)
+                    if self._converged(vals):
+                        return vals[-1], self._confidence(vals, vals[-1], True)
+                time.sleep(self.interval)
+            best = max(tabs.values(), key=len, default=[])
+            if best:
+                value = int(sum(best) / len(best))
+                return value, self._confidence(best, value, False)
+            return None, 0.0
+        finally:
+            for h in list(tabs):
+                if h == home: continue
+                try:
+                    d.switch_to.window(h)
+                    d.close()
+                except: pass
+            try: d.switch_to.window(home)
+            except: pass
+            leases.close()
+
+# --- ADAPTIVE FALLBACK CHAINS ---
+def attempt(platform, name, fn):
+    """Run one strategy, recording its latency and outcome in metrics.
+    Returns (result, seconds); an exception counts as a failure with result None."""
+    start = time.time()
+    try: result = fn()
+    except Exception: result = None
+    secs = time.time() - start
+    metrics.observe('scraper_strategy_seconds', secs, platform=platform, strategy=name)
+    metrics.inc('scraper_strategy_total', platform=platform, strategy=name, outcome='success' if result else 'failure')
+    return result, secs
+
+def run_chain(platform, artist, strategies):
+    """Try (name, fn) strategies until one returns True, in the order strategy_stats picks.
+
+    Every attempt's outcome and latency is recorded. Returns the winning name or None.
+    """
+    fns = dict(strategies)
+    try: names = strategy_stats.order(platform, artist, [n for n, _ in strategies])
+    except: names = [n for n, _ in strategies]
+    for name in names:
+        result, secs = attempt(platform, name, fns[name])
+        ok = bool(result)
+        try: strategy_stats.record(platform, name, artist, ok, secs)
+        except: pass
+        if ok: return name
+    return None
+
+# --- PARSERS (shared by the Selenium/requests strategies and the async fast path) ---
+IG_APP_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36', 'x-ig-app-id': '936619743392459'}
+
+def ig_api_url(username):
+    return f'https://i.instagram.com/api/v1/users/web_profile_info/?username={username}'
+
+def parse_ig_api(data):
+    return data['data']['user']['edge_followed_by']['count']
+
+def spotify_search_url(artist):
+    return f'https://api.spotify.com/v1/search?q=artist:{artist}&type=artist&limit=1'
+
+def parse_spotify_search(data):
+    items = data['artists']['items']
+    return items[0]['id'] if items else None
+
+def parse_monthly_listeners(html):
+    soup = parse_html(html)
+    meta = soup.find('meta', attrs={'property': 'og:description'})
+    if meta:
+        m = re.search(r'([\d,.]+[KMB]?)\s*monthly listeners', meta.get('content',''), re.I)
+        if m: return convert_string_to_number(m.group(1))
+    return 0
+
+def _search_google(query):
+    driver.get(f"https://www.google.com/search?q={query}")
+    wait_until('google', has_element('div.g a'), timeout=2)
+    res = parse_html(driver.page_source).find('div', class_='g')
+    return res.find('a')['href'] if res and res.find('a') else None
+
+def _search_bing(query):
+    driver.get(f"https://www.bing.com/search?q={query}")
+    wait_until('bing', has_element('li.b_algo a'), timeout=2)
+    res = parse_html(driver.page_source).find('li', class_='b_algo')
+    return res.find('a')['href'] if res and res.find('a') else None
+
+def _search_yahoo(query):
+    driver.get(f"https://search.yahoo.com/search?p={query}")
+    wait_until('yahoo', has_element('div.algo-sr a, div.algo a'), timeout=2)
+    res = parse_html(driver.page_source).find('div', class_=re.compile(r'algo-sr|dd\\s+algo'))
+    return res.find('a')['href'] if res and res.find('a') else None
+
+def _search_googlesearch(query):
+    from googlesearch import search
+    with rate_limiter.limit('google.com'):
         results = list(search(query, num_results=1))
-        if results: return results[0]
-    except: pass
+    return results[0] if results else None
+
+SEARCH_ENGINES = [('google', _search_google), ('bing', _search_bing), ('yahoo', _search_yahoo),
+                  ('googlesearch', _search_googlesearch)]
+
+def get_first_search_result(query):
+    for engine, fn in SEARCH_ENGINES:
+        url, _ = attempt('search', engine, lambda: fn(query))
+        if url: return url
     return None
 
 # --- SCRAPER CLASSES ---
 class InstagramProfile:
-    def __init__(self, artist, username=None):
+    def __init__(self, artist, username=None, force_resolve=False):
         self.artist = artist
         self.username = username
+        self.force_resolve = force_resolve
         self.follower_count = 0
+        self.confidence = None  # set when the count comes from the odometer sampler
 
-    def get_username(self):
-        if self.username: return self.username
+    def _search_username(self):
         url = get_first_search_result(f'instagram {self.artist} official')
         if url:
             match = re.search(r'instagram\.com/([^/?]+)', url)
             if match and match.group(1) not in ['p', 'reels', 'stories']: 
-                self.username = match.group(1)
+                return match.group(1)
+        return None
+
+    def get_username(self):
+        if self.username: return self.username
+        self.username = resolve_cache.resolve('instagram', self.artist, self._search_username, self.force_resolve)
         return self.username
 
     def _try_api(self):
         try:
-            url = f'https://i.instagram.com/api/v1/users/web_profile_info/?username={self.username}'
-            h = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36', 'x-ig-app-id': '936619743392459'}
-            r = requests.get(url, headers=h, timeout=10)
+            r = rate_limiter.get(ig_api_url(self.username), headers=IG_APP_HEADERS, timeout=10)
             if r.status_code == 200:
-                self.follower_count = r.json()['data']['user']['edge_followed_by']['count']
+                self.follower_count = parse_ig_api(r.json())
                 return True
         except: pass
         return False
@@ -104,40 +338,19 @@ class InstagramProfile:
             f'https://livecounts.nl/instagram-realtime/?u={self.username}',
             f'https://instastatistics.com/{self.username}'
         ]
-        for url in sites:
-            try:
-                driver.get(url)
-                time.sleep(7)
-                valid_readings = []
-                for i in range(5):
-                    try:
-                        try:
-                            el = driver.find_element(By.CSS_SELECTOR, '.odometer-inside')
-                        except:
-                            el = driver.find_element(By.CSS_SELECTOR, '.odometer')
-                        
-                        if el:
-                            txt = el.text
-                            val = convert_string_to_number(re.sub(r'[^0-9KMBkm.]', '', txt))
-                            if 1000 < val < 1000000000:
-                                valid_readings.append(val)
-                            if len(valid_readings) >= 2:
-                                if abs(valid_readings[-1] - valid_readings[-2]) < (valid_readings[-1] * 0.01):
-                                    self.follower_count = valid_readings[-1]
-                                    return True
-                    except: pass
-                    time.sleep(2)
-                if valid_readings:
-                    self.follower_count = int(sum(valid_readings) / len(valid_readings))
-                    return True
-            except: pass
+        try:
+            val, self.confidence = OdometerSampler(1000, 1000000000).sample(sites)
+            if val:
+                self.follower_count = val
+                return True
+        except: pass
         return False
 
     def _try_selenium(self):
         try:
             driver.get(f'https://www.instagram.com/{self.username}/')
-            time.sleep(5)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            wait_until('instagram.com', has_meta('og:description', r'Followers'), timeout=5)
+            soup = parse_html(driver.page_source)
             meta = soup.find('meta', attrs={'property': 'og:description'})
             if meta:
                 content = meta.get('content', '')
@@ -182,32 +395,40 @@ class InstagramProfile:
 
     def get_all(self):
         if not self.get_username(): return None, 0
-        if self._try_api(): return self.username, self.follower_count
-        if self._try_specialized(): return self.username, self.follower_count 
-        if self._try_selenium(): return self.username, self.follower_count
-        self._try_gemini()
+        if run_chain('instagram', self.artist, [
+            ('api', self._try_api),
+            ('specialized', self._try_specialized),
+            ('selenium', self._try_selenium),
+        ]): return self.username, self.follower_count
+        attempt('instagram', 'gemini', self._try_gemini)
         return self.username, self.follower_count
 
 class TwitterProfile:
-    def __init__(self, artist, username=None):
+    def __init__(self, artist, username=None, force_resolve=False):
         self.artist = artist
         self.username = username
+        self.force_resolve = force_resolve
         self.follower_count = 0
+        self.confidence = None  # set when the count comes from the odometer sampler
 
-    def get_username(self):
-        if self.username: return self.username
+    def _search_username(self):
         url = get_first_search_result(f'twitter {self.artist} official')
         if url:
             match = re.search(r'(?:twitter|x)\.com/([^/?]+)', url)
             if match and match.group(1) not in ['intent', 'share', 'search', 'i', 'x']: 
-                self.username = match.group(1)
+                return match.group(1)
+        return None
+
+    def get_username(self):
+        if self.username: return self.username
+        self.username = resolve_cache.resolve('twitter', self.artist, self._search_username, self.force_resolve)
         return self.username
 
     def _try_verified(self):
         try:
             driver.get(f'https://x.com/{self.username}/verified_followers')
-            time.sleep(5)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            wait_until('x.com', has_element('a[href$="/verified_followers"]'), timeout=5)
+            soup = parse_html(driver.page_source)
             els = soup.find_all('a', href=re.compile(r'/verified_followers$'))
             for el in els:
                 if 'Follower' in el.get_text():
@@ -224,35 +445,19 @@ class TwitterProfile:
             f'https://livecounts.nl/twitter-realtime/?u={self.username}', 
             f'https://livecounts.io/twitter-live-follower-counter/{self.username}'
         ]
-        for url in sites:
-            try:
-                driver.get(url); time.sleep(7)
-                valid_readings = []
-                for i in range(5):
-                    try:
-                        try:
-                            el = driver.find_element(By.CSS_SELECTOR, '.odometer-inside')
-                        except:
-                            el = driver.find_element(By.CSS_SELECTOR, '.followers-odometer, .odometer')
-                        if el:
-                            val = convert_string_to_number(re.sub(r'[^0-9KMBkm.]', '', el.text))
-                            if 1000 < val < 300000000: valid_readings.append(val)
-                            if len(valid_readings) >= 2:
-                                if abs(valid_readings[-1] - valid_readings[-2]) < (valid_readings[-1] * 0.01):
-                                    self.follower_count = valid_readings[-1]; return True
-                    except: pass
-                    time.sleep(2)
-                if valid_readings:
-                    self.follower_count = int(sum(valid_readings) / len(valid_readings))
-                    return True
-            except: pass
+        try:
+            val, self.confidence = OdometerSampler(1000, 300000000, css='.odometer-inside, .followers-odometer, .odometer').sample(sites)
+            if val:
+                self.follower_count = val
+                return True
+        except: pass
         return False
 
     def _try_selenium_profile(self):
         try:
             driver.get(f'https://x.com/{self.username}')
-            time.sleep(5)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            wait_until('x.com', has_text(r'[\d,.]+[KMB]?\s*Followers'), timeout=5)
+            soup = parse_html(driver.page_source)
             txt = soup.get_text()
             matches = re.findall(r'([\d,.]+[KMB]?)\s*Followers', txt, re.I)
             candidates = [convert_string_to_number(m) for m in matches if 1000 < convert_string_to_number(m) < 200000000]
@@ -263,12 +468,13 @@ class TwitterProfile:
     def _try_google_snippet(self):
         try:
             u = f'https://www.google.com/search?q=twitter+{self.username}+followers'
-            driver.get(u); time.sleep(2)
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            match = re.search(r'([\d,.]+[KMB]?)\s*Followers', soup.get_text(), re.I)
-            if match:
-                 val = convert_string_to_number(match.group(1))
-                 if 1000 < val < 200000000: self.follower_count = val; return True
+            driver.get(u)
+            wait_until('google', has_text(r'[\d,.]+[KMB]?\s*Followers'), timeout=2)
+            soup = parse_html(driver.page_source)
+            # The query itself ("...taylorswift13 followers") is on the page too, so skip implausible hits
+            matches = re.findall(r'([\d,.]+[KMB]?)\s*Followers', soup.get_text(), re.I)
+            candidates = [v for v in map(convert_string_to_number, matches) if 1000 < v < 200000000]
+            if candidates: self.follower_count = candidates[0]; return True
         except: pass
         return False
 
@@ -292,77 +498,102 @@ class TwitterProfile:
 
     def get_all(self):
         if not self.get_username(): return None, 0
-        if self._try_verified():
-             if self.follower_count > 50000000: return self.username, self.follower_count
-        if self._try_specialized(): return self.username, self.follower_count
-        if self._try_selenium_profile(): return self.username, self.follower_count
-        if self._try_google_snippet(): return self.username, self.follower_count
-        self._try_gemini()
+        if run_chain('twitter', self.artist, [
+            # verified_followers only counts for accounts big enough for it to be reliable
+            ('verified', lambda: self._try_verified() and self.follower_count > 50000000),
+            ('specialized', self._try_specialized),
+            ('selenium_profile', self._try_selenium_profile),
+            ('google_snippet', self._try_google_snippet),
+        ]): return self.username, self.follower_count
+        attempt('twitter', 'gemini', self._try_gemini)
         return self.username, self.follower_count
 
 class SpotifyProfile:
-    def __init__(self, artist, spotifyID=None, genre=None):
+    def __init__(self, artist, spotifyID=None, genre=None, force_resolve=False):
         self.artist = artist
         self.spotifyID = spotifyID
+        self.force_resolve = force_resolve
         self.genre = genre
         self.followers = 0
         self.popularity = 0
         self.listens = 0
         self.url = None
 
-    def get_id(self):
-        if self.spotifyID: return
+    def _search_id(self):
         if headers:
             try:
-                r = requests.get(f'https://api.spotify.com/v1/search?q=artist:{self.artist}&type=artist&limit=1', headers=headers, timeout=10)
-                if r.status_code == 200:
-                    items = r.json()['artists']['items']
-                    if items: self.spotifyID = items[0]['id']
+                found = spotify_client.search_artist(self.artist)
+                if found: return found
             except: pass
-        if not self.spotifyID:
-            u = get_first_search_result(f'spotify artist {self.artist}')
-            if u:
-                m = re.search(r'artist/([a-zA-Z0-9]+)', u)
-                if m: self.spotifyID = m.group(1)
+        u = get_first_search_result(f'spotify artist {self.artist}')
+        if u:
+            m = re.search(r'artist/([a-zA-Z0-9]+)', u)
+            if m: return m.group(1)
+        return None
 
-    def get_stats(self):
-        if not self.spotifyID: return
-        if headers:
-            try:
-                r = requests.get(f'https://api.spotify.com/v1/artists/{self.spotifyID}', headers=headers, timeout=10)
-                if r.status_code == 200:
-                    res = r.json()
-                    self.followers = res['followers']['total']
-                    self.popularity = res['popularity']
-                    if res.get('genres'): self.genre = res['genres'][0]
-                    if 'external_urls' in res: self.url = res['external_urls'].get('spotify')
-            except: pass
-        
+    def get_id(self):
+        if self.spotifyID: return
+        self.spotifyID = resolve_cache.resolve('spotify', self.artist, self._search_id, self.force_resolve)
+
+    def apply_api(self, res):
+        """Copy the fields we track from a /v1/artists object."""
+        self.followers = res['followers']['total']
+        self.popularity = res['popularity']
+        if res.get('genres'): self.genre = res['genres'][0]
+        if 'external_urls' in res: self.url = res['external_urls'].get('spotify')
+
+    def page_url(self):
         if not self.url: self.url = f'https://open.spotify.com/artist/{self.spotifyID}'
         if not self.url.startswith('http'): self.url = 'https://' + self.url
-        
+        return self.url
+
+    def _try_api(self):
+        if not headers: return False
+        try:
+            res = spotify_client.get_artist(self.spotifyID)
+            if res:
+                self.apply_api(res)
+                return True
+        except: pass
+        return False
+
+    def _try_page(self):
         try:
             h = {'User-Agent': 'Mozilla/5.0'}
-            r = requests.get(self.url, headers=h, timeout=10)
-            soup = BeautifulSoup(r.content, 'html.parser')
-            meta = soup.find('meta', attrs={'property': 'og:description'})
-            if meta:
-                m = re.search(r'([\d,.]+[KMB]?)\s*monthly listeners', meta.get('content',''), re.I)
-                if m: self.listens = convert_string_to_number(m.group(1))
+            r = rate_limiter.get(self.page_url(), headers=h, timeout=10)
+            self.listens = parse_monthly_listeners(r.content)
         except: pass
-        
-        if self.listens == 0:
-            try:
-                driver.get(self.url); time.sleep(5)
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                meta = soup.find('meta', attrs={'property': 'og:description'})
-                if meta:
-                    m = re.search(r'([\d,.]+[KMB]?)\s*monthly listeners', meta.get('content',''), re.I)
-                    if m: self.listens = convert_string_to_number(m.group(1))
-                if self.listens == 0:
-                     m = re.search(r'([\d,.]+[KMB]?)\s*monthly listeners', soup.get_text(), re.I)
-                     if m: self.listens = convert_string_to_number(m.group(1))
-            except: pass
+        return self.listens > 0
+
+    def _try_selenium(self):
+        try:
+            driver.get(self.page_url())
+            wait_until('open.spotify.com', has_meta('og:description', r'monthly listeners'), timeout=5)
+            self.listens = parse_monthly_listeners(driver.page_source)
+            if self.listens == 0:
+                 soup = parse_html(driver.page_source)
+                 m = re.search(r'([\d,.]+[KMB]?)\s*monthly listeners', soup.get_text(), re.I)
+                 if m: self.listens = convert_string_to_number(m.group(1))
+        except: pass
+        return self.listens > 0
+
+    def get_followers(self):
+        # followers/popularity come from the API
+        self.get_id()
+        if not self.spotifyID: return False
+        return attempt('spotify', 'api', self._try_api)[0]
+
+    def get_listeners(self):
+        # monthly listeners only from the page
+        self.get_id()
+        if not self.spotifyID: return False
+        return (attempt('spotify', 'page', self._try_page)[0]
+                or attempt('spotify', 'selenium', self._try_selenium)[0])
+
+    def get_stats(self):
+        if not self.spotifyID: return
+        self.get_followers()
+        self.get_listeners()
 
     def __str__(self):
         return (f"Artist: {self.artist}\n"
@@ -381,25 +612,31 @@ class SpotifyProfile:
         return self.spotifyID, self.genre, self.followers, self.popularity, self.listens
 
 class StubhubProfile:
-    def __init__(self, artist, url=None):
+    def __init__(self, artist, url=None, force_resolve=False):
         self.artist = artist
         self.url = url
+        self.force_resolve = force_resolve
         self.favourites = 0
 
-    def get_url(self):
-        if self.url: return self.url
+    def _search_url(self):
         u = get_first_search_result(f'stubhub {self.artist} tickets performer')
         if u:
             match = re.search(r'stubhub\.(ca|com)/([^?\s]+)', u)
-            if match: self.url = '/' + match.group(2)
+            if match: return '/' + match.group(2)
+        return None
+
+    def get_url(self):
+        if self.url: return self.url
+        self.url = resolve_cache.resolve('stubhub', self.artist, self._search_url, self.force_resolve)
         return self.url
 
     def _scrape(self):
         target_urls = [self.url] if self.url and self.url.startswith('http') else [f'https://www.{d}{self.url}' for d in ['stubhub.ca', 'stubhub.com']]
         for u in target_urls:
             try:
-                driver.get(u); time.sleep(5)
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
+                driver.get(u)
+                wait_until(site_name(u), has_text(r'index-data|Favou?rites'), timeout=5)
+                soup = parse_html(driver.page_source)
                 candidates = soup.find_all(string=re.compile(r'^\s*\d+(?:\.\d+)?[KMB]?\s*$'))
                 for candidate in candidates:
                     curr = candidate.parent
@@ -422,6 +659,10 @@ class StubhubProfile:
             except: pass
         return 0
 
+    def _try_selenium(self):
+        self.favourites = self._scrape()
+        return self.favourites > 0
+
     def __str__(self):
         return (f"Artist: {self.artist}\n"
                 f"Stubhub URL: {self.url}\n"
@@ -432,5 +673,5 @@ class StubhubProfile:
 
     def get_all(self):
         if not self.get_url(): return None, 0
-        self.favourites = self._scrape()
+        attempt('stubhub', 'selenium', self._try_selenium)
         return self.url, self.favourites
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import local_db
+import rate_limiter
+
+# Client-credentials token shared by every process through a one-row SQLite table,
+# refreshed REFRESH_MARGIN seconds before Spotify says it expires.
+TOKEN_URL = 'https://accounts.spotify.com/api/token'
+API_URL = 'https://api.spotify.com/v1'
+REFRESH_MARGIN = 300
+BATCH_SIZE = 50
+MAX_RETRIES = 3
+MAX_RETRY_AFTER = 60  # longest rate-limiter backoff a 429 retry waits out; longer bans are reported as failures
+
+_token = None  # (access_token, expires_at) cached in-process
+
+def load_creds(path='spotify_credentials.json'):
+    if os.path.exists(path):
+        with open(path, 'r') as f: return json.load(f)
+    return {}
+
+def _store():
+    conn = local_db.connect('spotify_token')
+    conn.execute("CREATE TABLE IF NOT EXISTS token (id INTEGER PRIMARY KEY CHECK (id = 1), access_token TEXT, expires_at REAL)")
+    return conn
+
+def _fresh(tok):
+    return tok and tok[1] - REFRESH_MARGIN > time.time()
+
+def get_token(force=False):
+    """Return a valid access token, fetching a new one only when the shared one is near expiry."""
+    global _token
+    if not force and _fresh(_token): return _token[0]
+    creds = load_creds()
+    if not creds: return None
+    conn = _store()
+    try:
+        # IMMEDIATE lock: concurrent processes wait here and then reuse the token the first one fetched
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT access_token, expires_at FROM token WHERE id = 1").fetchone()
+        tok = (row['access_token'], row['expires_at']) if row else None
+        if force and tok and _token and tok[0] == _token[0]: tok = None
+        if not _fresh(tok):
+            res = rate_limiter.post(TOKEN_URL,
+                                    data={'grant_type': 'client_credentials',
+                                          'client_id': creds['client_id'],
+                                          'client_secret': creds['client_secret']}, timeout=10)
+            if res.status_code != 200:
+                conn.execute("ROLLBACK")
+                return None
+            body = res.json()
+            tok = (body['access_token'], time.time() + body.get('expires_in', 3600))
+            conn.execute("INSERT OR REPLACE INTO token (id, access_token, expires_at) VALUES (1, ?, ?)", tok)
+        conn.execute("COMMIT")
+        _token = tok
+        return tok[0]
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        return None
+    finally:
+        conn.close()
+
+def get_headers():
+    token = get_token()
+    return {'Authorization': f'Bearer {token}'} if token else {}
+
+# A 429 is handled by rate_limiter alone: it backs api.spotify.com off (honouring Retry-After) and
+# the retry below simply waits in acquire() for that backoff, up to MAX_RETRY_AFTER.
+def _retry(r):
+    return r.status_code == 429 and rate_limiter.ENABLED
+
+def api_get(path, params=None):
+    """GET an API path, retrying a 429 once the rate limiter lets it through and renewing the token once on 401."""
+    renewed = False
+    for attempt in range(MAX_RETRIES + 1):
+        h = get_headers()
+        if not h: return None
+        try:
+            r = rate_limiter.get(f'{API_URL}{path}', max_wait=MAX_RETRY_AFTER if attempt else rate_limiter.MAX_WAIT,
+                                 params=params, headers=h, timeout=10)
+        except rate_limiter.RateLimited:
+            return None
+        if r.status_code == 200: return r.json()
+        if _retry(r): continue
+        if r.status_code == 401 and not renewed:
+            get_token(force=True)
+            renewed = True
+        else:
+            return None
+    return None
+
+def search_artist(name):
+    data = api_get('/search', {'q': f'artist:{name}', 'type': 'artist', 'limit': 1})
+    items = data['artists']['items'] if data else []
+    return items[0]['id'] if items else None
+
+def get_artists(ids):
+    """Fetch artist objects for many IDs using /v1/artists?ids= in chunks of 50. Returns {id: artist}."""
+    out = {}
+    ids = [i for i in dict.fromkeys(ids) if i]
+    for i in range(0, len(ids), BATCH_SIZE):
+        data = api_get('/artists', {'ids': ','.join(ids[i:i + BATCH_SIZE])})
+        for a in (data or {}).get('artists', []):
+            if a: out[a['id']] = a
+    return out
+
+def get_artist(spotify_id):
+    return get_artists([spotify_id]).get(spotify_id)
+
+async def aget_artists(client, ids):
+    """Async twin of get_artists for an httpx.AsyncClient."""
+    import asyncio  # only async callers pay for it; they have it loaded already
+    out = {}
+    ids = [i for i in dict.fromkeys(ids) if i]
+    for i in range(0, len(ids), BATCH_SIZE):
+        params = {'ids': ','.join(ids[i:i + BATCH_SIZE])}
+        renewed = False
+        for attempt in range(MAX_RETRIES + 1):
+            h = await asyncio.to_thread(get_headers)
+            if not h: return out
+            try:
+                async with rate_limiter.alimit(API_URL, MAX_RETRY_AFTER if attempt else rate_limiter.MAX_WAIT) as slot:
+                    r = slot.record(await client.get(f'{API_URL}/artists', params=params, headers=h, timeout=10))
+            except rate_limiter.RateLimited:
+                return out
+            if r.status_code == 200:
+                for a in r.json().get('artists', []):
+                    if a: out[a['id']] = a
+                break
+            if _retry(r): continue
+            if r.status_code == 401 and not renewed:
+                await asyncio.to_thread(get_token, True)
+                renewed = True
+            else:
+                break
+    return out
@@ -0,0 +1,197 @@
+import os
+import sys
+import math
+import time
+import threading
+import db
+import local_db
+import job_queue
+import metrics_history
+import scrape_ledger
+
+# Decides which (artist, source) pairs to refresh next. Each pair is scored by how stale it is
+# (time since its last successful value), how fast its metric has been moving, how close the
+# artist's next show is and how often scraping it has failed; the best pairs are queued until
+# the hourly scrape budget is spent.
+BUDGET_PER_HOUR = int(os.environ.get('SCRAPE_BUDGET_PER_HOUR', 120))
+INTERVAL = float(os.environ.get('SCHEDULER_INTERVAL_MINUTES', 10)) * 60
+MIN_AGE_HOURS = float(os.environ.get('SCHEDULER_MIN_AGE_HOURS', 1))
+TARGET_AGE_HOURS = 24.0   # staleness of 1.0 = one day without a fresh value
+NEVER_SCRAPED_HOURS = 24.0 * 30
+VOLATILITY_DAYS = 14
+VOLATILITY_WEIGHT = 20.0  # a 5% move in VOLATILITY_DAYS doubles the priority
+EVENT_WEIGHT = 4.0        # a show today multiplies the priority by 1 + EVENT_WEIGHT
+EVENT_HORIZON_DAYS = 7.0  # ... decaying with this time constant
+FAILURE_DAYS = 7
+
+SOURCE_METRICS = {
+    'instagram': ['instagram_followers'],
+    'twitter': ['twitter_followers'],
+    'spotify': ['spotify_listeners', 'spotify_followers', 'spotify_popularity'],
+    'stubhub': ['stubhub_favourites'],
+}
+
+_schema_ready = False
+_events = {'mtime': None, 'dates': {}}
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('scheduler')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scheduled (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                artist TEXT NOT NULL,
+                source TEXT NOT NULL,
+                score REAL NOT NULL,
+                job_id INTEGER,
+                ts REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_ts ON scheduled (ts)")
+        _schema_ready = True
+    return conn
+
+def spent_last_hour(now=None):
+    conn = get_conn()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM scheduled WHERE ts > ?", ((now or time.time()) - 3600,)).fetchone()[0]
+    finally:
+        conn.close()
+
+# --- INPUTS ---
+def upcoming_events(path=None):
+    """{artist (lower-cased): [upcoming show dates]} from the workbook's Events sheet (via
+    feature_store's Parquet copy); re-read when the file changes."""
+    import feature_store
+    path = path or feature_store.WORKBOOK
+    try: mtime = os.path.getmtime(path)
+    except OSError: return {}
+    if mtime != _events['mtime']:
+        try:
+            import pandas as pd
+            events = feature_store.load_sheets(path, ['Events'])['Events'][['Artist', 'Date']]
+            events['Date'] = pd.to_datetime(events['Date'], errors='coerce')
+            dates = {}
+            for artist, date in events.dropna().itertuples(index=False):
+                dates.setdefault(str(artist).strip().lower(), []).append(date.timestamp())
+            _events.update(mtime=mtime, dates=dates)
+        except Exception as e:
+            print(f"⚠️ Could not read Events from {path}: {e}")
+            return _events['dates']
+    return _events['dates']
+
+def days_to_next_event(dates, now):
+    ahead = [d for d in dates if d >= now - 86400]
+    return max(0.0, (min(ahead) - now) / 86400) if ahead else None
+
+# --- SCORING ---
+def score(age_hours, volatility, event_days, succeeded, failed):
+    staleness = age_hours / TARGET_AGE_HOURS
+    movement = 1 + VOLATILITY_WEIGHT * volatility
+    event = 1 + EVENT_WEIGHT * math.exp(-event_days / EVENT_HORIZON_DAYS) if event_days is not None else 1
+    success = (succeeded + 1) / (succeeded + failed + 2)
+    return staleness * movement * event * success
+
+def plan(budget=None, now=None, names=None):
+    """Every refreshable (artist, source) pair, best first, capped at the remaining hourly budget.
+
+    Pairs refreshed within MIN_AGE_HOURS or already queued/running are left out. Each entry is
+    {artist, source, score, age_hours, volatility, event_days, failure_rate}.
+    """
+    now = now or time.time()
+    if budget is None: budget = max(0, BUDGET_PER_HOUR - spent_last_hour(now))
+    if budget <= 0: return []
+
+    rows = db.query("SELECT name, updated_at FROM ARTISTS")
+    if names is not None: rows = [r for r in rows if r['name'] in names]
+    seen = metrics_history.last_seen()  # successful values only
+    try: failing = scrape_ledger.open_metrics()
+    except Exception as e:
+        print(f"⚠️ Could not read open failures from the scrape ledger: {e}")
+        failing = set()
+    moves = {m: metrics_history.growth(m, VOLATILITY_DAYS, now=now) for ms in SOURCE_METRICS.values() for m in ms}
+    outcomes = job_queue.outcome_counts(now - FAILURE_DAYS * 86400)
+    busy = job_queue.active_targets()
+    events = upcoming_events()
+
+    targets = []
+    for r in rows:
+        name = r['name']
+        event_days = days_to_next_event(events.get(name.strip().lower(), []), now)
+        fallback = r['updated_at'].timestamp() if r.get('updated_at') and hasattr(r['updated_at'], 'timestamp') else None
+        for source, metrics in SOURCE_METRICS.items():
+            if (name, source) in busy: continue
+            last = max((seen[(name, m)] for m in metrics if (name, m) in seen), default=None)
+            # No history yet: fall back to the row's updated_at, then treat it as long overdue.
+            # updated_at also moves on failed scrapes, so it does not count while one is open.
+            if not any((name, m) in failing for m in metrics): last = last or fallback
+            age = (now - last) / 3600 if last else NEVER_SCRAPED_HOURS
+            if age < MIN_AGE_HOURS: continue
+            volatility = max((abs(moves[m][name]['rate'] or 0) for m in metrics if name in moves[m]), default=0)
+            ok, bad = outcomes.get((name, source), (0, 0))
+            targets.append({'artist': name, 'source': source, 'age_hours': round(age, 2),
+                            'volatility': round(volatility, 4), 'event_days': event_days,
+                            'failure_rate': round(bad / (ok + bad), 2) if ok + bad else None,
+                            'score': score(age, volatility, event_days, ok, bad)})
+    targets.sort(key=lambda t: -t['score'])
+    return targets[:budget]
+
+def enqueue(targets, now=None):
+    """Queue `targets` (from plan()) as one bulk job per source, highest-scoring source first.
+
+    Within a job the artists keep their score order. Returns the jobs.
+    """
+    now = now or time.time()
+    by_source = {}
+    for t in targets:
+        by_source.setdefault(t['source'], []).append(t)
+    jobs = []
+    conn = get_conn()
+    try:
+        for source, ts in sorted(by_source.items(), key=lambda kv: -kv[1][0]['score']):
+            job = job_queue.enqueue_bulk([t['artist'] for t in ts], [source])
+            conn.executemany("INSERT INTO scheduled (artist, source, score, job_id, ts) VALUES (?, ?, ?, ?, ?)",
+                             [(t['artist'], source, t['score'], job['id'], now) for t in ts])
+            jobs.append(job)
+    finally:
+        conn.close()
+    return jobs
+
+def run_once(budget=None, dry_run=False):
+    targets = plan(budget)
+    if not targets:
+        print("😴 Nothing due (or hourly scrape budget spent)")
+        return []
+    for t in targets[:10]:
+        ev = f"show in {t['event_days']:.0f}d" if t['event_days'] is not None else "no show"
+        print(f"   {t['score']:>8.2f}  {t['artist']:<28} {t['source']:<10} {t['age_hours']:>7.1f}h old | moved {t['volatility']:.1%} | {ev}")
+    if dry_run: return targets
+    jobs = enqueue(targets)
+    print(f"🗓️ Scheduled {len(targets)} refresh(es) in {len(jobs)} job(s)")
+    return targets
+
+def _loop():
+    while True:
+        try: run_once()
+        except Exception as e: print(f"⚠️ Scheduler run failed: {e}")
+        time.sleep(INTERVAL)
+
+_thread = None
+
+def start():
+    """Run the scheduler every INTERVAL seconds in a background thread of this process."""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_loop, daemon=True)
+        _thread.start()
+        print(f"🗓️ Staleness scheduler every {INTERVAL / 60:.0f} min, budget {BUDGET_PER_HOUR}/h")
+    return _thread
+
+if __name__ == "__main__":
+    # python3 staleness_scheduler.py [--dry-run] [--loop] [budget]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if '--loop' in sys.argv:
+        start().join()
+    else:
+        run_once(int(args[0]) if args else None, dry_run='--dry-run' in sys.argv)
@@ -58,67 +58,141 @@ function showToast(message, type = 'success') {
     }, 4000);
 }
 
-// Poll for refresh completion by checking updated_at timestamps
+// Live updates: load the table once, then apply row deltas pushed over SSE
+let changeCursor = null;
+let changeStream = null;
+let changePollTimer = null;
+const refreshWaiters = new Set();
+
+function applyChanges(delta) {
+    if (delta.cursor) changeCursor = delta.cursor;
+    const rows = delta.rows || [];
+    const deleted = delta.deleted || [];
+    if (rows.length === 0 && deleted.length === 0) return;
+
+    const byName = new Map(allArtists.map(a => [a.name, a]));
+    rows.forEach(r => byName.set(r.name, r));
+    deleted.forEach(name => byName.delete(name));
+    // Keep the DB's newest-first order for the recent list
+    allArtists = [...byName.values()].sort((a, b) => (b.updated_at || '').localeCompare(a.updated_at || ''));
+
+    if (columns.length === 0 && allArtists.length > 0) {
+        columns = Object.keys(allArtists[0]);
+        renderColumnPicker();
+        renderFilters();
+    }
+    sortAndRender();
+    renderRecentList();
+    refreshWaiters.forEach(w => w.onRows(rows));
+}
+
+function applyJobEvent(job) {
+    refreshWaiters.forEach(w => w.onJob(job));
+}
+
+async function pollChanges() {
+    try {
+        const response = await fetch(`/api/artists/changes?since=${encodeURIComponent(changeCursor || '')}`);
+        const data = await response.json();
+        if (data.error) throw new Error(data.error);
+        applyChanges(data);
+    } catch (e) {
+        console.error('Change poll error:', e);
+    }
+}
+
+function startChangeStream() {
+    if (changeStream || changePollTimer) return;
+    if (!window.EventSource) {
+        changePollTimer = setInterval(pollChanges, 10000);
+        return;
+    }
+    changeStream = new EventSource(`/api/artists/stream?since=${encodeURIComponent(changeCursor || '')}`);
+    changeStream.addEventListener('artists', e => applyChanges(JSON.parse(e.data)));
+    changeStream.addEventListener('job', e => applyJobEvent(JSON.parse(e.data)));
+    changeStream.onerror = () => {
+        // EventSource retries by itself; only fall back to polling if it gives up
+        if (changeStream.readyState === EventSource.CLOSED) {
+            changeStream = null;
+            changePollTimer = setInterval(pollChanges, 10000);
+        }
+    };
+}
+
+// Resolve once every artist has a new updated_at or its refresh job has finished
 function waitForRefresh(artistNames, successMsg, maxWaitMs = 120000) {
     return new Promise((resolve) => {
-        // Get current timestamps
         const originalTimestamps = {};
         artistNames.forEach(name => {
             const artist = allArtists.find(a => a.name === name);
             if (artist) originalTimestamps[name] = artist.updated_at;
         });
 
-        const pollInterval = 3000; // Check every 3 seconds
-        let elapsed = 0;
-        let completed = new Set();
+        const completed = new Set();
+        const failed = new Set();
+        const waiter = {};
 
-        const poll = async () => {
-            if (elapsed >= maxWaitMs) {
+        const finish = (timedOut) => {
+            clearTimeout(timer);
+            refreshWaiters.delete(waiter);
+            if (timedOut) {
                 showToast(`Refresh taking longer than expected. Check back later.`, 'info');
-                fetchArtists();
-                resolve();
-                return;
+            } else if (failed.size > 0) {
+                showToast(`Refresh failed for ${[...failed].join(', ')}`, 'error');
+            } else {
+                showToast(successMsg);
             }
+            resolve();
+        };
+        const check = () => {
+            if (completed.size === artistNames.length) finish(false);
+        };
 
-            try {
-                const response = await fetch('/api/artists');
-                const data = await response.json();
-                if (data.error) throw new Error(data.error);
-
-                // Check which artists have been updated
-                artistNames.forEach(name => {
-                    if (completed.has(name)) return;
-                    const artist = data.find(a => a.name === name);
-                    if (artist && artist.updated_at !== originalTimestamps[name]) {
-                        completed.add(name);
-                    }
+        waiter.onRows = (rows) => {
+            rows.forEach(r => {
+                if (artistNames.includes(r.name) && r.updated_at !== originalTimestamps[r.name]) completed.add(r.name);
+            });
+            check();
+        };
+        waiter.onJob = (job) => {
+            if (job.kind === 'bulk' && job.progress) {
+                // Bulk runs report per-artist sub-status; an artist is settled once none of its sources are pending
+                Object.entries(job.progress.artists).forEach(([name, states]) => {
+                    if (!artistNames.includes(name) || completed.has(name)) return;
+                    const values = Object.values(states);
+                    const settled = values.every(st => st === 'done' || st === 'failed');
+                    if (!settled && job.status !== 'failed') return;
+                    if (!values.includes('done')) failed.add(name);
+                    completed.add(name);
                 });
-
-                if (completed.size === artistNames.length) {
-                    // All done
-                    allArtists = data;
-                    sortAndRender();
-                    renderRecentList();
-                    showToast(successMsg);
-                    resolve();
-                    return;
-                }
-
-                // Continue polling
-                elapsed += pollInterval;
-                setTimeout(poll, pollInterval);
-            } catch (e) {
-                console.error('Polling error:', e);
-                elapsed += pollInterval;
-                setTimeout(poll, pollInterval);
+                check();
+                return;
+            }
+            // Unchanged values are not rewritten, so a finished job can settle an artist without a row event
+            if ((job.status === 'failed' || job.status === 'done') && artistNames.includes(job.artist) && !completed.has(job.artist)) {
+                if (job.status === 'failed') failed.add(job.artist);
+                completed.add(job.artist);
+                check();
             }
         };
 
-        // Start polling after initial delay
-        setTimeout(poll, pollInterval);
+        const timer = setTimeout(() => finish(true), maxWaitMs);
+        refreshWaiters.add(waiter);
     });
 }
 
+// One job for many artists; progress arrives as 'job' events on the change stream
+async function startBulkRefresh(artists, sources = null) {
+    const res = await fetch('/api/refresh/bulk', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(sources ? { artists, sources } : { artists })
+    });
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || 'Bulk refresh failed to start');
+    return data;
+}
+
 // Pagination State
 let currentPage = 1;
 let pageSize = 50;
@@ -130,6 +204,7 @@ async function fetchArtists() {
         if (data.error) throw new Error(data.error);
 
         allArtists = data;
+        changeCursor = response.headers.get('X-Change-Cursor');
 
         if (columns.length === 0 && data.length > 0) {
             columns = Object.keys(data[0]);
@@ -139,6 +214,7 @@ async function fetchArtists() {
 
         sortAndRender();
         renderRecentList();
+        startChangeStream();
     } catch (error) {
         console.error('Fetch Error:', error);
         document.getElementById('artist-tbody').innerHTML = `<tr><td colspan="10" style="text-align:center;color:#ff4d4d;padding:2rem;">Error: ${error.message}</td></tr>`;
@@ -327,15 +403,13 @@ async function refreshColumn(col) {
 
     showToast(`Refreshing ${source} for ${artists.length} artist(s)...`, 'info');
 
-    for (const name of artists) {
-        fetch('/api/refresh', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ name, source })
-        });
+    const done = waitForRefresh(artists, `${formatLabel(source)} refresh complete`);
+    try {
+        await startBulkRefresh(artists, [source]);
+    } catch (e) {
+        showToast(e.message, 'error');
     }
-
-    waitForRefresh(artists, `${formatLabel(source)} refresh complete`);
+    return done;
 }
 
 // Filter functions
@@ -571,14 +645,13 @@ async function bulkDelete() {
 async function bulkRefresh() {
     const names = [...selectedRows];
     showToast(`Starting refresh for ${names.length} artist(s)...`, 'info');
-    for (const name of names) {
-        fetch('/api/refresh', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ name })
-        });
+    const done = waitForRefresh(names, `Refresh complete for ${names.length} artist(s)`);
+    try {
+        await startBulkRefresh(names);
+    } catch (e) {
+        showToast(e.message, 'error');
     }
-    waitForRefresh(names, `Refresh complete for ${names.length} artist(s)`);
+    return done;
 }
 
 function renderTable(artists) {
@@ -814,15 +887,13 @@ async function refreshAll() {
 
     showToast(`Starting batch refresh (${count} artists)...`, 'info');
 
-    for (const name of names) {
-        fetch('/api/refresh', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ name })
-        });
+    const done = waitForRefresh(names, `Batch refresh complete for ${count} artist(s)`);
+    try {
+        await startBulkRefresh(names);
+    } catch (e) {
+        showToast(e.message, 'error');
     }
-
-    waitForRefresh(names, `Batch refresh complete for ${count} artist(s)`).finally(() => {
+    done.finally(() => {
         btn.textContent = 'Refresh All';
         btn.disabled = false;
     });
@@ -836,4 +907,3 @@ window.onclick = function (event) {
 }
 
 fetchArtists();
-setInterval(fetchArtists, 60000);
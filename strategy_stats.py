@@ -0,0 +1,129 @@
+import os
+import time
+import local_db
+
+# Success/latency record for every fallback strategy, per platform and per artist,
+# used to pick the order of InstagramProfile/TwitterProfile fallback chains.
+PER_ARTIST = os.environ.get('STRATEGY_STATS_PER_ARTIST', '1') != '0'
+BREAKER_THRESHOLD = int(os.environ.get('STRATEGY_BREAKER_THRESHOLD', 5))  # consecutive platform-wide failures
+BREAKER_COOLDOWN = float(os.environ.get('STRATEGY_BREAKER_COOLDOWN', 900))  # seconds before a half-open probe
+EWMA_ALPHA = 0.3
+DEFAULT_LATENCY = 10.0
+ARTIST_WEIGHT = 3.0  # an artist's own history counts this many times more than the platform's
+
+_schema_ready = False
+
+def get_conn():
+    global _schema_ready
+    conn = local_db.connect('strategy_stats')
+    if not _schema_ready:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats (
+                platform TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                artist TEXT NOT NULL DEFAULT '',
+                successes INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                latency REAL,
+                last_success REAL,
+                last_failure REAL,
+                open_until REAL,
+                PRIMARY KEY (platform, strategy, artist)
+            )
+        """)
+        _schema_ready = True
+    return conn
+
+def _upsert(conn, platform, strategy, artist, ok, latency, now):
+    conn.execute("INSERT OR IGNORE INTO stats (platform, strategy, artist) VALUES (?, ?, ?)", (platform, strategy, artist))
+    row = conn.execute("SELECT * FROM stats WHERE platform = ? AND strategy = ? AND artist = ?",
+                       (platform, strategy, artist)).fetchone()
+    ewma = latency if row['latency'] is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * row['latency']
+    if ok:
+        conn.execute("""UPDATE stats SET successes = successes + 1, consecutive_failures = 0, latency = ?,
+                        last_success = ?, open_until = NULL WHERE platform = ? AND strategy = ? AND artist = ?""",
+                     (ewma, now, platform, strategy, artist))
+    else:
+        streak = row['consecutive_failures'] + 1
+        # Only the platform-wide row trips the breaker; one artist's bad luck should not
+        open_until = now + BREAKER_COOLDOWN if artist == '' and streak >= BREAKER_THRESHOLD else row['open_until']
+        conn.execute("""UPDATE stats SET failures = failures + 1, consecutive_failures = ?, latency = ?,
+                        last_failure = ?, open_until = ? WHERE platform = ? AND strategy = ? AND artist = ?""",
+                     (streak, ewma, now, open_until, platform, strategy, artist))
+
+def record(platform, strategy, artist, ok, latency):
+    now = time.time()
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        _upsert(conn, platform, strategy, '', ok, latency, now)
+        if PER_ARTIST and artist:
+            _upsert(conn, platform, strategy, artist, ok, latency, now)
+        conn.execute("COMMIT")
+    except:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def _rate(row):
+    return (row['successes'] + 1) / (row['successes'] + row['failures'] + 2) if row else 0.5
+
+def _claim_probe(platform, strategy, now):
+    """Take the one half-open probe of an expired breaker: pushing open_until forward keeps every
+    other caller (in any process) skipping the strategy until the probe's result is recorded."""
+    conn = get_conn()
+    try:
+        cur = conn.execute("""UPDATE stats SET open_until = ? WHERE platform = ? AND strategy = ? AND artist = ''
+                              AND open_until IS NOT NULL AND open_until <= ?""",
+                           (now + BREAKER_COOLDOWN, platform, strategy, now))
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+def order(platform, artist, strategies):
+    """Return `strategies` (names, in default order) re-ordered by expected payoff.
+
+    Strategies whose breaker is open are left out while the cooldown lasts, unless every
+    strategy is open. Once it ends, only the caller that claims the half-open probe gets the
+    strategy, first in line. Ties keep the default order.
+    """
+    conn = get_conn()
+    try:
+        rows = conn.execute("SELECT * FROM stats WHERE platform = ? AND artist IN ('', ?)",
+                            (platform, artist or '')).fetchall()
+    finally:
+        conn.close()
+    overall = {r['strategy']: r for r in rows if r['artist'] == ''}
+    mine = {r['strategy']: r for r in rows if r['artist'] != ''} if artist else {}
+    now = time.time()
+
+    def score(name):
+        base = overall.get(name)
+        p = _rate(base)
+        lat = base['latency'] if base else None
+        own = mine.get(name)
+        if own:
+            n = own['successes'] + own['failures']
+            p = (p + ARTIST_WEIGHT * n * _rate(own)) / (1 + ARTIST_WEIGHT * n)
+            lat = own['latency'] or lat
+        # Expected successes per second spent
+        return p / max(lat or DEFAULT_LATENCY, 0.1)
+
+    tripped = {s for s in strategies if overall.get(s) and overall[s]['open_until'] is not None}
+    probes = [s for s in strategies if s in tripped and overall[s]['open_until'] <= now and _claim_probe(platform, s, now)]
+    closed = [s for s in strategies if s not in tripped]
+    if not closed and not probes: closed = list(strategies)
+    return probes + sorted(closed, key=lambda s: (-score(s), strategies.index(s)))
+
+def summary(platform=None):
+    conn = get_conn()
+    try:
+        if platform:
+            rows = conn.execute("SELECT * FROM stats WHERE artist = '' AND platform = ?", (platform,)).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM stats WHERE artist = ''").fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()